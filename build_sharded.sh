@@ -0,0 +1,15 @@
+#!/bin/bash
+# Builds the site as N shards in N local processes, then merges them into docs/.
+# Usage: ./build_sharded.sh [N] [basepath]
+shards=${1:-4}
+basepath=${2:-/staticSiteGenerator/}
+cd "$(dirname "$0")/src" || exit 1
+pids=()
+for shard in $(seq 1 "$shards"); do
+    python3 main.py "$basepath" --quiet --shard "$shard/$shards" &
+    pids+=($!)
+done
+for pid in "${pids[@]}"; do
+    wait "$pid" || exit 1
+done
+python3 main.py "$basepath" --merge-shards "$shards"
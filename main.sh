@@ -1,2 +1,2 @@
-python3 src/main.py
-cd public && python3 -m http.server 8888
\ No newline at end of file
+cd "$(dirname "$0")/src" || exit 1
+python3 main.py --watch --port 8888
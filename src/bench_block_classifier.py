@@ -0,0 +1,52 @@
+"""
+Compares block_to_block_type with the previous regex-per-line classifier on list-heavy and quote-heavy
+documents. Run from src/: python3 bench_block_classifier.py
+"""
+import re
+import timeit
+
+from markdown_parser import BlockType, block_to_block_type, markdown_to_blocks
+
+
+def legacy_all_lines_start_with(lines: list[str], start: str) -> bool:
+    for line in lines:
+        if not re.match(start, line):
+            return False
+    return True
+
+
+def legacy_block_to_block_type(block: str) -> BlockType:
+    lines = block.split("\n")
+    if re.match("#{1,6} ", block):
+        return BlockType.HEADING
+    if block.startswith("```") and block.endswith("```"):
+        return BlockType.CODE
+    if legacy_all_lines_start_with(lines, ">"):
+        return BlockType.QUOTE
+    if legacy_all_lines_start_with(lines, r"\* ") or legacy_all_lines_start_with(lines, r"\- "):
+        return BlockType.UNORDERED
+    if legacy_all_lines_start_with(lines, r"\d+\. "):
+        return BlockType.ORDERED
+    return BlockType.PARAGRAPH
+
+
+DOCUMENTS = {
+    "unordered lists": "\n\n".join("\n".join(f"- item {i} of list {j}" for i in range(30)) for j in range(200)),
+    "ordered lists": "\n\n".join("\n".join(f"{i}. item of list {j}" for i in range(1, 31)) for j in range(200)),
+    "quotes": "\n\n".join("\n".join(f"> quoted line {i}" for i in range(30)) for j in range(200)),
+    "paragraphs": "\n\n".join("\n".join(f"plain line {i}" for i in range(5)) for j in range(1000)),
+}
+
+
+def main():
+    print(f"{'document':<18}{'legacy (ms)':>13}{'current (ms)':>14}{'speedup':>9}")
+    for name, markdown in DOCUMENTS.items():
+        blocks = markdown_to_blocks(markdown)
+        assert [legacy_block_to_block_type(b) for b in blocks] == [block_to_block_type(b) for b in blocks]
+        legacy = min(timeit.repeat(lambda: [legacy_block_to_block_type(b) for b in blocks], number=5, repeat=3))
+        current = min(timeit.repeat(lambda: [block_to_block_type(b) for b in blocks], number=5, repeat=3))
+        print(f"{name:<18}{legacy * 200:>13.2f}{current * 200:>14.2f}{legacy / current:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Compares the single-pass inline tokenizer with the chained split_nodes_* pipeline on lines of growing
+length. Run from src/: python3 bench_inline.py
+"""
+import sys
+import timeit
+
+from inline_tokenizer import tokenize_line
+from markdown_parser import chained_line_to_textnodes
+
+SPAN = "plain **bold** and _italic_ with `code`, ![image](/i.png) and [link](/page) "
+
+
+def time_per_call(func, line: str, repeat: int = 3) -> float | None:
+    try:
+        return min(timeit.repeat(lambda: func(line), number=1, repeat=repeat))
+    except RecursionError:
+        return None
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10, 100, 1000, 10000]
+    print(f"{'spans':>8} {'chars':>9} {'chained (s)':>12} {'tokenizer (s)':>14} {'tokenizer us/span':>18}")
+    for spans in sizes:
+        line = SPAN * spans
+        chained = time_per_call(chained_line_to_textnodes, line)
+        tokenizer = time_per_call(tokenize_line, line)
+        chained_text = f"{chained:12.4f}" if chained is not None else f"{'recursion':>12}"
+        print(f"{spans:>8} {len(line):>9} {chained_text} {tokenizer:14.4f} {tokenizer / spans * 1e6:18.2f}")
+
+
+if __name__ == "__main__":
+    main()
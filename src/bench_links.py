@@ -0,0 +1,59 @@
+"""
+Compares split_nodes_link with the previous regex-and-recursion version on lines with many links and on
+malformed brackets, at growing sizes. Run from src/: python3 bench_links.py [chars ...]
+"""
+import re
+import sys
+import timeit
+
+from markdown_parser import split_nodes_link
+from textnode import TextNode, TextType
+
+_LEGACY_LINK_PATTERN = re.compile(r"\[(.*?)]\((.+?)\)")
+
+LINES = {
+    "many links": lambda n: "[link](/page) " * (n // 14),
+    "open brackets": lambda n: "[" * n,
+    "unclosed urls": lambda n: "[a](" * (n // 4),
+    "brackets, no url": lambda n: "[a]" * (n // 3),
+    "nested brackets": lambda n: "[" * (n // 2) + "]" * (n // 2),
+}
+
+
+def legacy_split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
+    new_nodes: list[TextNode] = []
+    for node in old_nodes:
+        matches = _LEGACY_LINK_PATTERN.findall(node.text)
+        if len(matches) == 0:
+            new_nodes.append(node)
+            continue
+        match = matches[0]
+        split_text = node.text.split(f"[{match[0]}]({match[1]})", maxsplit=1)
+        new_nodes.append(TextNode(split_text[0], TextType.TEXT))
+        new_nodes.append(TextNode(match[0], TextType.LINK, match[1]))
+        if split_text[1] != "":
+            new_nodes.extend(legacy_split_nodes_link([TextNode(split_text[1], TextType.TEXT)]))
+    return new_nodes
+
+
+def time_per_call(func, line: str) -> float | None:
+    try:
+        return min(timeit.repeat(lambda: func([TextNode(line, TextType.TEXT)]), number=1, repeat=3))
+    except RecursionError:
+        return None
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [500, 1000, 2000]
+    print(f"{'line':<18}{'chars':>8}{'legacy (ms)':>13}{'current (ms)':>14}{'current us/char':>17}")
+    for name, make_line in LINES.items():
+        for size in sizes:
+            line = make_line(size)
+            legacy = time_per_call(legacy_split_nodes_link, line)
+            current = time_per_call(split_nodes_link, line)
+            legacy_text = f"{legacy * 1000:>13.2f}" if legacy is not None else f"{'recursion':>13}"
+            print(f"{name:<18}{len(line):>8}{legacy_text}{current * 1000:>14.2f}{current / len(line) * 1e6:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Reports the memory cost of the parse tree: bytes per node and the peak RSS while parsing a synthetic
+markdown document. Run from src/: python3 bench_memory.py [size in MB]
+"""
+import resource
+import sys
+import time
+import tracemalloc
+
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from markdown_parser import markdown_to_html_node
+from textnode import TextNode, TextType
+
+BLOCKS = [
+    "## A heading for the next section",
+    "A paragraph with **bold**, _italic_ and `code` spans and a [link](/page) to another page.\n"
+    "It continues on a second line with an ![image](/images/picture.png) in it.",
+    "* first item with **bold**\n* second item\n* third item with a [link](/other)",
+    "1. first\n2. second\n3. third with `code`",
+    "> a quote\n> spanning two lines",
+    "```\nprint('code block')\nreturn None\n```",
+]
+
+
+def synthetic_markdown(size: int) -> str:
+    blocks: list[str] = ["# Memory benchmark"]
+    length = 0
+    i = 0
+    while length < size:
+        block = BLOCKS[i % len(BLOCKS)]
+        blocks.append(block)
+        length += len(block) + 2
+        i += 1
+    return "\n\n".join(blocks)
+
+
+def count_nodes(node: HTMLNode) -> int:
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if isinstance(node, ParentNode):
+            stack.extend(node.children)
+    return count
+
+
+def node_size(node: object) -> int:
+    size = sys.getsizeof(node)
+    if hasattr(node, "__dict__"):
+        size += sys.getsizeof(node.__dict__)
+    return size
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    markdown = synthetic_markdown(int(megabytes * 1024 * 1024))
+
+    print("bytes per instance (excluding referenced strings):")
+    print(f"  TextNode   {node_size(TextNode('text', TextType.TEXT)):>5}")
+    print(f"  LeafNode   {node_size(LeafNode('b', 'text')):>5}")
+    print(f"  ParentNode {node_size(ParentNode('p', [])):>5}")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    tree = markdown_to_html_node(markdown)
+    elapsed = time.perf_counter() - start
+    traced, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes = count_nodes(tree)
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"parsed {len(markdown) / 1024 / 1024:.1f} MB of markdown in {elapsed:.2f}s")
+    print(f"  nodes in tree          {nodes}")
+    print(f"  retained bytes / node  {traced / nodes:.1f}")
+    print(f"  peak traced memory     {traced_peak / 1024 / 1024:.1f} MB")
+    print(f"  peak RSS               {peak_rss / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
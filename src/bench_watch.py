@@ -0,0 +1,75 @@
+"""
+Measures the edit-to-rebuilt latency of watch mode: builds a generated site, then times SiteWatcher.poll() when
+nothing changed and after one page was edited, once with the polling monitor (a full stat walk of content/) and
+once with the inotify monitor. Run from src/:
+python3 bench_watch.py [pages]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmark import SiteShape, generate_site
+from page_generator import generate_pages_incremental
+from tree_monitor import InotifyTreeMonitor, TreeMonitor, _load_libc
+from watch import SiteWatcher
+
+REPEAT = 5
+
+
+def time_poll(watcher: SiteWatcher, path: str = None) -> list[float]:
+    """
+    :param path: if given, a page edited before every poll, which must then rebuild exactly that page
+    :return: the duration of every poll in seconds
+    """
+    times = []
+    for i in range(REPEAT):
+        if path is not None:
+            with open(path, 'a') as f:
+                f.write(f"\n\nEdit {i}\n")
+        start = time.perf_counter()
+        rebuilt = watcher.poll()
+        times.append(time.perf_counter() - start)
+        if len(rebuilt) != (path is not None):
+            raise AssertionError(f"expected {'one output' if path else 'nothing'} to be rebuilt, got {rebuilt}")
+    return times
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    libc = _load_libc()
+    with tempfile.TemporaryDirectory() as root:
+        path = lambda *parts: os.path.join(root, *parts)
+        generate_site(root, SiteShape(pages, assets=0))
+        start = time.perf_counter()
+        generate_pages_incremental(path("content"), path("template.html"), path("docs"), "/",
+                                   path(".cache", "manifest.json"), os.cpu_count(),
+                                   graph_path=path(".cache", "dependencies.json"),
+                                   index_path=path(".cache", "site_index.json"),
+                                   metadata_path=path(".cache", "metadata.json"))
+        print(f"{pages} pages, full build in {time.perf_counter() - start:.1f} s")
+        edited = path("content", "page0", "index.md")
+        if not os.path.exists(edited):
+            edited = next(os.path.join(directory, "index.md") for directory, _, files in os.walk(path("content"))
+                          if "index.md" in files)
+
+        monitors = {"polling": TreeMonitor}
+        if libc is not None:
+            monitors["inotify"] = lambda content_dir: InotifyTreeMonitor(content_dir, libc)
+        print(f"{'monitor':<10}{'idle poll (ms)':>16}{'one edit, min (ms)':>20}{'median (ms)':>13}")
+        for name, monitor in monitors.items():
+            watcher = SiteWatcher(path("content"), path("static"), path("template.html"), path("docs"), "/",
+                                  path(".cache", "manifest.json"), graph_path=path(".cache", "dependencies.json"),
+                                  index_path=path(".cache", "site_index.json"),
+                                  metadata_path=path(".cache", "metadata.json"))
+            watcher.content.close()
+            watcher.content = monitor(path("content"))
+            idle = min(time_poll(watcher))
+            edits = time_poll(watcher, edited)
+            print(f"{name:<10}{idle * 1000:>16.3f}{min(edits) * 1000:>20.3f}{statistics.median(edits) * 1000:>13.3f}")
+            watcher.close()
+
+
+if __name__ == "__main__":
+    main()
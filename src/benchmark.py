@@ -0,0 +1,234 @@
+"""
+Build benchmark: generates a synthetic site and times every build phase separately. Results are printed
+(or written) as JSON so runs from different commits can be compared with --compare.
+
+Run from src/, e.g.: python3 benchmark.py --pages 2000 --depth 3 --output ../bench_output.txt
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from build_plan import make_plan
+from htmlnode import ParentNode
+from markdown_parser import (BlockType, block_to_block_type, block_to_html_node, line_to_textnodes,
+                             markdown_to_blocks, markdown_to_html)
+from page_generator import extract_title
+from static_sync import sync_tree
+from template import Template
+
+TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <title> {{ Title }} </title>
+    <link href="/index.css" rel="stylesheet">
+</head>
+<body>
+    <article>
+        {{ Content }}
+    </article>
+</body>
+</html>
+"""
+
+WORDS = ["tolkien", "hobbit", "ring", "elf", "dwarf", "wizard", "shire", "mordor", "river", "mountain",
+         "the", "a", "of", "and", "with", "under", "beyond", "quietly", "ancient", "golden"]
+
+INLINE_SPANS = [
+    lambda rng: f"**{rng.choice(WORDS)}**",
+    lambda rng: f"_{rng.choice(WORDS)}_",
+    lambda rng: f"`{rng.choice(WORDS)}()`",
+    lambda rng: f"[{rng.choice(WORDS)}](/{rng.choice(WORDS)})",
+    lambda rng: f"![{rng.choice(WORDS)}](/images/{rng.choice(WORDS)}.png)",
+]
+
+PHASES = ["plan", "make_directories", "sync_tree", "read", "markdown_to_blocks", "block_to_block_type",
+          "inline_parsing", "tree_building", "to_html", "fast_path", "template_substitution", "file_writes"]
+
+
+class SiteShape:
+    def __init__(self, pages: int = 500, depth: int = 2, blocks_per_page: int = 20, heading_weight: int = 2,
+                 paragraph_weight: int = 6, list_weight: int = 3, code_weight: int = 1, quote_weight: int = 1,
+                 inline_density: float = 0.2, assets: int = 20, asset_size: int = 64 * 1024, seed: int = 0):
+        """
+
+        :param pages: number of markdown pages
+        :param depth: directory depth pages are spread over
+        :param blocks_per_page: number of blocks after the title
+        :param inline_density: probability that a word is replaced by an inline span
+        :param assets: number of static files
+        :param asset_size: size of every static file in bytes
+        """
+        self.pages = pages
+        self.depth = depth
+        self.blocks_per_page = blocks_per_page
+        self.block_weights = {BlockType.HEADING: heading_weight, BlockType.PARAGRAPH: paragraph_weight,
+                              BlockType.UNORDERED: list_weight, BlockType.CODE: code_weight,
+                              BlockType.QUOTE: quote_weight}
+        self.inline_density = inline_density
+        self.assets = assets
+        self.asset_size = asset_size
+        self.seed = seed
+
+    def to_dict(self) -> dict:
+        shape = dict(vars(self))
+        shape["block_weights"] = {block_type.name: weight for block_type, weight in self.block_weights.items()}
+        return shape
+
+
+def synthetic_line(rng: random.Random, shape: SiteShape, words: int = 12) -> str:
+    parts = []
+    for _ in range(words):
+        if rng.random() < shape.inline_density:
+            parts.append(rng.choice(INLINE_SPANS)(rng))
+        else:
+            parts.append(rng.choice(WORDS))
+    return " ".join(parts)
+
+
+def synthetic_block(rng: random.Random, shape: SiteShape) -> str:
+    block_types = list(shape.block_weights)
+    block_type = rng.choices(block_types, weights=[shape.block_weights[t] for t in block_types])[0]
+    match block_type:
+        case BlockType.HEADING:
+            return f"{'#' * rng.randint(2, 4)} {' '.join(rng.choices(WORDS, k=4))}"
+        case BlockType.UNORDERED:
+            return "\n".join(f"- {synthetic_line(rng, shape, 6)}" for _ in range(rng.randint(2, 6)))
+        case BlockType.CODE:
+            lines = [f"{rng.choice(WORDS)} = {rng.randint(0, 100)}" for _ in range(rng.randint(2, 8))]
+            return "```\n" + "\n".join(lines) + "\n```"
+        case BlockType.QUOTE:
+            return "\n".join(f"> {' '.join(rng.choices(WORDS, k=8))}" for _ in range(rng.randint(1, 4)))
+        case _:
+            return "\n".join(synthetic_line(rng, shape) for _ in range(rng.randint(1, 4)))
+
+
+def generate_site(root: str, shape: SiteShape) -> None:
+    """
+    Writes content/, static/ and template.html for a synthetic site below root.
+    """
+    rng = random.Random(shape.seed)
+    for i in range(shape.pages):
+        directories = [f"section{rng.randrange(4)}" for _ in range(rng.randint(0, shape.depth))]
+        page_dir = os.path.join(root, "content", *directories, f"page{i}")
+        os.makedirs(page_dir, exist_ok=True)
+        blocks = [f"# Page {i} {rng.choice(WORDS)}"]
+        blocks.extend(synthetic_block(rng, shape) for _ in range(shape.blocks_per_page))
+        with open(os.path.join(page_dir, "index.md"), 'w') as f:
+            f.write("\n\n".join(blocks))
+    for i in range(shape.assets):
+        asset_dir = os.path.join(root, "static", "images", f"set{i % 8}")
+        os.makedirs(asset_dir, exist_ok=True)
+        with open(os.path.join(asset_dir, f"asset{i}.bin"), 'wb') as f:
+            f.write(rng.randbytes(shape.asset_size))
+    with open(os.path.join(root, "template.html"), 'w') as f:
+        f.write(TEMPLATE)
+
+
+class PhaseTimer:
+    def __init__(self):
+        self.totals = {phase: 0.0 for phase in PHASES}
+
+    def time(self, phase: str, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.totals[phase] += time.perf_counter() - start
+        return result
+
+
+def run_benchmark(root: str, basepath: str = "/") -> dict[str, float]:
+    timer = PhaseTimer()
+    static_dir = os.path.join(root, "static")
+    plan = timer.time("plan", make_plan, os.path.join(root, "content"), static_dir, os.path.join(root, "docs"))
+    timer.time("make_directories", plan.make_directories)
+    timer.time("sync_tree", sync_tree, static_dir, plan.dest_dir, os.path.join(root, ".cache", "static.json"), False,
+               False, plan.static_files())
+    template = Template.load(os.path.join(root, "template.html"), basepath)
+
+    for from_path, dest_path in plan.pages():
+        with open(from_path) as f:
+            markdown = timer.time("read", f.read)
+        blocks = timer.time("markdown_to_blocks", markdown_to_blocks, markdown)
+        block_types = timer.time("block_to_block_type", lambda: [block_to_block_type(b) for b in blocks])
+        inline_blocks = [b for b, t in zip(blocks, block_types)
+                         if t in (BlockType.PARAGRAPH, BlockType.UNORDERED, BlockType.ORDERED)]
+        timer.time("inline_parsing", lambda: [line_to_textnodes(line) for b in inline_blocks
+                                              for line in b.split("\n")])
+        tree = timer.time("tree_building", lambda: ParentNode(
+            "div", [block_to_html_node(b, t) for b, t in zip(blocks, block_types)]))
+        timer.time("to_html", tree.to_html)
+        content = timer.time("fast_path", markdown_to_html, markdown)
+        out_text = timer.time("template_substitution", template.render, extract_title(markdown), content)
+        timer.time("file_writes", write_text, dest_path, out_text)
+    return timer.totals
+
+
+def write_text(path: str, text: str) -> None:
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def compare(old: dict, new: dict) -> str:
+    lines = [f"{'phase':<24}{'old (s)':>10}{'new (s)':>10}{'ratio':>8}"]
+    for phase, new_time in new["phases"].items():
+        old_time = old["phases"].get(phase)
+        if old_time is None:
+            continue
+        ratio = new_time / old_time if old_time else float("inf")
+        lines.append(f"{phase:<24}{old_time:>10.4f}{new_time:>10.4f}{ratio:>8.2f}")
+    return "\n".join(lines)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Time every phase of a build on a synthetic site.")
+    defaults = SiteShape()
+    parser.add_argument("--pages", type=int, default=defaults.pages)
+    parser.add_argument("--depth", type=int, default=defaults.depth)
+    parser.add_argument("--blocks-per-page", type=int, default=defaults.blocks_per_page)
+    parser.add_argument("--block-mix", default="2,6,3,1,1",
+                        help="comma separated weights of heading,paragraph,list,code,quote blocks")
+    parser.add_argument("--inline-density", type=float, default=defaults.inline_density)
+    parser.add_argument("--assets", type=int, default=defaults.assets)
+    parser.add_argument("--asset-size", type=int, default=defaults.asset_size)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--output", help="write the JSON result to this file instead of stdout")
+    parser.add_argument("--compare", help="JSON result of an earlier run to compare against")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    heading, paragraph, lists, code, quote = (int(weight) for weight in args.block_mix.split(","))
+    shape = SiteShape(args.pages, args.depth, args.blocks_per_page, heading, paragraph, lists, code, quote,
+                      args.inline_density, args.assets, args.asset_size, args.seed)
+    with tempfile.TemporaryDirectory() as root:
+        generate_site(root, shape)
+        phases = run_benchmark(root)
+    result = {"commit": git_commit(), "python": platform.python_version(), "shape": shape.to_dict(),
+              "phases": phases}
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(json.load(f), result), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import mmap
+from typing import Callable, Iterator, TextIO
+
+from markdown_parser import normalize_block, render_block
+
+BLOCK_SEPARATOR = "\n\n"
+CHUNK_SIZE = 1 << 16
+
+
+def iter_raw_blocks(fp: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Yields the text between "\n\n" separators of a file object, exactly like markdown.split("\n\n"),
+    while only holding the current block and one chunk in memory.
+    """
+    pending: list[str] = []
+    while chunk := fp.read(chunk_size):
+        if pending and pending[-1].endswith("\n") and chunk.startswith("\n"):
+            # the separator straddles two chunks
+            pending[-1] = pending[-1][:-1]
+            yield "".join(pending)
+            pending = []
+            chunk = chunk[1:]
+        start = 0
+        index = chunk.find(BLOCK_SEPARATOR)
+        while index != -1:
+            pending.append(chunk[start:index])
+            yield "".join(pending)
+            pending = []
+            start = index + len(BLOCK_SEPARATOR)
+            index = chunk.find(BLOCK_SEPARATOR, start)
+        pending.append(chunk[start:])
+    yield "".join(pending)
+
+
+def iter_mmap_raw_blocks(path: str, offset: int = 0) -> Iterator[str]:
+    """
+    Same as iter_raw_blocks, but splits a memory-mapped UTF-8 file so only one decoded block exists at a time.
+    Files containing carriage returns are read through a text-mode file object instead, so newline translation
+    matches open(path, 'r').
+
+    :param offset: byte offset to start at, e.g. the end of the front matter
+    """
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            yield ""
+            return
+    with mapped:
+        if mapped.find(b"\r") != -1:
+            with open(path, 'r') as f:
+                f.seek(offset)
+                yield from iter_raw_blocks(f)
+            return
+        separator = BLOCK_SEPARATOR.encode()
+        start = offset
+        index = mapped.find(separator, start)
+        while index != -1:
+            yield mapped[start:index].decode("utf-8")
+            start = index + len(separator)
+            index = mapped.find(separator, start)
+        yield mapped[start:].decode("utf-8")
+
+
+def iter_blocks(fp: TextIO) -> Iterator[str]:
+    """
+    Streaming version of markdown_to_blocks.
+    """
+    for block in iter_raw_blocks(fp):
+        yield normalize_block(block)
+
+
+def iter_blocks_html(blocks: Iterator[str], render: Callable[[str], str] = render_block) -> Iterator[str]:
+    """
+    Streaming version of iter_markdown_html: renders one block at a time, so peak memory depends on the largest
+    block instead of on the document.
+    """
+    yield "<div>"
+    for block in blocks:
+        yield render(block)
+    yield "</div>"
+
+
+def iter_file_html(path: str, render: Callable[[str], str] = render_block, offset: int = 0) -> Iterator[str]:
+    return iter_blocks_html((normalize_block(block) for block in iter_mmap_raw_blocks(path, offset)), render)
+
+
+def extract_title_from_file(path: str, offset: int = 0) -> str:
+    """
+    Same as extract_title, but reads the file line by line and stops at the title.
+    """
+    with open(path, 'r') as f:
+        f.seek(offset)
+        for line in f:
+            if line.startswith('# '):
+                return line.rstrip("\n").strip("#").strip()
+    raise ValueError("No title found.")
@@ -0,0 +1,184 @@
+import json
+import os
+
+from output_writer import OutputWriter
+from page_generator import page_output_path
+
+Snapshot = dict[str, tuple[int, int]]
+
+MKDIR = "mkdir"
+RENDER = "render"
+COPY = "copy"
+DELETE = "delete"
+
+
+def snapshot_tree(root: str) -> Snapshot:
+    """
+    Maps every file below root (relative path) to its (mtime_ns, size), using the stat data os.scandir already has.
+    """
+    files: Snapshot = {}
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.is_dir():
+                stack.append(entry.path)
+            elif entry.is_file():
+                stat = entry.stat()
+                files[os.path.relpath(entry.path, root)] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+class PlanAction:
+    __slots__ = ("kind", "dest", "source", "stat")
+
+    def __init__(self, kind: str, dest: str, source: str = None, stat: tuple[int, int] = None):
+        """
+
+        :param kind: MKDIR, RENDER, COPY or DELETE
+        :param dest: the output path, relative to the destination directory
+        :param source: for RENDER and COPY, the input path relative to the content or static directory
+        :param stat: the (mtime_ns, size) of the source when the plan was made
+        """
+        self.kind = kind
+        self.dest = dest
+        self.source = source
+        self.stat = stat
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "dest": self.dest, "source": self.source,
+                "stat": list(self.stat) if self.stat is not None else None}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PlanAction":
+        stat = data.get("stat")
+        return cls(data["kind"], data["dest"], data.get("source"), tuple(stat) if stat is not None else None)
+
+    def __eq__(self, other: "PlanAction") -> bool:
+        return (self.kind == other.kind and self.dest == other.dest and self.source == other.source
+                and self.stat == other.stat)
+
+    def __str__(self) -> str:
+        if self.source is None:
+            return f"{self.kind:<7} {self.dest}"
+        return f"{self.kind:<7} {self.source} -> {self.dest}"
+
+    def __repr__(self) -> str:
+        return f"PlanAction({self.kind=}, {self.dest=}, {self.source=}, {self.stat=})"
+
+
+class BuildPlan:
+    def __init__(self, content_dir: str, static_dir: str, dest_dir: str, actions: list[PlanAction] = None):
+        """
+        The explicit list of actions a build performs: the directories to create, the pages to render, the static
+        files to copy and the outputs of the previous build to delete. Paths in actions are relative to the
+        content, static and destination directories.
+        """
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.dest_dir = dest_dir
+        self.actions = actions if actions is not None else []
+
+    @classmethod
+    def load(cls, path: str) -> "BuildPlan | None":
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return cls(data["content_dir"], data["static_dir"], data["dest_dir"],
+                   [PlanAction.from_dict(action) for action in data["actions"]])
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {"content_dir": self.content_dir, "static_dir": self.static_dir, "dest_dir": self.dest_dir,
+                "actions": [action.to_dict() for action in self.actions if action.kind != DELETE]}
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=1)
+
+    def actions_of(self, kind: str) -> list[PlanAction]:
+        return [action for action in self.actions if action.kind == kind]
+
+    def outputs(self) -> dict[str, PlanAction]:
+        """
+        :return: maps the output path of every RENDER and COPY action to the action
+        """
+        return {action.dest: action for action in self.actions if action.kind in (RENDER, COPY)}
+
+    def pages(self) -> list[tuple[str, str]]:
+        """
+        :return: the (source, destination) path pairs of the RENDER actions, as collect_pages returns them
+        """
+        return [(os.path.join(self.content_dir, action.source), os.path.join(self.dest_dir, action.dest))
+                for action in self.actions_of(RENDER)]
+
+    def static_files(self) -> list[str]:
+        return [action.source for action in self.actions_of(COPY)]
+
+    def make_directories(self) -> None:
+        os.makedirs(self.dest_dir, exist_ok=True)
+        for action in self.actions_of(MKDIR):
+            os.makedirs(os.path.join(self.dest_dir, action.dest), exist_ok=True)
+
+    def remove_stale(self, writer: OutputWriter = None) -> list[str]:
+        """
+        Runs the DELETE actions.
+
+        :return: the removed output paths
+        """
+        writer = writer if writer is not None else OutputWriter()
+        removed = []
+        for action in self.actions_of(DELETE):
+            path = os.path.join(self.dest_dir, action.dest)
+            if writer.delete(path):
+                removed.append(path)
+        return removed
+
+    def diff(self, previous: "BuildPlan | None") -> dict[str, list[str]]:
+        """
+        :return: the sorted output paths that are "added", "removed" or "changed" (different source, or the source
+        was modified) compared to the previous plan
+        """
+        outputs = self.outputs()
+        previous_outputs = previous.outputs() if previous is not None else {}
+        return {"added": sorted(outputs.keys() - previous_outputs.keys()),
+                "removed": sorted(previous_outputs.keys() - outputs.keys()),
+                "changed": sorted(dest for dest, action in outputs.items()
+                                  if dest in previous_outputs and previous_outputs[dest] != action)}
+
+    def format(self) -> str:
+        return "\n".join(str(action) for action in self.actions)
+
+    def __repr__(self) -> str:
+        counts = ", ".join(f"{kind}={len(self.actions_of(kind))}" for kind in (MKDIR, RENDER, COPY, DELETE))
+        return f"BuildPlan({self.dest_dir=}, {counts})"
+
+
+def make_plan(content_dir: str, static_dir: str, dest_dir: str, previous: BuildPlan = None) -> BuildPlan:
+    """
+    Walks content_dir and static_dir once with os.scandir and plans a build into dest_dir. Every directory an
+    output needs gets one MKDIR action ahead of all RENDER and COPY actions; outputs of the previous plan that
+    are no longer produced get a DELETE action.
+    """
+    content = snapshot_tree(content_dir)
+    static = snapshot_tree(static_dir)
+    renders = [PlanAction(RENDER, page_output_path(source), source, content[source]) for source in sorted(content)]
+    copies = [PlanAction(COPY, source, source, static[source]) for source in sorted(static)]
+    directories = {os.path.dirname(action.dest) for action in renders + copies}
+    directories.discard("")
+    plan = BuildPlan(content_dir, static_dir, dest_dir)
+    plan.actions.extend(PlanAction(MKDIR, directory) for directory in sorted(directories))
+    plan.actions.extend(renders)
+    plan.actions.extend(copies)
+    if previous is not None:
+        outputs = plan.outputs()
+        plan.actions.extend(PlanAction(DELETE, dest) for dest in sorted(previous.outputs().keys() - outputs.keys()))
+    return plan
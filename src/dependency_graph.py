@@ -0,0 +1,141 @@
+import json
+import os
+import posixpath
+import re
+from typing import Iterable
+from urllib.parse import unquote, urlsplit
+
+from markdown_parser import Reference
+
+_TEMPLATE_REFERENCE_PATTERN = re.compile(r'(href|src)="([^"]*)"')
+
+
+def template_references(text: str) -> list[Reference]:
+    """
+    :return: the (attribute, url) of every href and src attribute in a template, e.g. its stylesheet
+    """
+    return [(match.group(1), match.group(2)) for match in _TEMPLATE_REFERENCE_PATTERN.finditer(text)]
+
+
+def url_to_output(url: str, page_output: str = "") -> str | None:
+    """
+    Resolves the URL of a link or image to the output file it points to, relative to the destination directory:
+    "/blog/tom" becomes "blog/tom/index.html", "/images/tom.png" stays "images/tom.png".
+
+    :param page_output: output path of the page the URL appears on, used to resolve relative URLs
+    :return: None for external URLs and links to a fragment of the same page
+    """
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = unquote(parts.path)
+    if not path.startswith("/"):
+        path = posixpath.join("/", posixpath.dirname(page_output.replace(os.sep, "/")), path)
+    target = posixpath.normpath(path).lstrip("/")
+    if path.endswith("/") or not posixpath.splitext(target)[1]:
+        target = posixpath.join(target, "index.html")
+    return target
+
+
+class DependencyGraph:
+    def __init__(self, pages: dict[str, dict] = None, templates: dict[str, dict] = None):
+        """
+
+        :param pages: maps a source path (relative to the content directory) to a dict holding its "output" path
+        (relative to the destination directory), the "template" it was rendered with and the "references"
+        ([attribute, url] pairs) of its links and images
+        :param templates: maps a template path to a dict holding the "references" of the template itself and the
+        "partials" it includes
+        """
+        self.pages = pages if pages is not None else {}
+        self.templates = templates if templates is not None else {}
+
+    @classmethod
+    def load(cls, path: str) -> "DependencyGraph":
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        return cls(data.get("pages", {}), data.get("templates", {}))
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # without indent, json.dumps uses the C encoder: saving is then cheap enough for every watch-mode rebuild
+        with open(path, 'w') as f:
+            f.write(json.dumps({"pages": self.pages, "templates": self.templates}, sort_keys=True))
+
+    def add_page(self, source: str, output: str, template: str, references: Iterable[Reference]) -> None:
+        self.pages[source] = {"output": output, "template": os.path.normpath(template),
+                              "references": [list(reference) for reference in references]}
+
+    def remove_page(self, source: str) -> None:
+        self.pages.pop(source, None)
+
+    def add_template(self, template: str, references: Iterable[Reference], partials: Iterable[str] = ()) -> None:
+        self.templates[os.path.normpath(template)] = {"references": [list(reference) for reference in references],
+                                                      "partials": [os.path.normpath(partial) for partial in partials]}
+
+    def template_files(self) -> set[str]:
+        """
+        :return: every template and partial the pages depend on
+        """
+        return set(self.templates).union(*(entry.get("partials", ()) for entry in self.templates.values()))
+
+    def referrers(self) -> dict[str, set[str]]:
+        """
+        :return: maps every referenced output path to the sources of the pages that link to or embed it,
+        directly or through their template
+        """
+        pages_by_template: dict[str, list[str]] = {}
+        for source, entry in self.pages.items():
+            pages_by_template.setdefault(entry["template"], []).append(source)
+        index: dict[str, set[str]] = {}
+        for source, entry in self.pages.items():
+            for _, url in entry["references"]:
+                target = url_to_output(url, entry["output"])
+                if target is not None:
+                    index.setdefault(target, set()).add(source)
+        for template, entry in self.templates.items():
+            for _, url in entry["references"]:
+                target = url_to_output(url)
+                if target is not None:
+                    index.setdefault(target, set()).update(pages_by_template.get(template, ()))
+        return index
+
+    def affected_pages(self, sources: Iterable[str] = (), templates: Iterable[str] = (),
+                       assets: Iterable[str] = ()) -> list[str]:
+        """
+        Finds the pages depending on changed files: a changed page itself and the pages linking to it, every page
+        rendered with a changed template or with a template including a changed partial, and the pages (or
+        templates) referencing a changed static file.
+
+        :param sources: changed, added or removed source paths, relative to the content directory
+        :param templates: changed template or partial paths
+        :param assets: changed static files, relative to the static directory
+        :return: the sorted source paths of the affected pages
+        """
+        referrers = self.referrers()
+        affected: set[str] = set()
+        for source in sources:
+            affected.add(source)
+            entry = self.pages.get(source)
+            output = entry["output"] if entry is not None else os.path.splitext(source)[0] + ".html"
+            affected.update(referrers.get(output.replace(os.sep, "/"), ()))
+        templates = {os.path.normpath(template) for template in templates}
+        templates.update(template for template, entry in self.templates.items()
+                         if templates.intersection(entry.get("partials", ())))
+        affected.update(source for source, entry in self.pages.items() if entry["template"] in templates)
+        for asset in assets:
+            affected.update(referrers.get(asset.replace(os.sep, "/"), ()))
+        return sorted(affected)
+
+    def __eq__(self, other: "DependencyGraph") -> bool:
+        return self.pages == other.pages and self.templates == other.templates
+
+    def __repr__(self) -> str:
+        return f"DependencyGraph(pages={len(self.pages)}, templates={len(self.templates)})"
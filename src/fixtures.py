@@ -0,0 +1,28 @@
+"""
+Helpers shared by the test modules.
+"""
+import itertools
+import os
+import time
+
+_mtime_offsets = itertools.count(1)
+
+
+def write_file(path: str, text: str, bump_mtime: bool = False) -> None:
+    """
+    Writes text to path, creating the missing directories.
+
+    :param bump_mtime: set the mtime to a later time than any earlier bumped write, so every write is seen as a
+    change, even on filesystems with coarse timestamps
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+    if bump_mtime:
+        future = time.time() + next(_mtime_offsets)
+        os.utime(path, (future, future))
+
+
+def read_file(path: str) -> str:
+    with open(path) as f:
+        return f.read()
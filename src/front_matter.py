@@ -0,0 +1,150 @@
+import json
+import os
+from datetime import date
+
+FRONT_MATTER_DELIMITER = "---"
+
+
+def _parse_bool(value: str) -> bool:
+    if value.lower() in ("true", "yes", "1"):
+        return True
+    if value.lower() in ("false", "no", "0"):
+        return False
+    raise ValueError(f"expected true or false, got '{value}'")
+
+
+def _parse_tags(value: str) -> list[str]:
+    return [tag.strip() for tag in value.split(",") if tag.strip()]
+
+
+def _parse_date(value: str) -> str:
+    # validated, but kept as an ISO string so the metadata stays JSON
+    return date.fromisoformat(value).isoformat()
+
+
+_CONVERTERS = {"draft": _parse_bool, "tags": _parse_tags, "sort": int, "date": _parse_date}
+
+
+def parse_header_line(line: str, metadata: dict) -> None:
+    """
+    Adds one "key: value" line of a front matter block to metadata. Known keys are converted: draft to a bool,
+    tags (comma separated) to a list, sort to an int and date (YYYY-MM-DD) is validated; others stay strings.
+    """
+    line = line.strip()
+    if not line:
+        return
+    key, separator, value = line.partition(":")
+    key = key.strip().lower()
+    if not separator or not key:
+        raise ValueError(f"Invalid front matter line: '{line}'")
+    value = value.strip()
+    try:
+        metadata[key] = _CONVERTERS[key](value) if key in _CONVERTERS else value
+    except ValueError as e:
+        raise ValueError(f"Invalid front matter value for {key}: {e}")
+
+
+def split_front_matter(markdown: str) -> tuple[dict, str]:
+    """
+    Splits a document into the metadata of its front matter, a block of "key: value" lines between two "---"
+    lines at the very top, and the markdown body after it.
+
+    :return: the metadata ({} if the document has no front matter) and the body
+    """
+    if markdown.split("\n", 1)[0].rstrip() != FRONT_MATTER_DELIMITER:
+        return {}, markdown
+    metadata: dict = {}
+    pos = markdown.index("\n") + 1 if "\n" in markdown else len(markdown)
+    while pos < len(markdown):
+        end = markdown.find("\n", pos)
+        end = len(markdown) if end == -1 else end
+        line = markdown[pos:end]
+        pos = end + 1
+        if line.rstrip() == FRONT_MATTER_DELIMITER:
+            return metadata, markdown[pos:]
+        parse_header_line(line, metadata)
+    raise ValueError("Front matter is not closed by '---'.")
+
+
+def read_front_matter(path: str) -> tuple[dict, int]:
+    """
+    Same as split_front_matter, but only reads the front matter of the file, not the body.
+
+    :return: the metadata and the byte offset at which the body starts
+    """
+    with open(path, 'rb') as f:
+        first = f.readline()
+        if first.decode("utf-8").rstrip() != FRONT_MATTER_DELIMITER:
+            return {}, 0
+        metadata: dict = {}
+        for line in f:
+            if line.decode("utf-8").rstrip() == FRONT_MATTER_DELIMITER:
+                return metadata, f.tell()
+            parse_header_line(line.decode("utf-8"), metadata)
+    raise ValueError("Front matter is not closed by '---'.")
+
+
+def sort_key(metadata: dict) -> tuple[int, int]:
+    """
+    Listings are ordered by ascending "sort" (0 if missing), then newest "date" first; pages without a date
+    come after dated ones.
+    """
+    page_date = metadata.get("date")
+    return metadata.get("sort", 0), -date.fromisoformat(page_date).toordinal() if page_date else 0
+
+
+class MetadataIndex:
+    def __init__(self, pages: dict[str, dict] = None):
+        """
+
+        :param pages: maps a source path (relative to the content directory) to a dict holding the "hash" of the
+        source and the "metadata" of its front matter
+        """
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def load(cls, path: str) -> "MetadataIndex":
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        return cls(data.get("pages", {}))
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(json.dumps({"pages": self.pages}, sort_keys=True))
+
+    def metadata(self, source: str, from_path: str, source_hash: str) -> dict:
+        """
+        :return: the metadata of a source, read from its front matter only if the source changed since it was
+        indexed
+        """
+        entry = self.pages.get(source)
+        if entry is None or entry["hash"] != source_hash:
+            entry = {"hash": source_hash, "metadata": read_front_matter(from_path)[0]}
+            self.pages[source] = entry
+        return entry["metadata"]
+
+    def remove_page(self, source: str) -> None:
+        self.pages.pop(source, None)
+
+    def select(self, tag: str = None, drafts: bool = False) -> list[str]:
+        """
+        :return: the sources having tag (any tag if None), without drafts unless drafts is set, in listing order
+        """
+        sources = [source for source, entry in self.pages.items()
+                   if (tag is None or tag in entry["metadata"].get("tags", ()))
+                   and (drafts or not entry["metadata"].get("draft", False))]
+        return sorted(sources, key=lambda source: (sort_key(self.pages[source]["metadata"]), source))
+
+    def __eq__(self, other: "MetadataIndex") -> bool:
+        return self.pages == other.pages
+
+    def __repr__(self) -> str:
+        return f"MetadataIndex(pages={len(self.pages)})"
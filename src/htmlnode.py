@@ -1,9 +1,11 @@
-from typing import Self
+from typing import Iterator, Self, TextIO
 
 from textnode import TextNode, TextType
 
 
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag: str = None, value: str = None, children: list[Self] = None, props: dict[str, str] = None):
         """
 
@@ -18,16 +20,20 @@ class HTMLNode:
         self.children = children
         self.props = props
 
-    def to_html(self):
+    def iter_html(self) -> Iterator[str]:
         raise NotImplementedError()
 
+    def to_html(self) -> str:
+        return "".join(self.iter_html())
+
+    def write_html(self, fp: TextIO) -> None:
+        for chunk in self.iter_html():
+            fp.write(chunk)
+
     def props_to_html(self) -> str:
-        html_props = ""
         if not self.props:
-            return html_props
-        for prop, value in self.props.items():
-            html_props += f' {prop}="{value}"'
-        return html_props
+            return ""
+        return "".join([f' {prop}="{value}"' for prop, value in self.props.items()])
 
     def __repr__(self) -> str:
         return f"HTMLNode({self.tag=}, {self.value=}, children={len(self.children)}, props={self.props_to_html()})"
@@ -45,9 +51,14 @@ class HTMLNode:
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str | None, value: str, props: dict[str, str] = None):
         super().__init__(tag=tag, value=value, props=props)
 
+    def iter_html(self) -> Iterator[str]:
+        yield self.to_html()
+
     def to_html(self) -> str:
         if not self.tag:
             if not self.value:
@@ -62,16 +73,31 @@ class LeafNode(HTMLNode):
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, children: list[HTMLNode], props: dict[str, str] = None):
         super().__init__(tag, children=children, props=props)
 
-    def to_html(self) -> str:
-        if not self.tag:
-            raise ValueError("Tag required in ParentNode.")
-        if not self.children or len(self.children) == 0:
-            raise ValueError("Children required in ParentNode.")
-        inner_text = "".join(list(map(lambda x: x.to_html(), self.children)))
-        return f"<{self.tag}{self.props_to_html()}>{inner_text}</{self.tag}>"
+    def iter_html(self) -> Iterator[str]:
+        """
+        Yields the markup of this node and its descendants chunk by chunk. The tree is walked with an explicit
+        stack, so no chunk is copied into its ancestors and deep trees do not nest generators.
+        """
+        stack: list[HTMLNode | str] = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield node
+            elif isinstance(node, ParentNode):
+                if not node.tag:
+                    raise ValueError("Tag required in ParentNode.")
+                if not node.children or len(node.children) == 0:
+                    raise ValueError("Children required in ParentNode.")
+                yield f"<{node.tag}{node.props_to_html()}>"
+                stack.append(f"</{node.tag}>")
+                stack.extend(reversed(node.children))
+            else:
+                yield from node.iter_html()
 
 
 def text_node_to_html_node(text_node: TextNode) -> LeafNode:
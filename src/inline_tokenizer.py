@@ -0,0 +1,274 @@
+import re
+import unicodedata
+from enum import Enum, auto
+from typing import Iterator
+
+from textnode import TextNode, TextType
+
+# a list item marker and the text after it, matched at the start of a line
+LIST_ITEM_PATTERN = re.compile(r"((\*|-|\d+\.) )(.*)")
+_INLINE_MARKUP_PATTERN = re.compile(r"\*+|_+|`+|!?\[|]")
+_BACKTICK_RUN_PATTERN = re.compile(r"`+")
+_PAREN_PATTERN = re.compile(r"[()]")
+
+InlineToken = tuple[str, TextType, str | None]
+# (start, end, TextType.LINK or TextType.IMAGE, text, url) of a link or image, e.g. (4, 21, TextType.LINK,
+# "contact", "/contact") for "See [contact](/contact)."
+LinkSpan = tuple[int, int, TextType, str, str]
+
+
+class Boundary(Enum):
+    OPEN = auto()
+    CLOSE = auto()
+
+
+# A leaf token, or (Boundary.OPEN or Boundary.CLOSE, TextType.BOLD or TextType.ITALIC, None) around the events
+# of an emphasis span. Spans are always properly nested.
+InlineEvent = tuple[str | Boundary, TextType, str | None]
+
+
+class _DelimiterRun:
+    __slots__ = ("char", "length", "count", "can_open", "can_close", "opens", "closes")
+
+    def __init__(self, char: str, length: int, can_open: bool, can_close: bool):
+        self.char = char
+        self.length = length
+        self.count = length     # characters not used by a span yet; they end up as literal text
+        self.can_open = can_open
+        self.can_close = can_close
+        self.opens: list[TextType] = []     # spans this run opens, innermost first
+        self.closes: list[TextType] = []    # spans this run closes, innermost first
+
+
+def _is_punctuation(char: str) -> bool:
+    return unicodedata.category(char)[0] in "PS"
+
+
+def _delimiter_run(text: str, start: int, end: int) -> _DelimiterRun:
+    """
+    Classifies the run of "*" or "_" at text[start:end] with the flanking rules of CommonMark: a run can open
+    emphasis if it is not followed by whitespace, and close it if it is not preceded by whitespace. An "_"
+    between two letters or digits, as in snake_case_names, can do neither.
+    """
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    left_flanking = not after.isspace() and (not _is_punctuation(after) or before.isspace()
+                                             or _is_punctuation(before))
+    right_flanking = not before.isspace() and (not _is_punctuation(before) or after.isspace()
+                                               or _is_punctuation(after))
+    if text[start] == "_":
+        return _DelimiterRun("_", end - start, left_flanking and (not right_flanking or _is_punctuation(before)),
+                             right_flanking and (not left_flanking or _is_punctuation(after)))
+    return _DelimiterRun("*", end - start, left_flanking, right_flanking)
+
+
+def _can_pair(opener: _DelimiterRun, closer: _DelimiterRun) -> bool:
+    if opener.char != closer.char:
+        return False
+    # the "rule of 3": a run that could both open and close only pairs with one whose length fits, so
+    # "*a**b*" is one italic span and not two
+    if opener.can_close or closer.can_open:
+        return (opener.length + closer.length) % 3 != 0 or (opener.length % 3 == 0 and closer.length % 3 == 0)
+    return True
+
+
+def _close_spans(closer: _DelimiterRun, openers: list[_DelimiterRun],
+                 openers_bottom: dict[tuple[str, bool, int], int]) -> None:
+    """
+    Pairs closer with the nearest fitting runs on the openers stack, innermost span first. Openers between a
+    pair are dropped from the stack, so their characters stay literal and spans never cross.
+
+    :param openers_bottom: for each kind of closer, how many runs at the bottom of the stack are known not to
+    fit it, so no run is looked at twice by the same kind of closer and the whole scan stays linear
+    """
+    key = (closer.char, closer.can_open, closer.length % 3)
+    while closer.count:
+        bottom = openers_bottom.get(key, 0)
+        index = len(openers) - 1
+        while index >= bottom and not _can_pair(openers[index], closer):
+            index -= 1
+        if index < bottom:
+            openers_bottom[key] = len(openers)
+            return
+        opener = openers[index]
+        used = 2 if opener.count >= 2 and closer.count >= 2 else 1
+        text_type = TextType.BOLD if used == 2 else TextType.ITALIC
+        opener.opens.append(text_type)
+        closer.closes.append(text_type)
+        opener.count -= used
+        closer.count -= used
+        del openers[index if opener.count == 0 else index + 1:]
+        for other, other_bottom in openers_bottom.items():
+            openers_bottom[other] = min(other_bottom, len(openers))
+
+
+def _code_span_ends(text: str) -> dict[int, tuple[int, int]]:
+    """
+    :return: maps the start of every backtick run to the (start, end) of the next run of the same length, the
+    one that would close a code span opened there
+    """
+    ends: dict[int, tuple[int, int]] = {}
+    next_run: dict[int, tuple[int, int]] = {}
+    for match in reversed(list(_BACKTICK_RUN_PATTERN.finditer(text))):
+        length = match.end() - match.start()
+        if length in next_run:
+            ends[match.start()] = next_run[length]
+        next_run[length] = match.span()
+    return ends
+
+
+def _matching_parens(text: str) -> dict[int, int]:
+    """
+    :return: maps the position of every "(" to the position of the ")" that balances it
+    """
+    matches: dict[int, int] = {}
+    open_parens: list[int] = []
+    for match in _PAREN_PATTERN.finditer(text):
+        if match.group() == "(":
+            open_parens.append(match.start())
+        elif open_parens:
+            matches[open_parens.pop()] = match.start()
+    return matches
+
+
+def _scan_inline(text: str) -> tuple[list[str | _DelimiterRun | InlineToken], list[LinkSpan]]:
+    """
+    Splits text into literal text, delimiter runs and the tokens of code spans, links and images in a single
+    left-to-right scan. Every "]" is matched against the nearest open "[" or "![" on a stack, so link text may
+    hold balanced brackets, and the url runs to the ")" balancing its "(", so it may hold parentheses. Nothing
+    is searched for twice: code span ends and balancing parentheses are looked up in tables built in one pass.
+
+    :return: the parts, and the position of every link and image found
+    """
+    parts: list[str | _DelimiterRun | InlineToken] = []
+    spans: list[LinkSpan] = []
+    # (index in parts, start of the bracket, start of the link text, is an image) of every open bracket
+    brackets: list[tuple[int, int, int, bool]] = []
+    links_end = 0   # links may not contain links, so a "[" before the end of the last link cannot open one
+    code_span_ends = _code_span_ends(text) if "`" in text else {}
+    parens = _matching_parens(text) if "](" in text else {}
+    pos = 0
+    for match in _INLINE_MARKUP_PATTERN.finditer(text):
+        start, end = match.span()
+        if start < pos:     # inside a code span or a link destination
+            continue
+        parts.append(text[pos:start])
+        pos = end
+        markup = match.group()
+        if markup[0] == "`":
+            if start in code_span_ends:
+                code_end, pos = code_span_ends[start]
+                parts.append((text[end:code_end], TextType.CODE, None))
+            else:
+                parts.append(markup)
+        elif markup[-1] == "[":
+            brackets.append((len(parts), start, end, markup == "!["))
+            parts.append(markup)
+        elif markup == "]":
+            if not brackets:
+                parts.append(markup)
+                continue
+            index, span_start, text_start, is_image = brackets.pop()
+            url_end = parens.get(end, end + 1)  # the url may not be empty
+            if url_end <= end + 1 or (not is_image and span_start < links_end):
+                parts.append(markup)
+                continue
+            span_type = TextType.IMAGE if is_image else TextType.LINK
+            span_text, url = text[text_start:start], text[end + 1:url_end]
+            # the link text is kept as written, so whatever was found inside it is dropped
+            del parts[index:]
+            while spans and spans[-1][0] > span_start:
+                spans.pop()
+            parts.append((span_text, span_type, url))
+            pos = url_end + 1
+            spans.append((span_start, pos, span_type, span_text, url))
+            if not is_image:
+                links_end = pos
+        else:
+            parts.append(_delimiter_run(text, start, end))
+    parts.append(text[pos:])
+    return parts, spans
+
+
+def find_link_spans(text: str) -> list[LinkSpan]:
+    """
+    :return: the links and images in text, in order, with their positions; code spans are skipped and an image
+    inside the text of a link is part of the link, not a span of its own
+    """
+    return _scan_inline(text)[1]
+
+
+def _parse_delimiters(text: str) -> list[str | _DelimiterRun | InlineToken]:
+    """
+    Scans text with _scan_inline, then pairs the delimiter runs left outside code spans and links into
+    emphasis spans with a stack.
+    """
+    parts = _scan_inline(text)[0]
+    openers: list[_DelimiterRun] = []
+    openers_bottom: dict[tuple[str, bool, int], int] = {}
+    for run in parts:
+        if not isinstance(run, _DelimiterRun):
+            continue
+        if run.can_close:
+            _close_spans(run, openers, openers_bottom)
+        if run.count and run.can_open:
+            openers.append(run)
+    return parts
+
+
+def _iter_text(literal: list[str]) -> Iterator[InlineToken]:
+    text = "".join(literal)
+    literal.clear()
+    if text:
+        yield text, TextType.TEXT, None
+
+
+def iter_inline_events(line: str) -> Iterator[InlineEvent]:
+    """
+    Parses one line of markdown in linear time. Delimiters that do not pair up, like the underscores in
+    snake_case_names or a lone "**", are kept as literal text, and emphasis may nest, as in
+    "_italic with **bold** inside_". Links and images take precedence over emphasis; their text is kept as
+    written.
+    """
+    list_item = LIST_ITEM_PATTERN.match(line)
+    if list_item:
+        line = list_item.group(3).strip()
+    literal: list[str] = []
+    for part in _parse_delimiters(line):
+        if isinstance(part, str):
+            literal.append(part)
+            continue
+        if isinstance(part, tuple) or part.closes:
+            yield from _iter_text(literal)
+        if isinstance(part, tuple):
+            yield part
+            continue
+        for text_type in part.closes:
+            yield Boundary.CLOSE, text_type, None
+        literal.append(part.char * part.count)
+        if part.opens:
+            yield from _iter_text(literal)
+        for text_type in reversed(part.opens):
+            yield Boundary.OPEN, text_type, None
+    yield from _iter_text(literal)
+
+
+def iter_inline_tokens(line: str) -> Iterator[InlineToken]:
+    """
+    Same as iter_inline_events, but yields flat (text, text_type, url) tuples: text inside nested emphasis
+    gets the type of the innermost span.
+    """
+    spans: list[TextType] = []
+    for text, text_type, url in iter_inline_events(line):
+        if text is Boundary.OPEN:
+            spans.append(text_type)
+        elif text is Boundary.CLOSE:
+            spans.pop()
+        elif text_type == TextType.TEXT and spans:
+            yield text, spans[-1], None
+        else:
+            yield text, text_type, url
+
+
+def tokenize_line(line: str) -> list[TextNode]:
+    return [TextNode(text, text_type, url) for text, text_type, url in iter_inline_tokens(line)]
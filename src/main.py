@@ -1,35 +1,210 @@
+import argparse
+import logging
 import os
-import shutil
 import sys
 
-from page_generator import generate_pages_recursive
+from build_plan import COPY, RENDER, BuildPlan, make_plan
+from dependency_graph import DependencyGraph
+from output_writer import SIDECAR_EXTENSION, OutputWriter, remove_sidecar
+from page_generator import BuildError, generate_pages_incremental
+from postprocess import minify_html, postprocess_outputs
+from profiling import profiler
+from render_cache import RenderCache
+from sharding import ShardMergeError, build_shard, merge_shards, parse_shard
+from site_index import SiteIndex, emit_site_files
+from static_sync import sync_tree
+from template import Template
+from watch import SiteWatcher, watch
 
+MANIFEST_PATH = "../.cache/manifest.json"
+STATIC_STATE_PATH = "../.cache/static.json"
+TRACE_PATH = "../.cache/trace.json"
+RENDER_CACHE_PATH = "../.cache/render_cache.json"
+GRAPH_PATH = "../.cache/dependencies.json"
+PLAN_PATH = "../.cache/plan.json"
+POSTPROCESS_STATE_PATH = "../.cache/postprocess.json"
+SHARDS_DIR = "../.cache/shards"
+INDEX_PATH = "../.cache/site_index.json"
+METADATA_PATH = "../.cache/metadata.json"
 
-def copy_recursively(src: str, dest: str) -> None:
-    if os.path.exists(dest):
-        shutil.rmtree(dest)
-    os.makedirs(dest)
-    objects = os.listdir(src)
-    for obj in objects:
-        src_path = os.path.join(src, obj)
-        dst_path = os.path.join(dest, obj)
-        if os.path.isfile(src_path):
-            print(f"copying file {obj} from {src} to {dest}")
-            shutil.copy(src_path, dst_path)
-        elif os.path.isdir(src_path):
-            print(f"copying directory {obj} from {src} to {dest}")
-            copy_recursively(src_path, dst_path)
+logger = logging.getLogger(__name__)
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate the static site from content/ into docs/.")
+    parser.add_argument("basepath", nargs="?", default="/", help="path prefix the site is served under")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only regenerate pages whose source, template or basepath changed")
+    workers = parser.add_mutually_exclusive_group()
+    workers.add_argument("--jobs", "-j", type=int, default=1,
+                         help="number of worker processes used to render pages (0 = one per CPU core)")
+    workers.add_argument("--async-io", type=int, default=0, metavar="N",
+                         help="build pages in an asyncio pipeline that keeps up to N reads and N writes in flight, "
+                              "for slow or network filesystems")
+    parser.add_argument("--drafts", action="store_true",
+                        help="also build pages whose front matter has draft: true")
+    parser.add_argument("--hash-assets", action="store_true",
+                        help="detect changed static files by content hash instead of size and mtime")
+    parser.add_argument("--link-assets", action="store_true",
+                        help="hardlink static files into the output instead of copying them")
+    parser.add_argument("--minify", action="store_true",
+                        help="collapse whitespace in generated HTML, leaving <pre> and <code> untouched")
+    parser.add_argument("--precompress", action="store_true",
+                        help="write a .gz sidecar next to every page and text asset for servers that serve them")
+    parser.add_argument("--site-url", metavar="URL",
+                        help="scheme and host the site is served from, e.g. https://example.com; writes sitemap.xml, "
+                             "an Atom feed.xml and listing pages for directories of pages without an index page")
+    parser.add_argument("--feed-dir", default="blog",
+                        help="output directory whose pages --site-url puts in the feed (\"\" for all pages)")
+    parser.add_argument("--watch", action="store_true",
+                        help="after building, serve docs/ and rebuild changed pages and static files on the fly")
+    parser.add_argument("--port", type=int, default=8888, help="port used by --watch to serve docs/")
+    parser.add_argument("--render-cache-size", type=int, default=4096,
+                        help="number of rendered blocks kept in the render cache (0 disables it)")
+    parser.add_argument("--persist-render-cache", action="store_true",
+                        help="load the render cache from and save it to .cache/ between builds")
+    parser.add_argument("--shard", type=parse_shard, metavar="K/N",
+                        help="only render the pages of shard K of N into the shard directory, for distributed builds")
+    parser.add_argument("--merge-shards", type=int, metavar="N",
+                        help="build docs/ from the outputs of shards 1/N to N/N instead of rendering pages")
+    parser.add_argument("--shard-dir", default=SHARDS_DIR,
+                        help="directory holding the output tree and manifest of every shard")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print the build plan and how it differs from the previous build, without building")
+    parser.add_argument("--affected", nargs="+", metavar="PATH",
+                        help="print the pages affected by changes to these content, template or static files "
+                             "according to the dependency graph of the last build, without building")
+    parser.add_argument("--profile", action="store_true",
+                        help="record time and the net change in allocated memory blocks per phase and page, "
+                             "print a summary and write a trace")
+    parser.add_argument("--trace-file", default=TRACE_PATH,
+                        help="where --profile writes its Chrome trace-event JSON")
+    parser.add_argument("--slowest", type=int, default=10, help="number of slowest pages --profile lists")
+    parser.add_argument("--verbose", "-v", action="store_true", help="log every generated page and copied file")
+    parser.add_argument("--quiet", "-q", action="store_true", help="only log warnings and errors")
+    return parser.parse_args()
+
+
+def affected_pages(graph: DependencyGraph, paths: list[str], content_dir: str, static_dir: str) -> list[str]:
+    """
+    Sorts changed paths into page sources, templates (or partials) and static files and asks the graph which
+    pages depend on them.
+    """
+    sources, templates, assets = [], [], []
+    template_files = graph.template_files()
+    for path in paths:
+        if os.path.normpath(path) in template_files:
+            templates.append(path)
+        elif not os.path.relpath(path, content_dir).startswith(os.pardir):
+            sources.append(os.path.relpath(path, content_dir))
+        elif not os.path.relpath(path, static_dir).startswith(os.pardir):
+            assets.append(os.path.relpath(path, static_dir))
+        else:
+            logger.warning(f"{path} is not a page, template or static file")
+    return graph.affected_pages(sources, templates, assets)
+
 
 def main():
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
-    else:
-        basepath = "/"
+    args = parse_args()
+    level = logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO
+    logging.basicConfig(level=level, format="%(message)s")
+    if args.affected:
+        for source in affected_pages(DependencyGraph.load(GRAPH_PATH), args.affected, "../content", "../static"):
+            print(source)
+        return
+    profiler.enabled = args.profile
+    basepath = args.basepath
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    cache = RenderCache(args.render_cache_size) if args.render_cache_size > 0 else None
+    if cache is not None and args.persist_render_cache:
+        cache.load(RENDER_CACHE_PATH)
+    if args.shard:
+        shard, shards = args.shard
+        try:
+            shard_manifest = build_shard("../content", "../template.html", basepath, args.shard_dir, shard, shards,
+                                         jobs, force=not args.incremental, cache=cache, drafts=args.drafts)
+        except BuildError as e:
+            logger.error(e.report())
+            sys.exit(1)
+        logger.info(f"Built {len(shard_manifest['pages'])} pages of shard {shard}/{shards} into {args.shard_dir}")
+        return
+
+    previous_plan = BuildPlan.load(PLAN_PATH)
+    with profiler.phase("plan"):
+        plan = make_plan("../content", "../static", "../docs", previous_plan)
+    if args.dry_run:
+        print(plan.format())
+        for change, outputs in plan.diff(previous_plan).items():
+            print(f"{change}: {len(outputs)}")
+            for output in outputs:
+                print(f"  {output}")
+        return
+    writer = OutputWriter(minify_html if args.minify else None)
+    plan.make_directories()
+    for path in plan.remove_stale(writer):
+        logger.info(f"Removed {path}")
+
+    with profiler.phase("sync_static"):
+        report = sync_tree("../static", "../docs", STATIC_STATE_PATH, args.hash_assets, args.link_assets,
+                           plan.static_files())
+    logger.info(f"Synced static files from ../static to ../docs: {report}")
+    static_files = set(plan.static_files())
+    for rel_path in report.copied + report.linked + report.removed:
+        if rel_path + SIDECAR_EXTENSION not in static_files:
+            remove_sidecar(os.path.join("../docs", rel_path))
+    failed = False
+    try:
+        if args.merge_shards:
+            merged = merge_shards(args.shard_dir, args.merge_shards, "../content", "../template.html", basepath,
+                                  "../docs", MANIFEST_PATH, GRAPH_PATH, writer, INDEX_PATH, args.drafts)
+            logger.info(f"Merged {len(merged)} pages from {args.merge_shards} shards in {args.shard_dir}")
+        else:
+            generate_pages_incremental("../content", "../template.html", "../docs", basepath, MANIFEST_PATH, jobs,
+                                       force=not args.incremental, cache=cache, graph_path=GRAPH_PATH,
+                                       io_concurrency=args.async_io, pages=plan.pages(), writer=writer,
+                                       index_path=INDEX_PATH, metadata_path=METADATA_PATH, drafts=args.drafts)
+    except (BuildError, ShardMergeError) as e:
+        logger.error(e.report())
+        failed = True
+    plan.save(PLAN_PATH)
+    logger.info(f"Pages: {len(writer.written)} written, {len(writer.unchanged)} unchanged, "
+                f"{len(writer.deleted)} deleted")
+    site_files: list[str] = []
+    if args.site_url:
+        with profiler.phase("site_index"):
+            index = SiteIndex.load(INDEX_PATH)
+            site_files = emit_site_files(index, Template.load("../template.html", basepath), "../docs",
+                                         args.site_url, args.feed_dir, writer)
+            index.save(INDEX_PATH)
+        logger.info(f"Wrote the sitemap, feed and listing pages of {len(index.pages)} pages: {', '.join(site_files)}")
+    if args.minify:
+        original = sum(writer.original_sizes.values())
+        minified = sum(os.path.getsize(path) for path in writer.original_sizes if os.path.exists(path))
+        logger.info(f"Minified {len(writer.original_sizes)} outputs from {original} to {minified} bytes")
+    if args.precompress:
+        with profiler.phase("postprocess"):
+            postprocess_report = postprocess_outputs(
+                "../docs", [action.dest for action in plan.actions_of(RENDER)] + site_files,
+                [action.dest for action in plan.actions_of(COPY)], POSTPROCESS_STATE_PATH, jobs,
+                {os.path.relpath(path, "../docs"): size for path, size in writer.original_sizes.items()})
+        logger.info(f"Post-processed outputs: {postprocess_report}\n{postprocess_report.summary()}")
+    if cache is not None:
+        logger.info(f"Render cache: {cache.stats()}")
+        if args.persist_render_cache:
+            cache.save(RENDER_CACHE_PATH)
+
+    if args.profile:
+        print(profiler.summary(args.slowest))
+        os.makedirs(os.path.dirname(args.trace_file), exist_ok=True)
+        profiler.write_chrome_trace(args.trace_file)
+        logger.info(f"Wrote trace to {args.trace_file}")
 
-    copy_recursively("../static", "../docs")
-    generate_pages_recursive("../content", "../template.html", "../docs", basepath)
+    if args.watch:
+        watcher = SiteWatcher("../content", "../static", "../template.html", "../docs", basepath, MANIFEST_PATH,
+                              writer, cache, args.drafts, GRAPH_PATH, INDEX_PATH, METADATA_PATH)
+        watch(watcher, args.port)
+    elif failed:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
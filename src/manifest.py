@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text: str) -> str:
+    return hash_bytes(text.encode("utf-8"))
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    def __init__(self, template_hash: str = None, basepath_hash: str = None, pages: dict[str, dict[str, str]] = None,
+                 transform: str = None):
+        """
+
+        :param template_hash: hash of the template the pages were rendered with
+        :param basepath_hash: hash of the basepath the pages were rendered with
+        :param pages: maps a source path (relative to the content directory) to a dict holding
+        the "hash" of the source and the "output" path (relative to the destination directory)
+        :param transform: name of the transform the outputs were written with (OutputWriter.transform_name)
+        """
+        self.template_hash = template_hash
+        self.basepath_hash = basepath_hash
+        self.pages = pages if pages is not None else {}
+        self.transform = transform
+
+    @classmethod
+    def load(cls, path: str) -> "BuildManifest":
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        return cls(data.get("template_hash"), data.get("basepath_hash"), data.get("pages", {}), data.get("transform"))
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {"template_hash": self.template_hash, "basepath_hash": self.basepath_hash, "pages": self.pages,
+                "transform": self.transform}
+        with open(path, 'w') as f:
+            f.write(json.dumps(data, sort_keys=True))
+
+    def __eq__(self, other: "BuildManifest") -> bool:
+        return (self.template_hash == other.template_hash
+                and self.basepath_hash == other.basepath_hash
+                and self.pages == other.pages
+                and self.transform == other.transform)
+
+    def __repr__(self) -> str:
+        return (f"BuildManifest({self.template_hash=}, {self.basepath_hash=}, pages={len(self.pages)}, "
+                f"{self.transform=})")
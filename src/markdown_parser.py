@@ -1,12 +1,18 @@
 import re
 from enum import Enum, auto
 from functools import reduce
-from typing import Callable
+from typing import Callable, Iterator
 
 from htmlnode import HTMLNode, ParentNode, LeafNode, text_node_to_html_node
+from inline_tokenizer import LIST_ITEM_PATTERN, Boundary, find_link_spans, iter_inline_events, tokenize_line
 from textnode import TextNode, TextType
 
 
+_HEADING_PATTERN = re.compile(r"#{1,6} ")
+_ORDERED_ITEM_PATTERN = re.compile(r"\d+\. ")
+_INLINE_TAGS = {TextType.BOLD: "b", TextType.ITALIC: "i", TextType.CODE: "code"}
+
+
 class BlockType(Enum):
     PARAGRAPH = auto()
     HEADING = auto()
@@ -17,80 +23,88 @@ class BlockType(Enum):
 
 
 def split_nodes_delimiter(old_nodes: list[TextNode], delimiter: str, text_type: TextType) -> list[TextNode]:
+    """
+    Splits every text node on pairs of delimiter. A last delimiter without a partner is kept as literal text.
+    """
     new_nodes: list[TextNode] = []
     for node in old_nodes:
         if node.text_type != TextType.TEXT:
             new_nodes.append(node)
             continue
-        split_text = node.text.split(delimiter, maxsplit=2)
+        split_text = node.text.split(delimiter)
         if len(split_text) == 1:
             new_nodes.append(node)
             continue
-        if len(split_text) == 2:
-            raise ValueError(f"No closing delimiter '{delimiter}' found in text '{node.text}'")
-        if split_text[0]:   # only add a text node if the first part is not empty. Can happen if string starts with delimiter.
-            new_nodes.append(TextNode(split_text[0], TextType.TEXT))
-        new_nodes.append(TextNode(split_text[1], text_type))
-        if split_text[2] == "":
-            continue
-        new_nodes.extend(split_nodes_delimiter([TextNode(split_text[2], TextType.TEXT)], delimiter, text_type))
+        if len(split_text) % 2 == 0:
+            split_text[-2:] = [split_text[-2] + delimiter + split_text[-1]]
+        for i, text in enumerate(split_text):
+            if i % 2:
+                new_nodes.append(TextNode(text, text_type))
+            elif text:  # the text before the first delimiter is empty if the node starts with it
+                new_nodes.append(TextNode(text, TextType.TEXT))
     return new_nodes
 
 def split_nodes_image(old_nodes: list[TextNode]) -> list[TextNode]:
-    return split_nodes(old_nodes, extract_markdown_images,
-                       lambda x: f"![{x[0]}]({x[1]})",
-                       TextType.IMAGE)
+    return split_nodes(old_nodes, TextType.IMAGE)
 
 
 def split_nodes_link(old_nodes: list[TextNode]) -> list[TextNode]:
-    return split_nodes(old_nodes, extract_markdown_links,
-                       lambda x: f"[{x[0]}]({x[1]})",
-                       TextType.LINK)
+    return split_nodes(old_nodes, TextType.LINK)
 
 
-def split_nodes(old_nodes: list[TextNode],
-                           match_func: Callable[[str], list[tuple[str, str]]],
-                           str_func: Callable[[tuple], str],
-                           text_type: TextType) -> list[TextNode]:
+def split_nodes(old_nodes: list[TextNode], text_type: TextType) -> list[TextNode]:
+    """
+    Splits the images or links, depending on text_type, out of every text node, cutting at the positions
+    find_link_spans reports.
+    """
     new_nodes: list[TextNode] = []
     for node in old_nodes:
-        text = node.text
-        matches = match_func(text)
-        if len(matches) == 0:
+        spans = [span for span in find_link_spans(node.text) if span[2] == text_type] \
+            if node.text_type == TextType.TEXT else []
+        if not spans:
             new_nodes.append(node)
             continue
-        match = matches[0]
-        split_text = text.split(str_func(match), maxsplit=1)
-        new_nodes.append(TextNode(split_text[0], TextType.TEXT))
-        new_nodes.append(TextNode(match[0], text_type, match[1]))
-        if split_text[1] != "":
-            other_text = TextNode(split_text[1], TextType.TEXT)
-            new_nodes.extend(split_nodes([other_text], match_func, str_func, text_type))
+        pos = 0
+        for start, end, _, span_text, url in spans:
+            new_nodes.append(TextNode(node.text[pos:start], TextType.TEXT))
+            new_nodes.append(TextNode(span_text, text_type, url))
+            pos = end
+        if pos < len(node.text):
+            new_nodes.append(TextNode(node.text[pos:], TextType.TEXT))
     return new_nodes
 
 
 def extract_markdown_images(text: str) -> list[tuple[str, str]]:
-    matches = re.findall(r"!\[(.*?)]\((.+?)\)", text)
-    return matches
+    return [(span_text, url) for _, _, span_type, span_text, url in find_link_spans(text)
+            if span_type == TextType.IMAGE]
 
 
 def extract_markdown_links(text: str) -> list[tuple[str, str]]:
-    matches = re.findall(r"\[(.*?)]\((.+?)\)", text)
-    return matches
+    return [(span_text, url) for _, _, span_type, span_text, url in find_link_spans(text)
+            if span_type == TextType.LINK]
 
 
 def extract_list_item(text_nodes: list[TextNode]) -> list[TextNode]:
     new_nodes: list[TextNode] = []
     for text_node in text_nodes:
-        matches = re.findall(r"^((\*|-|\d+\.) )(.*)", text_node.text)
-        if len(matches) == 0:
+        list_item = LIST_ITEM_PATTERN.match(text_node.text)
+        if list_item is None:
             new_nodes.append(text_node)
             continue
-        new_nodes.append(TextNode(matches[0][-1].strip(), TextType.TEXT))
+        new_nodes.append(TextNode(list_item.group(3).strip(), TextType.TEXT))
     return new_nodes
 
 
 def line_to_textnodes(text: str) -> list[TextNode]:
+    return tokenize_line(text)
+
+
+def chained_line_to_textnodes(text: str) -> list[TextNode]:
+    """
+    The original pass-per-syntax pipeline. line_to_textnodes uses the single-pass tokenizer instead, which
+    also handles nested emphasis, "*" and intraword underscores; for lines without those, this is kept as the
+    reference implementation it is tested against.
+    """
     start_nodes = [TextNode(text, TextType.TEXT)]
     italic_extractor = lambda nodes: split_nodes_delimiter(nodes, "_", TextType.ITALIC)
     bold_extractor = lambda nodes: split_nodes_delimiter(nodes, "**", TextType.BOLD)
@@ -105,51 +119,71 @@ def line_to_textnodes(text: str) -> list[TextNode]:
     return filtered_nodes
 
 
-def markdown_to_blocks(markdown: str) -> list[str]:
-    raw_blocks = markdown.split("\n\n")
-    stripped_blocks = list()
-    for block in raw_blocks:
-        block = block.strip()
-        if "\n" in block:
-            block = "\n".join(list(map(lambda line: line.strip(), block.split("\n"))))
-        stripped_blocks.append(block)
-    return stripped_blocks
+def normalize_block(block: str) -> str:
+    block = block.strip()
+    if "\n" in block:
+        block = "\n".join(list(map(lambda line: line.strip(), block.split("\n"))))
+    return block
 
 
-def all_lines_start_with(lines: list[str], start: str) -> bool:
-    for line in lines:
-        if not re.match(start, line):
-            return False
-    return True
+def markdown_to_blocks(markdown: str) -> list[str]:
+    raw_blocks = markdown.split("\n\n")
+    return list(map(normalize_block, raw_blocks))
 
 
 def block_to_block_type(block: str) -> BlockType:
-    lines = block.split("\n")
-    if re.match("#{1,6} ", block):
+    if _HEADING_PATTERN.match(block):
         return BlockType.HEADING
     if block.startswith("```") and block.endswith("```"):
         return BlockType.CODE
-    if all_lines_start_with(lines, ">"):
+    # one pass over the lines, dropping every candidate type a line rules out
+    quote = star_list = dash_list = ordered_list = True
+    for line in block.split("\n"):
+        quote = quote and line.startswith(">")
+        star_list = star_list and line.startswith("* ")
+        dash_list = dash_list and line.startswith("- ")
+        ordered_list = ordered_list and _ORDERED_ITEM_PATTERN.match(line) is not None
+        if not (quote or star_list or dash_list or ordered_list):
+            return BlockType.PARAGRAPH
+    if quote:
         return BlockType.QUOTE
-    if all_lines_start_with(lines, r"\* ") or all_lines_start_with(lines, r"\- "):
+    if star_list or dash_list:
         return BlockType.UNORDERED
-    if all_lines_start_with(lines, r"\d+\. "):
-        return BlockType.ORDERED
-    return BlockType.PARAGRAPH
+    return BlockType.ORDERED
+
+def line_to_html_nodes(line: str) -> list[HTMLNode]:
+    """
+    Like map(text_node_to_html_node, line_to_textnodes(line)), but keeps nested emphasis: a span holding more
+    than plain text becomes a ParentNode.
+    """
+    html_nodes: list[HTMLNode] = []
+    outer: list[list[HTMLNode]] = []
+    for text, text_type, url in iter_inline_events(line):
+        if text is Boundary.OPEN:
+            outer.append(html_nodes)
+            html_nodes = []
+        elif text is Boundary.CLOSE:
+            tag = _INLINE_TAGS[text_type]
+            if len(html_nodes) == 1 and html_nodes[0].tag is None:
+                span = LeafNode(tag, html_nodes[0].value)
+            else:
+                span = ParentNode(tag, html_nodes)
+            html_nodes = outer.pop()
+            html_nodes.append(span)
+        else:
+            html_nodes.append(text_node_to_html_node(TextNode(text, text_type, url)))
+    return html_nodes
 
-def text_to_leaf_nodes(text: str, tag: str = None) -> list[LeafNode]:
+
+def text_to_leaf_nodes(text: str, tag: str = None) -> list[HTMLNode]:
     lines = text.split("\n")
-    list_text_nodes = list(map(line_to_textnodes, lines))
     html_nodes = list()
-    for text_node_list in list_text_nodes:
-        line_html_nodes = list(map(text_node_to_html_node, text_node_list))
+    for line in lines:
+        line_html_nodes = line_to_html_nodes(line)
         if tag:
             html_nodes.append(ParentNode(tag, line_html_nodes))
         else:
             html_nodes.extend(line_html_nodes)
-    if tag:
-        for node in html_nodes:
-            node.tag = tag
     return html_nodes
 
 
@@ -198,3 +232,97 @@ def markdown_to_html_node(markdown: str) -> HTMLNode:
     return ParentNode("div", child_nodes)
 
 
+# Fast path: the functions below render markdown straight to HTML strings without building TextNode,
+# LeafNode or ParentNode objects. Their output (and the errors they raise) match markdown_to_html_node(...).to_html().
+
+# (attribute, url) of a link or image, e.g. ("href", "/contact") or ("src", "/images/tom.png")
+Reference = tuple[str, str]
+
+
+def line_to_html(line: str, references: list[Reference] = None) -> list[str]:
+    """
+
+    :param references: if given, an ("href", url) or ("src", url) tuple is appended for every link and image
+    """
+    chunks: list[str] = []
+    for text, text_type, url in iter_inline_events(line):
+        if text is Boundary.OPEN:
+            chunks.append(f"<{_INLINE_TAGS[text_type]}>")
+            continue
+        if text is Boundary.CLOSE:
+            chunks.append(f"</{_INLINE_TAGS[text_type]}>")
+            continue
+        match text_type:
+            case TextType.TEXT:
+                chunks.append(text)
+            case TextType.LINK:
+                chunks.append(f'<a href="{url}">{text}</a>')
+                if references is not None:
+                    references.append(("href", url))
+            case TextType.IMAGE:
+                chunks.append(f'<img src="{url}" alt="{text}">')
+                if references is not None:
+                    references.append(("src", url))
+            case _:
+                tag = _INLINE_TAGS[text_type]
+                chunks.append(f"<{tag}>{text}</{tag}>")
+    return chunks
+
+
+def _list_block_to_html(block: str, tag: str, references: list[Reference] | None) -> str:
+    items: list[str] = []
+    for line in block.split("\n"):
+        line_chunks = line_to_html(line, references)
+        if not line_chunks:
+            raise ValueError("Children required in ParentNode.")
+        items.append(f"<li>{''.join(line_chunks)}</li>")
+    return f"<{tag}>{''.join(items)}</{tag}>"
+
+
+def block_to_html(block: str, block_type: BlockType, references: list[Reference] = None) -> str:
+    match block_type:
+        case BlockType.HEADING:
+            heading_type, heading_value = block.split(" ", maxsplit=1)
+            h_num = len(heading_type)
+            return f"<h{h_num}>{heading_value}</h{h_num}>"
+        case BlockType.PARAGRAPH:
+            chunks: list[str] = []
+            for line in block.split("\n"):
+                chunks.extend(line_to_html(line, references))
+            if not chunks:
+                raise ValueError("Children required in ParentNode.")
+            return f"<p>{''.join(chunks)}</p>"
+        case BlockType.UNORDERED:
+            return _list_block_to_html(block, "ul", references)
+        case BlockType.ORDERED:
+            return _list_block_to_html(block, "ol", references)
+        case BlockType.CODE:
+            lines = [line.strip() for line in block.replace("```", "").split("\n")]
+            lines = [line for line in lines if line != ""]
+            if not lines:
+                raise ValueError("Children required in ParentNode.")
+            return f"<pre><code>{''.join(lines)}</code></pre>"
+        case BlockType.QUOTE:
+            lines = [line.strip() for line in block.replace("> ", "").split("\n")]
+            if not all(lines):
+                raise ValueError("Value required in LeafNode.")
+            return f"<blockquote>{''.join(lines)}</blockquote>"
+
+
+def render_block(block: str, references: list[Reference] = None) -> str:
+    return block_to_html(block, block_to_block_type(block), references)
+
+
+def iter_markdown_html(markdown: str, render: Callable[[str], str] = render_block) -> Iterator[str]:
+    """
+
+    :param render: renders a single block, e.g. RenderCache.block_html to reuse previously rendered blocks
+    """
+    yield "<div>"
+    for block in markdown_to_blocks(markdown):
+        yield render(block)
+    yield "</div>"
+
+
+def markdown_to_html(markdown: str, render: Callable[[str], str] = render_block) -> str:
+    return "".join(iter_markdown_html(markdown, render))
@@ -0,0 +1,143 @@
+import filecmp
+import io
+import os
+from contextlib import contextmanager
+from typing import Callable, Iterator, TextIO
+
+SIDECAR_EXTENSION = ".gz"
+
+
+def _temp_path(path: str) -> str:
+    # the pid keeps concurrent writers of the same output (e.g. two worker processes) from sharing a temp file
+    return f"{path}.{os.getpid()}.tmp"
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """
+    Writes data to a temporary file next to path and moves it over path with os.replace, so readers see either
+    the old or the new file, never a half-written one.
+    """
+    tmp_path = _temp_path(path)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def remove_sidecar(path: str) -> None:
+    """
+    Removes the precompressed copy of an output, if there is one, so a server preferring it never serves stale
+    content; postprocess_outputs writes it again on the next --precompress build.
+    """
+    try:
+        os.remove(path + SIDECAR_EXTENSION)
+    except FileNotFoundError:
+        pass
+
+
+def file_matches(path: str, data: bytes) -> bool:
+    """
+    :return: True if the file at path holds exactly data; the size is compared first, so most changes are
+    detected without reading the file
+    """
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == data
+    except FileNotFoundError:
+        return False
+
+
+class OutputWriter:
+    def __init__(self, transform: Callable[[str], str] = None):
+        """
+        Writes outputs only when their content changed, atomically, and counts what it did. Skipping identical
+        writes keeps mtimes stable, so rsync and CDN caches do not see untouched pages as modified. The .gz
+        sidecar of every written or deleted output is removed.
+
+        :param transform: applied to every text output before it is compared with the file on disk, e.g.
+        postprocess.minify_html, so what is compared is exactly what gets written
+        """
+        self.transform = transform
+        self.written: list[str] = []
+        self.unchanged: list[str] = []
+        self.deleted: list[str] = []
+        self.original_sizes: dict[str, int] = {}    # size of each transformed text output before transform
+
+    @property
+    def transform_name(self) -> str | None:
+        """
+        Identifies the transform in a build manifest, so turning it on or off rebuilds every page.
+        """
+        if self.transform is None:
+            return None
+        return f"{getattr(self.transform, '__module__', None)}.{self.transform.__qualname__}"
+
+    def write_bytes(self, path: str, data: bytes) -> bool:
+        """
+        :return: True if the file was written, False if it already held data
+        """
+        if file_matches(path, data):
+            self.unchanged.append(path)
+            return False
+        write_atomic(path, data)
+        remove_sidecar(path)
+        self.written.append(path)
+        return True
+
+    def write_text(self, path: str, text: str) -> bool:
+        if self.transform is not None:
+            self.original_sizes[path] = len(text.encode("utf-8"))
+            text = self.transform(text)
+        return self.write_bytes(path, text.encode("utf-8"))
+
+    @contextmanager
+    def open_text(self, path: str) -> Iterator[TextIO]:
+        """
+        Streaming version of write_text: the file object writes to a temporary file, which replaces path on exit
+        unless it turns out identical to it. On an error the temporary file is removed and path is left as it was.
+        With a transform, the text is collected in memory and passed to write_text instead.
+        """
+        if self.transform is not None:
+            buffer = io.StringIO()
+            yield buffer
+            self.write_text(path, buffer.getvalue())
+            return
+        tmp_path = _temp_path(path)
+        try:
+            with open(tmp_path, 'w', encoding="utf-8") as f:
+                yield f
+            if os.path.exists(path) and filecmp.cmp(tmp_path, path, shallow=False):
+                os.remove(tmp_path)
+                self.unchanged.append(path)
+                return
+            os.replace(tmp_path, path)
+            remove_sidecar(path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.written.append(path)
+
+    def delete(self, path: str) -> bool:
+        if not os.path.exists(path):
+            return False
+        os.remove(path)
+        remove_sidecar(path)
+        self.deleted.append(path)
+        return True
+
+    def merge(self, other: "OutputWriter") -> None:
+        self.written.extend(other.written)
+        self.unchanged.extend(other.unchanged)
+        self.deleted.extend(other.deleted)
+        self.original_sizes.update(other.original_sizes)
+
+    def __repr__(self) -> str:
+        return (f"OutputWriter(written={len(self.written)}, unchanged={len(self.unchanged)}, "
+                f"deleted={len(self.deleted)})")
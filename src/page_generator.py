@@ -1,47 +1,530 @@
+import asyncio
+import functools
+import logging
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
 
-from markdown_parser import markdown_to_html_node
+from block_reader import extract_title_from_file, iter_file_html
+from dependency_graph import DependencyGraph, template_references
+from front_matter import MetadataIndex, read_front_matter, split_front_matter
+from manifest import BuildManifest, hash_file, hash_text
+from markdown_parser import Reference, iter_markdown_html, render_block
+from output_writer import OutputWriter
+from profiling import PhaseRecord, profiler
+from render_cache import RenderCache
+from site_index import SiteIndex
+from template import Template, TemplateCache, TemplateSelector
+
+logger = logging.getLogger(__name__)
+
+STREAMING_THRESHOLD = 8 * 1024 * 1024
+
+_TITLE_PATTERN = re.compile(r"^# .*$", re.M)
+
+# paragraphs holding nothing but a link or an image, like a "back home" link, do not make a summary
+_LINK_ONLY_PARAGRAPH_PATTERN = re.compile(r"<p>(<a [^>]*>((?!</a>).)*</a>|<img [^>]*>)</p>")
+
+
+class BuildError(Exception):
+    def __init__(self, failures: list[tuple[str, str]]):
+        """
+
+        :param failures: a list of (source path, error message) tuples, one per page that failed
+        """
+        self.failures = failures
+        super().__init__(f"{len(failures)} page(s) failed to build.")
+
+    def report(self) -> str:
+        lines = [str(self)]
+        for path, message in self.failures:
+            lines.append(f"  {path}: {message}")
+        return "\n".join(lines)
 
 
 def extract_title(markdown: str) -> str:
-    lines = markdown.split('\n')
-    title_lines = list(filter(lambda line: line.startswith('# '), lines))
-    if not title_lines:
+    # a search stops at the first heading instead of splitting the whole document into lines
+    match = _TITLE_PATTERN.search(markdown)
+    if match is None:
         raise ValueError("No title found.")
-    title = title_lines[0].strip("#").strip()
-    return title
+    return match.group().strip("#").strip()
 
 
-def generate_page(from_path: str, template_path: str, dest_path: str, basepath: str) -> None:
-    print(f"Generating page {from_path} to {dest_path} using {template_path}")
+class PageResult:
+    __slots__ = ("title", "summary", "references")
 
-    with open(from_path, 'r') as f:
-        markdown = f.read()
+    def __init__(self, title: str = None, summary: str = None, references: list[Reference] = None):
+        """
+        What rendering a page learned about it, collected while its blocks are rendered so nothing is parsed twice.
 
-    with open(template_path, 'r') as f:
-        template = f.read()
+        :param summary: the HTML of the first paragraph, if the page has one
+        :param references: the (attribute, url) of every link and image on the page
+        """
+        self.title = title
+        self.summary = summary
+        self.references = references if references is not None else []
 
-    html_node = markdown_to_html_node(markdown)
-    content = html_node.to_html()
-    title = extract_title(markdown)
-    out_text = template.replace("{{ Title }}", title).replace("{{ Content }}", content)
-    out_text = out_text.replace('href="/', f'href="{basepath}')
-    out_text = out_text.replace('src="/', f'src="{basepath}')
+    def __eq__(self, other: "PageResult") -> bool:
+        return (self.title == other.title and self.summary == other.summary
+                and self.references == other.references)
 
-    with open(dest_path, 'w') as f:
-        f.write(out_text)
+    def __repr__(self) -> str:
+        return f"PageResult({self.title=}, {self.summary=}, references={len(self.references)})"
+
+
+def render_page(from_path: str, template: Template, dest_path: str, cache: RenderCache = None,
+                writer: OutputWriter = None) -> PageResult:
+    """
+
+    The front matter of the source, if any, is not rendered; its "title" replaces the first heading as the title.
+
+    :param writer: writes the page unless it is unchanged and counts the outcome
+    :return: the title, first paragraph and references of the page
+    """
+    logger.debug(f"Generating page {from_path} to {dest_path} using {template.path}")
+    result = PageResult()
+    render = _block_renderer(cache, result)
+    writer = writer if writer is not None else OutputWriter()
+
+    streaming = os.path.getsize(from_path) > STREAMING_THRESHOLD
+    if streaming:
+        # very large sources are never read whole; blocks are rendered straight from a memory map
+        with profiler.phase("extract_title", from_path):
+            metadata, offset = read_front_matter(from_path)
+            title = metadata.get("title") or extract_title_from_file(from_path, offset)
+        result.title = title
+        chunks = iter_file_html(from_path, render, offset)
+    else:
+        with profiler.phase("read", from_path):
+            with open(from_path, 'r') as f:
+                markdown = f.read()
+
+        with profiler.phase("extract_title", from_path):
+            metadata, markdown = split_front_matter(markdown)
+            title = metadata.get("title") or extract_title(markdown)
+        result.title = title
+
+        chunks = iter_markdown_html(markdown, render)
+    if profiler.active:
+        # render up front so parsing and disk writes show up as separate phases
+        with profiler.phase("render", from_path):
+            chunks = list(chunks)
+
+    with profiler.phase("write", from_path):
+        if streaming:
+            with writer.open_text(dest_path) as f:
+                template.write(f, title, chunks)
+        else:
+            writer.write_text(dest_path, "".join(template.iter_render(title, chunks)))
+    return result
+
+
+def _block_renderer(cache: RenderCache | None, result: PageResult) -> Callable[[str], str]:
+    """
+    Renders blocks with the cache (if any), adding their references to result and keeping the first paragraph
+    that is more than a single link or image as its summary.
+    """
+    render = functools.partial(cache.block_html if cache is not None else render_block, references=result.references)
+
+    def render_and_collect(block: str) -> str:
+        html = render(block)
+        if result.summary is None and html.startswith("<p>") and not _LINK_ONLY_PARAGRAPH_PATTERN.fullmatch(html):
+            result.summary = html
+        return html
+    return render_and_collect
+
+
+def page_output_path(source: str) -> str:
+    """
+    Maps a source path to its output path: a ".md" extension becomes ".html", any other path is kept as it is.
+    """
+    root, extension = os.path.splitext(source)
+    return root + ".html" if extension == ".md" else source
+
+
+def generate_page(from_path: str, template_path: str, dest_path: str, basepath: str) -> None:
+    render_page(from_path, Template.load(template_path, basepath), dest_path)
 
 
 def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir_path: str, basepath: str) -> None:
-    print(f"Generating pages recursively {dir_path_content} to {dest_dir_path} using {template_path}")
+    logger.debug(f"Generating pages recursively {dir_path_content} to {dest_dir_path} using {template_path}")
+    render_pages_recursive(dir_path_content, Template.load(template_path, basepath), dest_dir_path)
+
+
+def render_pages_recursive(dir_path_content: str, template: Template, dest_dir_path: str) -> None:
     for item in os.listdir(dir_path_content):
         item_path = os.path.join(dir_path_content, item)
         dest_item_path = os.path.join(dest_dir_path, item)
-        print(f"{item_path=}, {dest_item_path=}")
+        logger.debug(f"{item_path=}, {dest_item_path=}")
         if os.path.isdir(item_path):
             if not os.path.exists(dest_item_path):
                 os.makedirs(dest_item_path)
-            generate_pages_recursive(item_path, template_path, dest_item_path, basepath)
+            render_pages_recursive(item_path, template, dest_item_path)
+        else:
+            render_page(item_path, template, page_output_path(dest_item_path))
+
+
+def collect_pages(dir_path_content: str, dest_dir_path: str) -> list[tuple[str, str]]:
+    pages: list[tuple[str, str]] = []
+    with os.scandir(dir_path_content) as entries:
+        entries = sorted(entries, key=lambda entry: entry.name)
+    for entry in entries:
+        dest_item_path = os.path.join(dest_dir_path, entry.name)
+        if entry.is_dir():
+            pages.extend(collect_pages(entry.path, dest_item_path))
         else:
-            dest_item_path = dest_item_path.replace(".md", ".html")
-            generate_page(item_path, template_path, dest_item_path, basepath)
+            pages.append((entry.path, page_output_path(dest_item_path)))
+    return pages
+
+
+def render_page_task(task: tuple[str, Template, str, RenderCache | None, OutputWriter | None]
+                     ) -> tuple[str, str | None, PageResult | None]:
+    from_path, template, dest_path, cache, writer = task
+    try:
+        result = render_page(from_path, template, dest_path, cache, writer)
+    except Exception as e:
+        return from_path, f"{type(e).__name__}: {e}", None
+    return from_path, None, result
+
+
+_worker_cache: RenderCache | None = None
+_worker_transform: Callable[[str], str] | None = None
+
+
+def _init_worker(profile: bool, cache: RenderCache | None, transform: Callable[[str], str] | None) -> None:
+    global _worker_cache, _worker_transform
+    profiler.enabled = profile
+    _worker_cache = cache
+    if cache is not None:
+        cache.added = {}
+    _worker_transform = transform
+
+
+def render_page_worker(task: tuple[str, Template, str]) -> tuple[str, str | None, PageResult | None,
+                                                                 list[PhaseRecord], int, int, dict, OutputWriter]:
+    """
+    Entry point of the process pool: runs render_page_task with the worker's own copy of the render cache and
+    hands the profile records, cache hits, misses and new entries and write outcome of that page back to the parent.
+    """
+    from_path, template, dest_path = task
+    profiler.records = []
+    writer = OutputWriter(_worker_transform)
+    hits, misses, added = 0, 0, {}
+    if _worker_cache is not None:
+        hits, misses, _worker_cache.added = _worker_cache.hits, _worker_cache.misses, added
+    path, error, result = render_page_task((from_path, template, dest_path, _worker_cache, writer))
+    if _worker_cache is not None:
+        hits, misses = _worker_cache.hits - hits, _worker_cache.misses - misses
+    return path, error, result, profiler.records, hits, misses, added, writer
+
+
+def build_pages(pages: list[tuple[str, str]], template_path: str, basepath: str, jobs: int = 1,
+                cache: RenderCache = None, page_results: dict[str, PageResult] = None,
+                writer: OutputWriter = None, templates: TemplateCache = None) -> None:
+    """
+    Renders every (source, destination) pair, in a process pool if jobs > 1. Failing pages do not
+    abort the build; they are collected and raised together as a BuildError once all pages ran.
+
+    :param cache: render cache for blocks; in a process pool every worker starts from a copy of it
+    and sends back its hit and miss counts and the blocks it rendered, which are merged into the cache
+    :param page_results: if given, filled with the PageResult of every page that rendered, by source path
+    :param writer: if given, counts the pages that were written and the ones that were already up to date
+    :param templates: if given, the template is taken from this cache instead of being compiled again
+    """
+    writer = writer if writer is not None else OutputWriter()
+    _make_directories(pages)
+    template = templates.load(template_path, basepath) if templates is not None else Template.load(template_path,
+                                                                                                   basepath)
+    if jobs > 1 and len(pages) > 1:
+        tasks = [(from_path, template, dest_path) for from_path, dest_path in pages]
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        results = []
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(profiler.active, cache, writer.transform)) as pool:
+            for path, error, result, records, hits, misses, added, page_writer in pool.map(
+                    render_page_worker, tasks, chunksize=chunksize):
+                profiler.extend(records)
+                writer.merge(page_writer)
+                if cache is not None:
+                    cache.hits += hits
+                    cache.misses += misses
+                    cache.merge(added)
+                results.append((path, error, result))
+    else:
+        tasks = [(from_path, template, dest_path, cache, writer) for from_path, dest_path in pages]
+        results = list(map(render_page_task, tasks))
+    if page_results is not None:
+        page_results.update((path, result) for path, error, result in results if error is None)
+    failures = [(path, error) for path, error, _ in results if error is not None]
+    if failures:
+        raise BuildError(failures)
+
+
+def _make_directories(pages: list[tuple[str, str]]) -> None:
+    for directory in sorted({os.path.dirname(dest_path) for _, dest_path in pages}):
+        os.makedirs(directory, exist_ok=True)
+
+
+def _read_source(from_path: str) -> str | None:
+    """
+    Reader stage of the async pipeline, run in a thread. Returns None for sources above STREAMING_THRESHOLD.
+    """
+    if os.path.getsize(from_path) > STREAMING_THRESHOLD:
+        return None
+    with profiler.phase("read", from_path):
+        with open(from_path, 'r') as f:
+            return f.read()
+
+
+def _render_source(from_path: str, markdown: str, template: Template,
+                   cache: RenderCache | None) -> tuple[str, PageResult]:
+    with profiler.phase("extract_title", from_path):
+        metadata, markdown = split_front_matter(markdown)
+        result = PageResult(metadata.get("title") or extract_title(markdown))
+    with profiler.phase("render", from_path):
+        text = "".join(template.iter_render(result.title,
+                                            iter_markdown_html(markdown, _block_renderer(cache, result))))
+    return text, result
+
+
+def _write_output(from_path: str, dest_path: str, text: str, writer: OutputWriter) -> None:
+    with profiler.phase("write", from_path):
+        writer.write_text(dest_path, text)
+
+
+async def build_pages_async(pages: list[tuple[str, str]], template_path: str, basepath: str, concurrency: int = 8,
+                            cache: RenderCache = None, page_results: dict[str, PageResult] = None,
+                            writer: OutputWriter = None, templates: TemplateCache = None) -> None:
+    """
+    Async version of build_pages for filesystems where I/O latency dominates: reading, rendering and writing are
+    separate stages connected by bounded queues. Up to concurrency sources are read and as many outputs written
+    at once in threads, while the event loop renders the pages that were already read. The output is identical
+    to build_pages; failures are collected and raised as a BuildError in the order of pages.
+
+    :param concurrency: number of reads and number of writes in flight at the same time
+    """
+    writer = writer if writer is not None else OutputWriter()
+    template = await asyncio.to_thread(templates.load if templates is not None else Template.load, template_path,
+                                       basepath)
+    await asyncio.to_thread(_make_directories, pages)
+    failures: dict[str, str] = {}
+    pending = iter(pages)
+    render_queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+    write_queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+
+    async def read_stage() -> None:
+        for from_path, dest_path in pending:
+            try:
+                markdown = await asyncio.to_thread(_read_source, from_path)
+                if markdown is None:
+                    # very large sources are streamed by render_page; without the cache, which is not thread-safe
+                    result = await asyncio.to_thread(render_page, from_path, template, dest_path, None, writer)
+                    if page_results is not None:
+                        page_results[from_path] = result
+                    continue
+            except Exception as e:
+                failures[from_path] = f"{type(e).__name__}: {e}"
+                continue
+            await render_queue.put((from_path, dest_path, markdown))
+
+    async def render_stage() -> None:
+        while (item := await render_queue.get()) is not None:
+            from_path, dest_path, markdown = item
+            try:
+                text, result = _render_source(from_path, markdown, template, cache)
+            except Exception as e:
+                failures[from_path] = f"{type(e).__name__}: {e}"
+                continue
+            await write_queue.put((from_path, dest_path, text, result))
+
+    async def write_stage() -> None:
+        while (item := await write_queue.get()) is not None:
+            from_path, dest_path, text, result = item
+            try:
+                await asyncio.to_thread(_write_output, from_path, dest_path, text, writer)
+            except Exception as e:
+                failures[from_path] = f"{type(e).__name__}: {e}"
+                continue
+            if page_results is not None:
+                page_results[from_path] = result
+
+    renderer = asyncio.create_task(render_stage())
+    writers = [asyncio.create_task(write_stage()) for _ in range(concurrency)]
+    await asyncio.gather(*(read_stage() for _ in range(concurrency)))
+    await render_queue.put(None)
+    await renderer
+    for _ in writers:
+        await write_queue.put(None)
+    await asyncio.gather(*writers)
+    if failures:
+        raise BuildError([(from_path, failures[from_path]) for from_path, _ in pages if from_path in failures])
+
+
+def generate_pages_incremental(dir_path_content: str, template_path: str, dest_dir_path: str, basepath: str,
+                               manifest_path: str, jobs: int = 1, force: bool = False,
+                               cache: RenderCache = None, graph_path: str = None, io_concurrency: int = 0,
+                               pages: list[tuple[str, str]] = None, writer: OutputWriter = None,
+                               index_path: str = None, metadata_path: str = None, drafts: bool = False,
+                               templates: TemplateCache = None, partial: bool = False) -> list[str]:
+    """
+    Regenerates only the pages whose source or template changed since the build recorded in the manifest. Every
+    page records the fingerprint of its template and the partials that template includes, so a change to either
+    only regenerates the pages using it. A change of the basepath or of the writer's transform (e.g. turning
+    --minify on or off), or force, triggers a full rebuild. Outputs whose source was removed are deleted. Pages
+    that fail are left out of the manifest so the next run retries them.
+
+    Only the front matter of a page is read to decide whether to build it: drafts are left out (and their
+    outputs deleted) unless drafts is set. The template is chosen by TemplateSelector, from the front matter or
+    the templates directory next to template_path. The body is parsed only for the pages that are rendered.
+
+    :param graph_path: if given, the DependencyGraph stored there is updated with the template, links and images
+    of every regenerated page; pages missing from it are regenerated as well
+    :param io_concurrency: if above 0, pages are built by build_pages_async with this many reads and writes in
+    flight instead of by build_pages
+    :param pages: the (source, destination) pairs to build, e.g. from a BuildPlan; scanned with collect_pages if None
+    :param writer: if given, counts the written, unchanged and deleted pages
+    :param index_path: if given, the SiteIndex stored there is updated with the title, summary, mtime and metadata
+    of every regenerated page; pages missing from it are regenerated as well
+    :param metadata_path: if given, the front matter of every page is kept in the MetadataIndex stored there, and
+    read again only from sources that changed
+    :param templates: compiled templates to reuse, e.g. between the builds of a watch session
+    :param partial: pages holds only some pages of the site, e.g. the ones a watcher saw change: the other pages
+    keep their entries in the manifest and indexes, and a listed page whose source is gone is removed
+    :return: the list of regenerated source paths
+    """
+    writer = writer if writer is not None else OutputWriter()
+    templates = templates if templates is not None else TemplateCache()
+    manifest = BuildManifest.load(manifest_path)
+    graph = DependencyGraph.load(graph_path) if graph_path is not None else None
+    index = SiteIndex.load(index_path) if index_path is not None else None
+    metadata_index = MetadataIndex.load(metadata_path) if metadata_path is not None else MetadataIndex()
+    selector = TemplateSelector(template_path)
+    template_root = os.path.dirname(template_path)
+    template_hash = templates.load(template_path, basepath).fingerprint
+    full_rebuild = force or manifest.basepath_hash != hash_text(basepath)
+    if full_rebuild and not force:
+        logger.info(f"Basepath changed, rebuilding all pages in {dir_path_content}")
+    elif not force and manifest.transform != writer.transform_name:
+        full_rebuild = True
+        logger.info(f"Output transform changed, rebuilding all pages in {dir_path_content}")
+    if partial and full_rebuild and not force and manifest.pages:
+        # the pages that are not listed were built with other settings, so they are rebuilt as well
+        partial, pages = False, None
+
+    new_manifest = BuildManifest(template_hash, hash_text(basepath), transform=writer.transform_name)
+    if partial:
+        new_manifest.pages.update(manifest.pages)
+    removed_sources: set[str] = set()
+    changed_pages: list[tuple[str, str]] = []
+    page_templates: dict[str, str] = {}
+    template_hashes: dict[str, str] = {template_path: template_hash}
+    failures: list[tuple[str, str]] = []
+    if pages is None:
+        with profiler.phase("scan_content"):
+            pages = collect_pages(dir_path_content, dest_dir_path)
+    for from_path, dest_path in pages:
+        source = os.path.relpath(from_path, dir_path_content)
+        output = os.path.relpath(dest_path, dest_dir_path)
+        if partial:
+            new_manifest.pages.pop(source, None)
+            if not os.path.exists(from_path):
+                removed_sources.add(source)
+                continue
+        source_hash = hash_file(from_path)
+        try:
+            metadata = metadata_index.metadata(source, from_path, source_hash)
+            page_template = selector.select(source, metadata)
+            if page_template not in template_hashes:
+                template_hashes[page_template] = templates.load(page_template, basepath).fingerprint
+            new_entry = {"hash": source_hash, "output": output,
+                         "template": os.path.relpath(page_template, template_root),
+                         "template_hash": template_hashes[page_template]}
+        except (OSError, ValueError) as e:
+            failures.append((from_path, f"{type(e).__name__}: {e}"))
+            continue
+        if metadata.get("draft") and not drafts:
+            logger.debug(f"Skipping draft {from_path}")
+            continue
+        new_manifest.pages[source] = new_entry
+        page_templates[from_path] = page_template
+        old_entry = manifest.pages.get(source)
+        if (not full_rebuild and old_entry == new_entry
+                and os.path.exists(dest_path) and (graph is None or source in graph.pages)
+                and (index is None or source in index.pages)):
+            continue
+        changed_pages.append((from_path, dest_path))
+
+    failed_sources = {os.path.relpath(from_path, dir_path_content) for from_path, _ in failures}
+    for source, entry in manifest.pages.items():
+        if source in new_manifest.pages or source in failed_sources:
+            continue
+        stale_path = os.path.join(dest_dir_path, entry["output"])
+        if writer.delete(stale_path):
+            logger.info(f"Removed stale page {stale_path}")
+
+    logger.info(f"Generating {len(changed_pages)} of {len(new_manifest.pages)} pages from {dir_path_content}")
+    page_results: dict[str, PageResult] = {}
+    try:
+        with profiler.phase("build_pages"):
+            for page_template, template_pages in _group_by_template(changed_pages, page_templates).items():
+                try:
+                    if io_concurrency > 0:
+                        asyncio.run(build_pages_async(template_pages, page_template, basepath, io_concurrency, cache,
+                                                      page_results, writer, templates))
+                    else:
+                        build_pages(template_pages, page_template, basepath, jobs, cache, page_results, writer,
+                                    templates)
+                except BuildError as e:
+                    for from_path, _ in e.failures:
+                        del new_manifest.pages[os.path.relpath(from_path, dir_path_content)]
+                    failures.extend(e.failures)
+        if failures:
+            order = {from_path: i for i, (from_path, _) in enumerate(pages)}
+            raise BuildError(sorted(failures, key=lambda failure: order[failure[0]]))
+    finally:
+        new_manifest.save(manifest_path)
+        listed = {os.path.relpath(path, dir_path_content) for path, _ in pages}
+        for source in removed_sources if partial else metadata_index.pages.keys() - listed:
+            metadata_index.remove_page(source)
+        if metadata_path is not None:
+            metadata_index.save(metadata_path)
+        if graph is not None:
+            _update_graph(graph, graph_path, templates, basepath, page_templates, dir_path_content, new_manifest,
+                          page_results)
+        if index is not None:
+            _update_index(index, index_path, dir_path_content, new_manifest, metadata_index, page_results)
+    return [from_path for from_path, _ in changed_pages]
+
+
+def _group_by_template(pages: list[tuple[str, str]], page_templates: dict[str, str]
+                       ) -> dict[str, list[tuple[str, str]]]:
+    groups: dict[str, list[tuple[str, str]]] = {}
+    for from_path, dest_path in pages:
+        groups.setdefault(page_templates[from_path], []).append((from_path, dest_path))
+    return groups
+
+
+def _update_graph(graph: DependencyGraph, graph_path: str, templates: TemplateCache, basepath: str,
+                  page_templates: dict[str, str], dir_path_content: str, manifest: BuildManifest,
+                  page_results: dict[str, PageResult]) -> None:
+    for template_path in sorted(set(page_templates.values())):
+        template = templates.load(template_path, basepath)
+        graph.add_template(template_path, template_references(template.text), template.partials)
+    for from_path, result in page_results.items():
+        source = os.path.relpath(from_path, dir_path_content)
+        graph.add_page(source, manifest.pages[source]["output"], page_templates[from_path], result.references)
+    for source in graph.pages.keys() - manifest.pages.keys():
+        graph.remove_page(source)
+    graph.save(graph_path)
+
+
+def _update_index(index: SiteIndex, index_path: str, dir_path_content: str, manifest: BuildManifest,
+                  metadata_index: MetadataIndex, page_results: dict[str, PageResult]) -> None:
+    for from_path, result in page_results.items():
+        source = os.path.relpath(from_path, dir_path_content)
+        index.add_page(source, manifest.pages[source]["output"], result.title, result.summary,
+                       os.path.getmtime(from_path), metadata_index.pages[source]["metadata"])
+    for source in index.pages.keys() - manifest.pages.keys():
+        index.remove_page(source)
+    index.save(index_path)
@@ -0,0 +1,164 @@
+import gzip
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from manifest import hash_bytes
+from output_writer import SIDECAR_EXTENSION, write_atomic
+
+COMPRESSIBLE_EXTENSIONS = {".html", ".htm", ".css", ".js", ".mjs", ".json", ".xml", ".svg", ".txt", ".map", ".csv"}
+
+# whitespace inside these elements is significant (or is code), so it is never touched
+_PROTECTED_PATTERN = re.compile(r"<(pre|code|textarea|script|style)\b.*?</\1\s*>", re.S | re.I)
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def _collapse_whitespace(match: re.Match) -> str:
+    return "\n" if "\n" in match.group() else " "
+
+
+def minify_html(html: str) -> str:
+    """
+    Collapses every run of whitespace to a single newline (if the run contained one) or space, outside of
+    pre, code, textarea, script and style elements. Browsers render the result exactly like the input.
+    """
+    out: list[str] = []
+    pos = 0
+    for match in _PROTECTED_PATTERN.finditer(html):
+        out.append(_WHITESPACE_PATTERN.sub(_collapse_whitespace, html[pos:match.start()]))
+        out.append(match.group())
+        pos = match.end()
+    out.append(_WHITESPACE_PATTERN.sub(_collapse_whitespace, html[pos:]))
+    return "".join(out)
+
+
+def gzip_bytes(data: bytes) -> bytes:
+    # mtime=0 keeps the sidecar byte-identical between builds of the same content
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+class AssetStats:
+    __slots__ = ("files", "original", "minified", "compressed")
+
+    def __init__(self):
+        self.files = 0
+        self.original = 0
+        self.minified = 0
+        self.compressed = 0
+
+    def __repr__(self) -> str:
+        return f"AssetStats({self.files=}, {self.original=}, {self.minified=}, {self.compressed=})"
+
+
+class PostprocessReport:
+    def __init__(self):
+        self.processed: list[str] = []
+        self.unchanged: list[str] = []
+        self.removed: list[str] = []
+        self.by_type: dict[str, AssetStats] = {}
+
+    def add(self, extension: str, original: int, minified: int, compressed: int) -> None:
+        stats = self.by_type.setdefault(extension, AssetStats())
+        stats.files += 1
+        stats.original += original
+        stats.minified += minified
+        stats.compressed += compressed
+
+    def summary(self) -> str:
+        """
+        Bytes saved per asset type, by minification and by serving the .gz sidecar instead of the file.
+        """
+        lines = [f"{'type':<8}{'files':>7}{'original':>12}{'minified':>12}{'gzip':>12}{'saved':>8}"]
+        for extension, stats in sorted(self.by_type.items()):
+            saved = 1 - stats.compressed / stats.original if stats.original else 0.0
+            lines.append(f"{extension:<8}{stats.files:>7}{stats.original:>12}{stats.minified:>12}"
+                         f"{stats.compressed:>12}{saved:>8.1%}")
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return (f"PostprocessReport(processed={len(self.processed)}, unchanged={len(self.unchanged)}, "
+                f"removed={len(self.removed)})")
+
+
+def _process_file(path: str, entry: dict | None, original: int | None) -> dict | None:
+    """
+    Compresses one output file into its .gz sidecar, from the bytes that were written to it.
+
+    :param entry: the state entry recorded when the file was last processed
+    :param original: size of the page before the writer minified it, if it did
+    :return: the new state entry, or None if the file is still exactly as it was left last time
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    sidecar = path + SIDECAR_EXTENSION
+    data_hash = hash_bytes(data)
+    if entry is not None and data_hash == entry["hash"] and os.path.exists(sidecar):
+        return None
+    compressed = gzip_bytes(data)
+    write_atomic(sidecar, compressed)
+    return {"hash": data_hash, "original": original if original is not None else len(data), "minified": len(data),
+            "compressed": len(compressed)}
+
+
+def load_state(path: str) -> dict[str, dict]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(path: str, state: dict[str, dict]) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+
+
+def postprocess_outputs(dest_dir: str, pages: list[str], assets: list[str], state_path: str, jobs: int = 1,
+                        original_sizes: dict[str, int] = None) -> PostprocessReport:
+    """
+    Post-render stage: writes a .gz sidecar next to every page and every text asset, in a pool of jobs threads
+    (zlib releases the GIL). Outputs are never modified here; minifying is done by the OutputWriter while
+    rendering, so a page that did not change is not written again. Files whose content hash matches the one
+    recorded in the state file are skipped; sidecars of outputs that are gone are removed.
+
+    :param pages: rendered pages, relative to dest_dir
+    :param assets: copied static files, relative to dest_dir; only those with a text extension are compressed
+    :param state_path: JSON file recording the hash and sizes of every processed file
+    :param original_sizes: size before minifying of the pages written in this build (OutputWriter.original_sizes,
+    relative to dest_dir), for the report
+    """
+    report = PostprocessReport()
+    old_state = load_state(state_path)
+    original_sizes = original_sizes if original_sizes is not None else {}
+    tasks = pages + [rel_path for rel_path in assets
+                     if os.path.splitext(rel_path)[1].lower() in COMPRESSIBLE_EXTENSIONS]
+    tasks = [rel_path for rel_path in tasks if os.path.exists(os.path.join(dest_dir, rel_path))]
+
+    def run(rel_path: str) -> dict | None:
+        return _process_file(os.path.join(dest_dir, rel_path), old_state.get(rel_path), original_sizes.get(rel_path))
+
+    new_state: dict[str, dict] = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        for rel_path, entry in zip(tasks, pool.map(run, tasks)):
+            if entry is None:
+                report.unchanged.append(rel_path)
+                entry = old_state[rel_path]
+            else:
+                report.processed.append(rel_path)
+            new_state[rel_path] = entry
+            report.add(os.path.splitext(rel_path)[1].lower(), entry["original"], entry["minified"],
+                       entry["compressed"])
+
+    for rel_path in sorted(old_state.keys() - new_state.keys()):
+        sidecar = os.path.join(dest_dir, rel_path + SIDECAR_EXTENSION)
+        if os.path.exists(sidecar):
+            os.remove(sidecar)
+            report.removed.append(sidecar)
+    save_state(state_path, new_state)
+    return report
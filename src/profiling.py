@@ -0,0 +1,133 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable
+
+_NULL_CONTEXT = nullcontext()
+
+
+class PhaseRecord:
+    __slots__ = ("name", "page", "start", "wall", "cpu", "net_blocks", "pid", "tid")
+
+    def __init__(self, name: str, page: str | None, start: float, wall: float, cpu: float, net_blocks: int,
+                 pid: int = None, tid: int = None):
+        """
+
+        :param name: the phase, e.g. "read" or "render"
+        :param page: the source path of the page the phase belongs to, None for build-wide phases
+        :param start: start time in seconds (time.perf_counter)
+        :param wall: wall time in seconds
+        :param cpu: CPU time of the calling thread in seconds
+        :param net_blocks: memory blocks allocated minus blocks freed during the phase (sys.getallocatedblocks);
+        negative when the phase frees more than it allocates, e.g. when a garbage collection runs in it
+        """
+        self.name = name
+        self.page = page
+        self.start = start
+        self.wall = wall
+        self.cpu = cpu
+        self.net_blocks = net_blocks
+        self.pid = pid if pid is not None else os.getpid()
+        self.tid = tid if tid is not None else threading.get_ident()
+
+    def to_trace_event(self) -> dict:
+        args = {"cpu_ms": self.cpu * 1000, "net_blocks": self.net_blocks}
+        if self.page is not None:
+            args["page"] = self.page
+        return {"name": self.name, "cat": "page" if self.page is not None else "build", "ph": "X",
+                "ts": self.start * 1e6, "dur": self.wall * 1e6, "pid": self.pid, "tid": self.tid, "args": args}
+
+    def __repr__(self) -> str:
+        return f"PhaseRecord({self.name=}, {self.page=}, {self.wall=}, {self.cpu=}, {self.net_blocks=})"
+
+
+class Profiler:
+    def __init__(self, enabled: bool = False):
+        """
+        Records wall time, CPU time and the net change in allocated memory blocks per phase and page. While
+        disabled and without hooks, phase() returns a shared no-op context manager, so instrumented code pays a
+        single attribute check.
+        """
+        self.enabled = enabled
+        self.records: list[PhaseRecord] = []
+        self.hooks: list[Callable[[PhaseRecord], None]] = []
+
+    @property
+    def active(self) -> bool:
+        return self.enabled or bool(self.hooks)
+
+    def add_hook(self, hook: Callable[[PhaseRecord], None]) -> None:
+        """
+        Registers a callback that receives every PhaseRecord as soon as the phase ends.
+        """
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[PhaseRecord], None]) -> None:
+        self.hooks.remove(hook)
+
+    def phase(self, name: str, page: str = None):
+        if not self.active:
+            return _NULL_CONTEXT
+        return self._phase(name, page)
+
+    @contextmanager
+    def _phase(self, name: str, page: str | None):
+        blocks = sys.getallocatedblocks()
+        cpu = time.thread_time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            self.record(PhaseRecord(name, page, start, wall, time.thread_time() - cpu,
+                                    sys.getallocatedblocks() - blocks))
+
+    def record(self, record: PhaseRecord) -> None:
+        if self.enabled:
+            self.records.append(record)
+        for hook in self.hooks:
+            hook(record)
+
+    def extend(self, records: list[PhaseRecord]) -> None:
+        for record in records:
+            self.record(record)
+
+    def phase_totals(self) -> dict[str, tuple[float, float, int]]:
+        """
+        :return: maps every phase name to its summed (wall, cpu, net_blocks)
+        """
+        totals: dict[str, tuple[float, float, int]] = {}
+        for record in self.records:
+            wall, cpu, net_blocks = totals.get(record.name, (0.0, 0.0, 0))
+            totals[record.name] = (wall + record.wall, cpu + record.cpu, net_blocks + record.net_blocks)
+        return totals
+
+    def slowest_pages(self, n: int = 10) -> list[tuple[str, float]]:
+        pages: dict[str, float] = {}
+        for record in self.records:
+            if record.page is not None:
+                pages[record.page] = pages.get(record.page, 0.0) + record.wall
+        return sorted(pages.items(), key=lambda item: item[1], reverse=True)[:n]
+
+    def summary(self, n: int = 10) -> str:
+        lines = [f"{'phase':<20}{'wall (ms)':>12}{'cpu (ms)':>12}{'net blocks':>14}"]
+        for name, (wall, cpu, net_blocks) in self.phase_totals().items():
+            lines.append(f"{name:<20}{wall * 1000:>12.1f}{cpu * 1000:>12.1f}{net_blocks:>14}")
+        lines.append(f"slowest {n} pages:")
+        for page, wall in self.slowest_pages(n):
+            lines.append(f"  {wall * 1000:>10.2f} ms  {page}")
+        return "\n".join(lines)
+
+    def write_chrome_trace(self, path: str) -> None:
+        """
+        Writes the records in the Chrome trace-event format (load it in chrome://tracing or Perfetto).
+        """
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": [record.to_trace_event() for record in self.records],
+                       "displayTimeUnit": "ms"}, f)
+
+
+profiler = Profiler()
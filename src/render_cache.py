@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import inline_tokenizer
+import markdown_parser
+from manifest import hash_file
+from markdown_parser import Reference, block_to_block_type, block_to_html
+
+
+def renderer_version() -> str:
+    """
+    Hash of the parser sources and of this module, so a persisted cache is discarded whenever the rendering code
+    or the entry format changes.
+    """
+    return "".join(hash_file(path) for path in (markdown_parser.__file__, inline_tokenizer.__file__, __file__))
+
+
+class RenderCache:
+    def __init__(self, max_entries: int = 4096):
+        """
+        Bounded LRU cache mapping the hash of a block's text to its rendered HTML and the links and images in it.
+
+        :param max_entries: number of blocks kept before the least recently used one is evicted
+        """
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, tuple[str, tuple[Reference, ...]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # when set to a dict, newly rendered entries are recorded here too, so a pool worker can send them back
+        self.added: dict[str, tuple[str, tuple[Reference, ...]]] | None = None
+
+    @staticmethod
+    def key(block: str) -> str:
+        return hashlib.blake2b(block.encode("utf-8"), digest_size=16).hexdigest()
+
+    def block_html(self, block: str, references: list[Reference] = None) -> str:
+        """
+        Returns the HTML of a block, skipping classification and rendering entirely on a hit.
+
+        :param references: if given, the links and images of the block are appended, on a hit as well
+        """
+        key = self.key(block)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        else:
+            self.misses += 1
+            block_references: list[Reference] = []
+            entry = block_to_html(block, block_to_block_type(block), block_references), tuple(block_references)
+            self._add(key, entry)
+            if self.added is not None:
+                self.added[key] = entry
+        html, block_references = entry
+        if references is not None:
+            references.extend(block_references)
+        return html
+
+    def _add(self, key: str, entry: tuple[str, tuple[Reference, ...]]) -> None:
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def merge(self, entries: dict[str, tuple[str, tuple[Reference, ...]]]) -> None:
+        """
+        Adds entries rendered by another copy of this cache, e.g. in a pool worker, as the most recently used ones.
+        """
+        for key, entry in entries.items():
+            self._add(key, entry)
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def load(self, path: str) -> None:
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != renderer_version():
+            return
+        for key, (html, references) in list(data.get("entries", {}).items())[-self.max_entries:]:
+            self.entries[key] = html, tuple(map(tuple, references))
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({"version": renderer_version(), "entries": self.entries}, f)
+
+    def __repr__(self) -> str:
+        return f"RenderCache({self.max_entries=}, entries={len(self.entries)}, {self.hits=}, {self.misses=})"
@@ -0,0 +1,228 @@
+import argparse
+import hashlib
+import json
+import os
+
+from dependency_graph import DependencyGraph
+from front_matter import read_front_matter
+from manifest import BuildManifest, hash_file, hash_text
+from output_writer import OutputWriter
+from page_generator import BuildError, collect_pages, generate_pages_incremental
+from render_cache import RenderCache
+from template import TemplateCache
+from site_index import SiteIndex
+
+SHARD_MANIFEST = "shard.json"
+SHARD_GRAPH = "dependencies.json"
+SHARD_INDEX = "site_index.json"
+SHARD_METADATA = "metadata.json"
+
+
+class ShardMergeError(Exception):
+    def __init__(self, problems: list[str]):
+        """
+
+        :param problems: one message per missing, duplicated or inconsistent page or shard
+        """
+        self.problems = problems
+        super().__init__(f"Cannot merge shards: {len(problems)} problem(s) found.")
+
+    def report(self) -> str:
+        return "\n".join([str(self)] + [f"  {problem}" for problem in self.problems])
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """
+    Parses "K/N", the K-th of N shards, counting from 1.
+    """
+    try:
+        shard, shards = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected K/N, e.g. 1/4, got '{value}'")
+    if not 1 <= shard <= shards:
+        raise argparse.ArgumentTypeError(f"shard {shard} is not between 1 and {shards}")
+    return shard, shards
+
+
+def shard_of(source: str, shards: int) -> int:
+    """
+    Assigns a source path (relative to the content directory) to a shard from 1 to shards. The assignment only
+    depends on the path, so every machine computes the same partition.
+    """
+    digest = hashlib.sha256(source.replace(os.sep, "/").encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shards + 1
+
+
+def shard_directory(root: str, shard: int, shards: int) -> str:
+    return os.path.join(root, f"{shard}-of-{shards}")
+
+
+def build_shard(content_dir: str, template_path: str, basepath: str, root: str, shard: int, shards: int,
+                jobs: int = 1, force: bool = True, cache: RenderCache = None, drafts: bool = False) -> dict:
+    """
+    Renders the pages of one shard into root/K-of-N/docs and writes the shard manifest next to it, recording the
+    source hash, output path and output hash of every page. Failing pages are recorded in the shard manifest and
+    raised as a BuildError.
+
+    :param drafts: also build pages whose front matter has draft: true
+
+    :return: the shard manifest
+    """
+    directory = shard_directory(root, shard, shards)
+    dest_dir = os.path.join(directory, "docs")
+    manifest_path = os.path.join(directory, "manifest.json")
+    pages = [(from_path, dest_path) for from_path, dest_path in collect_pages(content_dir, dest_dir)
+             if shard_of(os.path.relpath(from_path, content_dir), shards) == shard]
+    failures: list[tuple[str, str]] = []
+    try:
+        generate_pages_incremental(content_dir, template_path, dest_dir, basepath, manifest_path, jobs, force, cache,
+                                   os.path.join(directory, SHARD_GRAPH), pages=pages,
+                                   index_path=os.path.join(directory, SHARD_INDEX),
+                                   metadata_path=os.path.join(directory, SHARD_METADATA), drafts=drafts)
+    except BuildError as e:
+        failures = e.failures
+    manifest = BuildManifest.load(manifest_path)
+    shard_manifest = {
+        "shard": shard, "shards": shards,
+        "template_hash": manifest.template_hash, "basepath_hash": manifest.basepath_hash,
+        "pages": {source: dict(entry, output_hash=hash_file(os.path.join(dest_dir, entry["output"])))
+                  for source, entry in manifest.pages.items()},
+        "failures": [[os.path.relpath(path, content_dir), message] for path, message in failures],
+    }
+    with open(os.path.join(directory, SHARD_MANIFEST), 'w') as f:
+        json.dump(shard_manifest, f, indent=1, sort_keys=True)
+    if failures:
+        raise BuildError(failures)
+    return shard_manifest
+
+
+def load_shard_manifests(root: str, shards: int) -> tuple[dict[int, dict], list[str]]:
+    manifests: dict[int, dict] = {}
+    problems: list[str] = []
+    for shard in range(1, shards + 1):
+        path = os.path.join(shard_directory(root, shard, shards), SHARD_MANIFEST)
+        try:
+            with open(path, 'r') as f:
+                manifests[shard] = json.load(f)
+        except (OSError, ValueError) as e:
+            problems.append(f"shard {shard}/{shards}: cannot read {path}: {e}")
+    return manifests, problems
+
+
+def verify_shards(root: str, shards: int, content_dir: str, template_path: str = None,
+                  basepath: str = None, drafts: bool = False) -> tuple[dict[str, tuple[int, dict]], list[str]]:
+    """
+    Checks that the shards together built every page of content_dir exactly once, from the current sources, with
+    the same template and basepath (the given ones, if any), and that every recorded output is present and intact.
+    If template_path is given, every page must also have been rendered with the current version of its template.
+
+    :param drafts: whether the shards were built with drafts; if not, drafts are not expected in any shard
+
+    :return: maps every source to its (shard, page entry), and the list of problems found
+    """
+    manifests, problems = load_shard_manifests(root, shards)
+    settings = {(manifest["template_hash"], manifest["basepath_hash"]) for manifest in manifests.values()}
+    if len(settings) > 1:
+        problems.append("shards were built with different templates or basepaths")
+    elif settings and template_path is not None and basepath is not None:
+        if settings != {(TemplateCache().load(template_path, basepath).fingerprint, hash_text(basepath))}:
+            problems.append(f"shards were built with another template than {template_path} or another basepath "
+                            f"than '{basepath}'")
+    owners: dict[str, tuple[int, dict]] = {}
+    for shard, manifest in manifests.items():
+        for source, message in manifest["failures"]:
+            problems.append(f"{source}: failed in shard {shard}/{shards}: {message}")
+        dest_dir = os.path.join(shard_directory(root, shard, shards), "docs")
+        for source, entry in manifest["pages"].items():
+            if source in owners:
+                problems.append(f"{source}: built by shard {owners[source][0]} and shard {shard}")
+                continue
+            owners[source] = shard, entry
+            if shard_of(source, shards) != shard:
+                problems.append(f"{source}: belongs to shard {shard_of(source, shards)}, built by shard {shard}")
+            output_path = os.path.join(dest_dir, entry["output"])
+            if not os.path.exists(output_path) or hash_file(output_path) != entry["output_hash"]:
+                problems.append(f"{source}: output {output_path} is missing or modified")
+
+    # only the front matter is read to leave drafts out; sources are hashed below, once they are known to be expected
+    sources = {os.path.relpath(from_path, content_dir) for from_path, _ in collect_pages(content_dir, "")}
+    expected = {source for source in sources if drafts or not _is_draft(os.path.join(content_dir, source))}
+    for source in sorted(expected - owners.keys()):
+        if not any(source == failed for manifest in manifests.values() for failed, _ in manifest["failures"]):
+            problems.append(f"{source}: missing from all shards")
+    for source in sorted(owners.keys() - expected):
+        if source in sources:
+            problems.append(f"{source}: is a draft but was built by shard {owners[source][0]}")
+        else:
+            problems.append(f"{source}: built by shard {owners[source][0]} but no longer in {content_dir}")
+    templates = TemplateCache()
+    for source in sorted(owners.keys() & expected):
+        shard, entry = owners[source]
+        if hash_file(os.path.join(content_dir, source)) != entry["hash"]:
+            problems.append(f"{source}: changed since shard {shard} built it")
+        elif template_path is not None and "template" in entry:
+            page_template = os.path.join(os.path.dirname(template_path), entry["template"])
+            try:
+                current = templates.load(page_template, basepath or "/").fingerprint
+            except (OSError, ValueError):
+                current = None
+            if current != entry["template_hash"]:
+                problems.append(f"{source}: template {page_template} changed since shard {shard} built it")
+    return owners, problems
+
+
+def _is_draft(path: str) -> bool:
+    try:
+        return read_front_matter(path)[0].get("draft", False)
+    except (OSError, ValueError):
+        # a page with a broken header is not a draft; the shard that owns it records it as failed
+        return False
+
+
+def merge_shards(root: str, shards: int, content_dir: str, template_path: str, basepath: str, dest_dir: str,
+                 manifest_path: str, graph_path: str = None, writer: OutputWriter = None,
+                 index_path: str = None, drafts: bool = False) -> list[str]:
+    """
+    Verifies the shards with verify_shards and, if nothing is wrong, installs their pages into dest_dir, deletes
+    pages of the previous build that no longer exist and writes the build manifest (and the dependency graph and
+    site index, if graph_path and index_path are given) as a regular build would.
+
+    :return: the merged source paths
+    """
+    writer = writer if writer is not None else OutputWriter()
+    owners, problems = verify_shards(root, shards, content_dir, template_path, basepath, drafts)
+    if problems:
+        raise ShardMergeError(problems)
+
+    manifests, _ = load_shard_manifests(root, shards)
+    first = manifests[1]
+    merged = BuildManifest(first["template_hash"], first["basepath_hash"], transform=writer.transform_name)
+    for source, (shard, entry) in sorted(owners.items()):
+        output_path = os.path.join(dest_dir, entry["output"])
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        # written as text, so a transforming writer (e.g. --minify) applies to merged pages as well
+        with open(os.path.join(shard_directory(root, shard, shards), "docs", entry["output"]), 'r',
+                  encoding="utf-8", newline="") as f:
+            writer.write_text(output_path, f.read())
+        merged.pages[source] = {key: value for key, value in entry.items() if key != "output_hash"}
+
+    for source, entry in BuildManifest.load(manifest_path).pages.items():
+        if source not in merged.pages:
+            writer.delete(os.path.join(dest_dir, entry["output"]))
+    merged.save(manifest_path)
+    if graph_path is not None:
+        graph = DependencyGraph()
+        for shard in range(1, shards + 1):
+            shard_graph = DependencyGraph.load(os.path.join(shard_directory(root, shard, shards), SHARD_GRAPH))
+            graph.templates.update(shard_graph.templates)
+            graph.pages.update((source, entry) for source, entry in shard_graph.pages.items()
+                               if owners.get(source, (None,))[0] == shard)
+        graph.save(graph_path)
+    if index_path is not None:
+        index = SiteIndex(generated=SiteIndex.load(index_path).generated)
+        for shard in range(1, shards + 1):
+            shard_index = SiteIndex.load(os.path.join(shard_directory(root, shard, shards), SHARD_INDEX))
+            index.pages.update((source, entry) for source, entry in shard_index.pages.items()
+                               if owners.get(source, (None,))[0] == shard)
+        index.save(index_path)
+    return sorted(merged.pages)
@@ -0,0 +1,196 @@
+import json
+import os
+import posixpath
+from datetime import datetime, timezone
+from html import escape
+
+from front_matter import sort_key
+from output_writer import OutputWriter
+from template import Template, rewrite_urls
+
+SITEMAP_OUTPUT = "sitemap.xml"
+FEED_OUTPUT = "feed.xml"
+LISTING_OUTPUT = "index.html"
+
+
+def page_url(output: str) -> str:
+    """
+    Maps an output path to the URL it is served at: "blog/tom/index.html" becomes "/blog/tom/", "index.html"
+    becomes "/" and any other file keeps its name.
+    """
+    url = "/" + output.replace(os.sep, "/")
+    if posixpath.basename(url) == LISTING_OUTPUT:
+        url = url[:-len(LISTING_OUTPUT)]
+    return url
+
+
+def absolute_url(site_url: str, basepath: str, url: str) -> str:
+    return site_url.rstrip("/") + basepath.rstrip("/") + url
+
+
+def _timestamp(mtime: float) -> str:
+    return datetime.fromtimestamp(mtime, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class SiteIndex:
+    def __init__(self, pages: dict[str, dict] = None, generated: list[str] = None):
+        """
+
+        :param pages: maps a source path (relative to the content directory) to a dict holding its "output" path
+        (relative to the destination directory), "title", "summary" (HTML of the first paragraph, or None), the
+        "mtime" of the source and the "metadata" of its front matter
+        :param generated: the output paths emit_site_files wrote last time, so the ones no longer needed are deleted
+        """
+        self.pages = pages if pages is not None else {}
+        self.generated = generated if generated is not None else []
+
+    @classmethod
+    def load(cls, path: str) -> "SiteIndex":
+        if not os.path.exists(path):
+            return cls()
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        return cls(data.get("pages", {}), data.get("generated", []))
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(json.dumps({"pages": self.pages, "generated": self.generated}, sort_keys=True))
+
+    def add_page(self, source: str, output: str, title: str, summary: str | None, mtime: float,
+                 metadata: dict = None) -> None:
+        self.pages[source] = {"output": output, "title": title, "summary": summary, "mtime": mtime,
+                              "metadata": metadata if metadata is not None else {}}
+
+    def remove_page(self, source: str) -> None:
+        self.pages.pop(source, None)
+
+    def entries(self) -> list[dict]:
+        """
+        :return: the page entries with their "url", in the order of front_matter.sort_key, then newest first
+        """
+        entries = [dict(entry, url=page_url(entry["output"])) for entry in self.pages.values()]
+        return sorted(entries, key=lambda entry: (sort_key(entry.get("metadata", {})), -entry["mtime"],
+                                                  entry["url"]))
+
+    def listings(self) -> dict[str, list[dict]]:
+        """
+        Groups the pages by the directory URL directly above theirs, e.g. "/blog/" for "/blog/tom/", leaving out
+        directories that have a page of their own.
+
+        :return: maps the URL of every directory needing a listing page to its entries, in the order of entries
+        """
+        urls = {page_url(entry["output"]) for entry in self.pages.values()}
+        listings: dict[str, list[dict]] = {}
+        for entry in self.entries():
+            if entry["url"] == "/":
+                continue
+            parent = posixpath.dirname(entry["url"].rstrip("/")).rstrip("/") + "/"
+            if parent not in urls:
+                listings.setdefault(parent, []).append(entry)
+        return listings
+
+    def __eq__(self, other: "SiteIndex") -> bool:
+        return self.pages == other.pages and self.generated == other.generated
+
+    def __repr__(self) -> str:
+        return f"SiteIndex(pages={len(self.pages)}, generated={len(self.generated)})"
+
+
+def render_listing(template: Template, directory_url: str, entries: list[dict]) -> str:
+    name = posixpath.basename(directory_url.rstrip("/"))
+    title = name[:1].upper() + name[1:]
+    items = "".join(f'<li><a href="{escape(entry["url"])}">{escape(entry["title"])}</a>{entry["summary"] or ""}</li>'
+                    for entry in entries)
+    return template.render(title, f"<div><h1>{escape(title)}</h1><ul>{items}</ul></div>")
+
+
+def render_sitemap(urls: list[tuple[str, float]], site_url: str, basepath: str) -> str:
+    """
+
+    :param urls: the (url, mtime) of every page
+    """
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for url, mtime in sorted(urls):
+        lines.append(f"  <url><loc>{escape(absolute_url(site_url, basepath, url))}</loc>"
+                     f"<lastmod>{_timestamp(mtime)[:10]}</lastmod></url>")
+    lines.append("</urlset>")
+    return "\n".join(lines) + "\n"
+
+
+def render_feed(entries: list[dict], title: str, site_url: str, basepath: str) -> str:
+    """
+    Renders an Atom feed of entries; links in the summaries are made absolute so feed readers can follow them.
+    """
+    home = absolute_url(site_url, basepath, "/")
+    updated = _timestamp(max((entry["mtime"] for entry in entries), default=0))
+    lines = ['<?xml version="1.0" encoding="utf-8"?>',
+             '<feed xmlns="http://www.w3.org/2005/Atom">',
+             f"  <title>{escape(title)}</title>",
+             f'  <link href="{escape(home)}"/>',
+             f'  <link rel="self" href="{escape(absolute_url(site_url, basepath, "/" + FEED_OUTPUT))}"/>',
+             f"  <id>{escape(home)}</id>",
+             f"  <updated>{updated}</updated>"]
+    for entry in entries:
+        url = escape(absolute_url(site_url, basepath, entry["url"]))
+        lines.append("  <entry>")
+        lines.append(f"    <title>{escape(entry['title'])}</title>")
+        lines.append(f'    <link href="{url}"/>')
+        lines.append(f"    <id>{url}</id>")
+        lines.append(f"    <updated>{_timestamp(entry['mtime'])}</updated>")
+        metadata = entry.get("metadata", {})
+        if metadata.get("date"):
+            lines.append(f"    <published>{metadata['date']}T00:00:00Z</published>")
+        for tag in metadata.get("tags", ()):
+            lines.append(f'    <category term="{escape(tag)}"/>')
+        if entry["summary"]:
+            summary = rewrite_urls(entry["summary"], absolute_url(site_url, basepath, "/"))
+            lines.append(f'    <summary type="html">{escape(summary)}</summary>')
+        lines.append("  </entry>")
+    lines.append("</feed>")
+    return "\n".join(lines) + "\n"
+
+
+def emit_site_files(index: SiteIndex, template: Template, dest_dir: str, site_url: str, feed_dir: str = "blog",
+                    writer: OutputWriter = None) -> list[str]:
+    """
+    Writes a listing page for every directory of pages without a page of its own, sitemap.xml covering the pages
+    and listings, and an Atom feed of the pages below feed_dir, all from the index, without reading any source.
+    Listing pages written last time that are no longer needed are deleted; index.generated is updated.
+
+    :param site_url: scheme and host the site is served from, e.g. "https://example.com"
+    :param feed_dir: output directory whose pages make up the feed; "" for all pages
+    :return: the written output paths, relative to dest_dir
+    """
+    writer = writer if writer is not None else OutputWriter()
+    entries = index.entries()
+    generated: list[str] = []
+    urls = [(entry["url"], entry["mtime"]) for entry in entries]
+    for directory_url, children in sorted(index.listings().items()):
+        output = directory_url.lstrip("/") + LISTING_OUTPUT
+        path = os.path.join(dest_dir, output)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        writer.write_text(path, render_listing(template, directory_url, children))
+        generated.append(output)
+        urls.append((directory_url, max(child["mtime"] for child in children)))
+
+    writer.write_text(os.path.join(dest_dir, SITEMAP_OUTPUT), render_sitemap(urls, site_url, template.basepath))
+    generated.append(SITEMAP_OUTPUT)
+    prefix = "/" + feed_dir.strip("/") + "/" if feed_dir.strip("/") else "/"
+    feed_entries = [entry for entry in entries if entry["url"].startswith(prefix) and entry["url"] != prefix]
+    home = next((entry["title"] for entry in entries if entry["url"] == "/"), site_url)
+    writer.write_text(os.path.join(dest_dir, FEED_OUTPUT), render_feed(feed_entries, home, site_url,
+                                                                      template.basepath))
+    generated.append(FEED_OUTPUT)
+
+    outputs = {entry["output"].replace(os.sep, "/") for entry in entries}
+    for output in sorted(set(index.generated) - set(generated) - outputs):
+        writer.delete(os.path.join(dest_dir, output))
+    index.generated = generated
+    return generated
@@ -0,0 +1,156 @@
+import json
+import os
+import shutil
+
+from manifest import hash_file
+
+
+class SyncReport:
+    def __init__(self):
+        self.copied: list[str] = []
+        self.linked: list[str] = []
+        self.unchanged: list[str] = []
+        self.removed: list[str] = []
+
+    def __repr__(self) -> str:
+        return (f"SyncReport(copied={len(self.copied)}, linked={len(self.linked)}, "
+                f"unchanged={len(self.unchanged)}, removed={len(self.removed)})")
+
+
+def load_sync_state(path: str) -> dict[str, dict]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_sync_state(path: str, state: dict[str, dict]) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+
+
+def list_files(src: str) -> list[str]:
+    files: list[str] = []
+    for root, dirs, names in os.walk(src):
+        dirs.sort()
+        for name in sorted(names):
+            files.append(os.path.relpath(os.path.join(root, name), src))
+    return files
+
+
+def copy_file(src: str, dest: str) -> None:
+    """
+    Copies src to dest, letting the kernel do the copy with copy_file_range (which can reflink on
+    filesystems that support it) and falling back to a userspace copy. Timestamps are preserved so
+    the next size/mtime comparison sees the file as unchanged.
+    """
+    try:
+        with open(src, 'rb') as fsrc, open(dest, 'wb') as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+            if remaining > 0:
+                raise OSError("copy_file_range stopped early")
+    except (AttributeError, OSError):
+        shutil.copyfile(src, dest)
+    shutil.copystat(src, dest)
+
+
+def install_file(src: str, dest: str, link: bool) -> bool:
+    """
+    Places src at dest through a temporary file and os.replace, so a server reading dest never sees
+    a missing or half-written file.
+
+    :return: True if dest was hardlinked, False if it was copied
+    """
+    tmp_path = f"{dest}.sync-tmp"
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    linked = False
+    if link:
+        try:
+            os.link(src, tmp_path)
+            linked = True
+        except OSError:
+            pass
+    if not linked:
+        copy_file(src, tmp_path)
+    os.replace(tmp_path, dest)
+    return linked
+
+
+def _is_unchanged(src_path: str, dest_path: str, entry: dict | None, src_stat: os.stat_result,
+                  use_hash: bool) -> tuple[bool, str | None]:
+    if entry is None or not os.path.exists(dest_path):
+        return False, hash_file(src_path) if use_hash else None
+    dest_stat = os.stat(dest_path)
+    if dest_stat.st_size != src_stat.st_size:
+        return False, hash_file(src_path) if use_hash else None
+    if use_hash:
+        src_hash = hash_file(src_path)
+        return src_hash == entry.get("hash"), src_hash
+    return int(dest_stat.st_mtime) == int(src_stat.st_mtime) and entry.get("mtime") == src_stat.st_mtime_ns, None
+
+
+def sync_tree(src: str, dest: str, state_path: str, use_hash: bool = False, link: bool = False,
+              files: list[str] = None) -> SyncReport:
+    """
+    Makes dest contain every file of src, copying only files whose size or mtime (or content hash,
+    if use_hash is set) changed since the last sync. Files that were synced before but no longer exist
+    in src are removed; any other file in dest, such as generated HTML, is left alone.
+
+    :param state_path: JSON file recording which files were synced, so stale ones can be removed
+    :param use_hash: compare the content hash instead of size and mtime
+    :param link: hardlink files instead of copying them where the filesystem allows it
+    :param files: the relative paths of the files in src, e.g. from a BuildPlan; listed with list_files if None
+    """
+    report = SyncReport()
+    old_state = load_sync_state(state_path)
+    new_state: dict[str, dict] = {}
+    for rel_path in files if files is not None else list_files(src):
+        src_path = os.path.join(src, rel_path)
+        dest_path = os.path.join(dest, rel_path)
+        src_stat = os.stat(src_path)
+        unchanged, src_hash = _is_unchanged(src_path, dest_path, old_state.get(rel_path), src_stat, use_hash)
+        entry = {"size": src_stat.st_size, "mtime": src_stat.st_mtime_ns}
+        if src_hash is not None:
+            entry["hash"] = src_hash
+        new_state[rel_path] = entry
+        if unchanged:
+            report.unchanged.append(rel_path)
+            continue
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        if install_file(src_path, dest_path, link):
+            report.linked.append(rel_path)
+        else:
+            report.copied.append(rel_path)
+
+    for rel_path in sorted(old_state.keys() - new_state.keys()):
+        dest_path = os.path.join(dest, rel_path)
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+            report.removed.append(rel_path)
+        _remove_empty_parents(os.path.dirname(dest_path), dest)
+
+    save_sync_state(state_path, new_state)
+    return report
+
+
+def _remove_empty_parents(directory: str, root: str) -> None:
+    root = os.path.abspath(root)
+    directory = os.path.abspath(directory)
+    while directory != root and directory.startswith(root):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            return
+        directory = os.path.dirname(directory)
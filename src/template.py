@@ -0,0 +1,220 @@
+import os
+import re
+from typing import Iterable, Iterator, TextIO
+
+from manifest import hash_file, hash_text
+
+TITLE_PLACEHOLDER = "{{ Title }}"
+CONTENT_PLACEHOLDER = "{{ Content }}"
+
+TEMPLATES_DIR = "templates"
+DIRECTORY_TEMPLATE = "default.html"
+
+# {{ Include "partials/header.html" }} is replaced by that file, relative to the including template
+_INCLUDE_PATTERN = re.compile(r'\{\{\s*Include\s+"([^"]+)"\s*\}\}')
+
+_PLACEHOLDER_PATTERN = re.compile(f"({re.escape(TITLE_PLACEHOLDER)}|{re.escape(CONTENT_PLACEHOLDER)})")
+_URL_PATTERN = re.compile(r'(href|src)="/')
+_URL_PATTERN_LENGTH = len('href="/')
+
+
+def rewrite_urls(text: str, basepath: str) -> str:
+    if basepath == "/":
+        return text
+    return text.replace('href="/', f'href="{basepath}').replace('src="/', f'src="{basepath}')
+
+
+def rewrite_url_chunks(chunks: Iterable[str], basepath: str) -> Iterator[str]:
+    """
+    Streaming version of rewrite_urls. The last few characters of every chunk are held back until the next
+    chunk arrives, so an attribute split across two chunks is still rewritten.
+    """
+    if basepath == "/":
+        yield from chunks
+        return
+    carry = ""
+    for chunk in chunks:
+        buffer = carry + chunk
+        # a match starting before this index is complete, one starting after it may continue in the next chunk
+        safe_end = len(buffer) - _URL_PATTERN_LENGTH + 1
+        out: list[str] = []
+        pos = 0
+        for match in _URL_PATTERN.finditer(buffer):
+            if match.start() >= safe_end:
+                break
+            out.append(buffer[pos:match.start()])
+            out.append(f'{match.group(1)}="{basepath}')
+            pos = match.end()
+        keep_from = max(pos, safe_end)
+        out.append(buffer[pos:keep_from])
+        carry = buffer[keep_from:]
+        yield "".join(out)
+    yield rewrite_urls(carry, basepath)
+
+
+def expand_includes(text: str, directory: str, including: tuple[str, ...] = ()) -> tuple[str, list[str]]:
+    """
+    Replaces every {{ Include "path" }} in text by the contents of that file, resolved against directory, and
+    expands the includes of the included files in turn.
+
+    :param including: the files currently being expanded, to detect include cycles
+    :return: the expanded text and the paths of all files it included, in order
+    """
+    partials: list[str] = []
+
+    def include(match: re.Match) -> str:
+        path = os.path.normpath(os.path.join(directory, match.group(1)))
+        if path in including:
+            raise ValueError(f"Include cycle: {' -> '.join(including + (path,))}")
+        with open(path, 'r') as f:
+            text, nested = expand_includes(f.read(), os.path.dirname(path), including + (path,))
+        partials.append(path)
+        partials.extend(nested)
+        return text
+    return _INCLUDE_PATTERN.sub(include, text), partials
+
+
+class Template:
+    def __init__(self, text: str, basepath: str = "/", path: str = None, partials: list[str] = None,
+                 fingerprint: str = None):
+        """
+        Compiles a template into static segments and placeholder slots. The basepath rewrite is applied
+        to the static segments once here, so rendering a page is a single join.
+
+        :param text: the template source containing {{ Title }} and {{ Content }} placeholders, includes expanded
+        :param basepath: the basepath absolute href and src attributes are rewritten to
+        :param path: the file the template was loaded from, if any
+        :param partials: the files included into text
+        :param fingerprint: hash of the template file and its partials, which changes whenever any of them does
+        """
+        self.text = text
+        self.basepath = basepath
+        self.path = path
+        self.partials = partials if partials is not None else []
+        self.fingerprint = fingerprint if fingerprint is not None else hash_text(text)
+        self.parts: list[str] = []
+        self.slots: list[tuple[int, str]] = []
+        for i, part in enumerate(_PLACEHOLDER_PATTERN.split(text)):
+            if i % 2:
+                self.slots.append((len(self.parts), part))
+                self.parts.append("")
+            else:
+                self.parts.append(rewrite_urls(part, basepath))
+
+    @classmethod
+    def load(cls, path: str, basepath: str = "/") -> "Template":
+        with open(path, 'r') as f:
+            text, partials = expand_includes(f.read(), os.path.dirname(path), (os.path.normpath(path),))
+        return cls(text, basepath, path, partials, template_fingerprint(path, partials))
+
+    def render(self, title: str, content: str) -> str:
+        values = {TITLE_PLACEHOLDER: rewrite_urls(title, self.basepath),
+                  CONTENT_PLACEHOLDER: rewrite_urls(content, self.basepath)}
+        parts = self.parts.copy()
+        for index, placeholder in self.slots:
+            parts[index] = values[placeholder]
+        return "".join(parts)
+
+    def iter_render(self, title: str, content_chunks: Iterable[str]) -> Iterator[str]:
+        title = rewrite_urls(title, self.basepath)
+        slots = dict(self.slots)
+        if list(slots.values()).count(CONTENT_PLACEHOLDER) > 1:
+            content_chunks = list(content_chunks)
+        for index, part in enumerate(self.parts):
+            placeholder = slots.get(index)
+            if placeholder == TITLE_PLACEHOLDER:
+                yield title
+            elif placeholder == CONTENT_PLACEHOLDER:
+                yield from rewrite_url_chunks(content_chunks, self.basepath)
+            else:
+                yield part
+
+    def write(self, fp: TextIO, title: str, content_chunks: Iterable[str]) -> None:
+        for chunk in self.iter_render(title, content_chunks):
+            fp.write(chunk)
+
+    def __repr__(self) -> str:
+        return f"Template({self.path=}, {self.basepath=}, slots={len(self.slots)})"
+
+
+def template_fingerprint(path: str, partials: Iterable[str]) -> str:
+    return hash_text(" ".join(hash_file(file) for file in [path, *partials]))
+
+
+class TemplateCache:
+    def __init__(self):
+        """
+        Compiled templates by path and basepath. A template is compiled again only when the hash of its file or
+        of one of its partials changed, so a build, or a watch session, compiles every template once.
+        """
+        self.templates: dict[tuple[str, str], Template] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path: str, basepath: str = "/") -> Template:
+        key = (os.path.normpath(path), basepath)
+        cached = self.templates.get(key)
+        if cached is not None:
+            try:
+                fresh = template_fingerprint(path, cached.partials) == cached.fingerprint
+            except OSError:
+                fresh = False
+            if fresh:
+                self.hits += 1
+                return cached
+        self.misses += 1
+        template = Template.load(path, basepath)
+        self.templates[key] = template
+        return template
+
+    def files(self) -> set[str]:
+        """
+        :return: every loaded template and partial
+        """
+        return {os.path.normpath(file) for template in self.templates.values()
+                for file in [template.path, *template.partials]}
+
+    def __repr__(self) -> str:
+        return f"TemplateCache(templates={len(self.templates)}, hits={self.hits}, misses={self.misses})"
+
+
+class TemplateSelector:
+    def __init__(self, template_path: str):
+        """
+        Picks the template of every page, from the most specific rule to the least:
+
+        - the "template" named by the front matter of the page, relative to the directory of template_path
+        - templates/<page path>.html, e.g. templates/contact/index.html for content/contact/index.md
+        - the nearest templates/<directory>/default.html above the page, e.g. templates/blog/default.html for
+          every page below content/blog
+        - template_path
+
+        The templates directory sits next to template_path; it is scanned once, here.
+        """
+        self.template_path = template_path
+        self.root = os.path.join(os.path.dirname(template_path), TEMPLATES_DIR)
+        self.files: set[str] = set()
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                self.files.add(os.path.relpath(os.path.join(directory, name), self.root).replace(os.sep, "/"))
+
+    def select(self, source: str, metadata: dict = None) -> str:
+        """
+
+        :param source: the path of the page, relative to the content directory
+        :param metadata: the front matter of the page
+        """
+        if metadata and metadata.get("template"):
+            return os.path.join(os.path.dirname(self.template_path), metadata["template"])
+        source = source.replace(os.sep, "/")
+        page_template = os.path.splitext(source)[0] + ".html"
+        if page_template in self.files:
+            return os.path.join(self.root, page_template)
+        directory = os.path.dirname(source)
+        while True:
+            directory_template = f"{directory}/{DIRECTORY_TEMPLATE}" if directory else DIRECTORY_TEMPLATE
+            if directory_template in self.files:
+                return os.path.join(self.root, directory_template)
+            if not directory:
+                return self.template_path
+            directory = os.path.dirname(directory)
@@ -0,0 +1,37 @@
+import os
+import tempfile
+import unittest
+
+from benchmark import PHASES, SiteShape, compare, generate_site, run_benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_generate_site_shape(self):
+        shape = SiteShape(pages=12, depth=3, assets=3, asset_size=16)
+        with tempfile.TemporaryDirectory() as root:
+            generate_site(root, shape)
+            pages = [name for _, _, files in os.walk(os.path.join(root, "content")) for name in files]
+            assets = [name for _, _, files in os.walk(os.path.join(root, "static")) for name in files]
+            self.assertEqual(len(pages), 12)
+            self.assertEqual(len(assets), 3)
+            self.assertTrue(os.path.exists(os.path.join(root, "template.html")))
+
+    def test_run_benchmark_timesEveryPhase(self):
+        with tempfile.TemporaryDirectory() as root:
+            generate_site(root, SiteShape(pages=5, assets=2, asset_size=16))
+            phases = run_benchmark(root)
+            outputs = [name for _, _, files in os.walk(os.path.join(root, "docs")) for name in files]
+        self.assertEqual(list(phases), PHASES)
+        self.assertEqual(len([name for name in outputs if name.endswith(".html")]), 5)
+        self.assertEqual(len([name for name in outputs if name.endswith(".bin")]), 2)
+
+    def test_compare(self):
+        old = {"phases": {"read": 2.0, "file_writes": 1.0}}
+        new = {"phases": {"read": 1.0, "file_writes": 1.0}}
+        lines = compare(old, new).split("\n")
+        self.assertTrue(lines[1].startswith("read"))
+        self.assertTrue(lines[1].endswith("0.50"))
+
+
+if __name__ == "__main__":
+    unittest.main()
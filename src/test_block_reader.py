@@ -0,0 +1,80 @@
+import os
+import random
+import tempfile
+import unittest
+from io import StringIO
+
+from block_reader import extract_title_from_file, iter_blocks, iter_file_html, iter_mmap_raw_blocks, iter_raw_blocks
+from front_matter import read_front_matter, split_front_matter
+from markdown_parser import markdown_to_blocks, markdown_to_html
+from page_generator import extract_title
+
+
+class TestIterRawBlocks(unittest.TestCase):
+    def test_iter_raw_blocks_matchesSplit_randomChunkSizes(self):
+        rng = random.Random(42)
+        for _ in range(500):
+            text = "".join(rng.choice(["\n", "\n", "a", "b ", "\r"]) for _ in range(rng.randint(0, 30)))
+            chunk_size = rng.randint(1, 5)
+            with self.subTest(text=text, chunk_size=chunk_size):
+                self.assertEqual(list(iter_raw_blocks(StringIO(text), chunk_size)), text.split("\n\n"))
+
+    def test_iter_blocks_matchesMarkdownToBlocks(self):
+        text = "# This is a heading\n\n\nThis is a paragraph of text.\n\n* This is a list\n* another item  \n* and"
+        self.assertEqual(list(iter_blocks(StringIO(text))), markdown_to_blocks(text))
+
+
+class TestFileBlocks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "page.md")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, data: bytes) -> None:
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    def read(self) -> str:
+        with open(self.path, 'r') as f:
+            return f.read()
+
+    def test_iter_mmap_raw_blocks_matchesSplit(self):
+        self.write("# Título\n\nPárrafo **negrita**\n\n\n- uno\n- dos\n".encode())
+        self.assertEqual(list(iter_mmap_raw_blocks(self.path)), self.read().split("\n\n"))
+
+    def test_iter_mmap_raw_blocks_emptyFile(self):
+        self.write(b"")
+        self.assertEqual(list(iter_mmap_raw_blocks(self.path)), [""])
+
+    def test_iter_mmap_raw_blocks_carriageReturns_translatedLikeTextMode(self):
+        self.write(b"# Title\r\n\r\nParagraph\r\n")
+        self.assertEqual(list(iter_mmap_raw_blocks(self.path)), self.read().split("\n\n"))
+
+    def test_iter_file_html_matchesMarkdownToHtml(self):
+        content_dir = os.path.join(os.path.dirname(__file__), "..", "content")
+        path = os.path.join(content_dir, "blog", "glorfindel", "index.md")
+        with open(path) as f:
+            expected = markdown_to_html(f.read())
+        self.assertEqual("".join(iter_file_html(path)), expected)
+
+    def test_iter_file_html_afterFrontMatter_matchesBody(self):
+        for newline in (b"\n", b"\r\n"):
+            self.write(newline.join([b"---", b"title: x", b"---", b"# Title", b"", b"Body"]))
+            metadata, offset = read_front_matter(self.path)
+            body = split_front_matter(self.read())[1]
+            self.assertEqual("".join(iter_file_html(self.path, offset=offset)), markdown_to_html(body))
+            self.assertEqual(extract_title_from_file(self.path, offset), "Title")
+
+    def test_extract_title_from_file_matchesExtractTitle(self):
+        self.write(b"Intro line\n\n# The Title#  \n\n## Sub\n")
+        self.assertEqual(extract_title_from_file(self.path), extract_title(self.read()))
+
+    def test_extract_title_from_file_noTitle_raises(self):
+        self.write(b"no title here\n")
+        self.assertRaises(ValueError, extract_title_from_file, self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+
+from build_plan import COPY, DELETE, MKDIR, RENDER, BuildPlan, PlanAction, make_plan
+from fixtures import write_file
+from page_generator import collect_pages
+
+
+class TestBuildPlan(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.docs = os.path.join(self.tmp.name, "docs")
+        write_file(os.path.join(self.content, "index.md"), "# Home")
+        write_file(os.path.join(self.content, "blog", "readme.md", "index.md"), "# Post")
+        write_file(os.path.join(self.static, "images", "tom.png"), "png")
+        write_file(os.path.join(self.static, "index.css"), "css")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def plan(self, previous: BuildPlan = None) -> BuildPlan:
+        return make_plan(self.content, self.static, self.docs, previous)
+
+    def test_make_plan_actions(self):
+        actions = [(action.kind, action.source, action.dest) for action in self.plan().actions]
+        self.assertEqual(actions, [
+            (MKDIR, None, os.path.join("blog", "readme.md")),
+            (MKDIR, None, "images"),
+            (RENDER, os.path.join("blog", "readme.md", "index.md"), os.path.join("blog", "readme.md", "index.html")),
+            (RENDER, "index.md", "index.html"),
+            (COPY, os.path.join("images", "tom.png"), os.path.join("images", "tom.png")),
+            (COPY, "index.css", "index.css"),
+        ])
+
+    def test_pages_matchCollectPages(self):
+        self.assertEqual(self.plan().pages(), collect_pages(self.content, self.docs))
+
+    def test_make_directories(self):
+        plan = self.plan()
+        plan.make_directories()
+        self.assertTrue(os.path.isdir(os.path.join(self.docs, "blog", "readme.md")))
+        self.assertTrue(os.path.isdir(os.path.join(self.docs, "images")))
+
+    def test_diff_firstPlan_allAdded(self):
+        diff = self.plan().diff(None)
+        self.assertEqual(len(diff["added"]), 4)
+        self.assertEqual(diff["removed"], [])
+        self.assertEqual(diff["changed"], [])
+
+    def test_diff_changedAddedRemoved(self):
+        previous = self.plan()
+        write_file(os.path.join(self.content, "index.md"), "# New home page")
+        write_file(os.path.join(self.content, "contact.md"), "# Contact")
+        os.remove(os.path.join(self.static, "index.css"))
+        self.assertEqual(self.plan(previous).diff(previous),
+                         {"added": ["contact.html"], "removed": ["index.css"], "changed": ["index.html"]})
+
+    def test_removedOutput_deleteAction(self):
+        previous = self.plan()
+        previous.make_directories()
+        write_file(os.path.join(self.docs, "index.css"), "css")
+        os.remove(os.path.join(self.static, "index.css"))
+        plan = self.plan(previous)
+        self.assertEqual(plan.actions_of(DELETE), [PlanAction(DELETE, "index.css")])
+        self.assertEqual(plan.remove_stale(), [os.path.join(self.docs, "index.css")])
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.css")))
+
+    def test_save_load_roundTrip(self):
+        plan = self.plan()
+        path = os.path.join(self.tmp.name, ".cache", "plan.json")
+        plan.save(path)
+        loaded = BuildPlan.load(path)
+        self.assertEqual(loaded.actions, plan.actions)
+        self.assertEqual(loaded.diff(plan), {"added": [], "removed": [], "changed": []})
+
+    def test_load_missing(self):
+        self.assertIsNone(BuildPlan.load(os.path.join(self.tmp.name, "missing.json")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+
+from dependency_graph import DependencyGraph, template_references, url_to_output
+
+
+class TestUrlToOutput(unittest.TestCase):
+    def test_page(self):
+        self.assertEqual(url_to_output("/blog/tom"), "blog/tom/index.html")
+        self.assertEqual(url_to_output("/blog/tom/"), "blog/tom/index.html")
+        self.assertEqual(url_to_output("/"), "index.html")
+
+    def test_file(self):
+        self.assertEqual(url_to_output("/images/tom.png"), "images/tom.png")
+        self.assertEqual(url_to_output("/images/my%20tom.png?v=2#top"), "images/my tom.png")
+
+    def test_relative(self):
+        self.assertEqual(url_to_output("tom.png", "blog/tom/index.html"), "blog/tom/tom.png")
+        self.assertEqual(url_to_output("../majesty", "blog/tom/index.html"), "blog/majesty/index.html")
+
+    def test_external(self):
+        self.assertIsNone(url_to_output("https://www.boot.dev"))
+        self.assertIsNone(url_to_output("//cdn.example.com/a.js"))
+        self.assertIsNone(url_to_output("mailto:me@example.com"))
+        self.assertIsNone(url_to_output("#section"))
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = DependencyGraph()
+        self.graph.add_template("template.html", template_references('<link href="/index.css"> {{ Content }}'))
+        self.graph.add_template("other.html", [], [os.path.join("partials", "footer.html")])
+        self.graph.add_page("index.md", "index.html", "template.html",
+                            [("href", "/blog/tom"), ("src", "/images/tolkien.png"), ("href", "https://boot.dev")])
+        self.graph.add_page(os.path.join("blog", "tom", "index.md"), os.path.join("blog", "tom", "index.html"),
+                            "template.html", [("href", "/"), ("src", "/images/tom.png")])
+        self.graph.add_page("contact.md", "contact.html", "other.html", [("src", "/images/tom.png")])
+
+    def test_template_references(self):
+        self.assertEqual(template_references('<a href="/">x</a><img src="/a.png">'), [("href", "/"), ("src", "/a.png")])
+
+    def test_affected_pages_source(self):
+        self.assertEqual(self.graph.affected_pages(sources=["index.md"]),
+                         [os.path.join("blog", "tom", "index.md"), "index.md"])
+
+    def test_affected_pages_newSource(self):
+        self.assertEqual(self.graph.affected_pages(sources=["new.md"]), ["new.md"])
+
+    def test_affected_pages_template(self):
+        self.assertEqual(self.graph.affected_pages(templates=["other.html"]), ["contact.md"])
+
+    def test_affected_pages_partial(self):
+        self.assertEqual(self.graph.affected_pages(templates=[os.path.join("partials", "footer.html")]),
+                         ["contact.md"])
+        self.assertEqual(self.graph.template_files(), {"template.html", "other.html",
+                                                       os.path.join("partials", "footer.html")})
+
+    def test_affected_pages_asset(self):
+        self.assertEqual(self.graph.affected_pages(assets=[os.path.join("images", "tom.png")]),
+                         [os.path.join("blog", "tom", "index.md"), "contact.md"])
+        self.assertEqual(self.graph.affected_pages(assets=["images/tolkien.png"]), ["index.md"])
+
+    def test_affected_pages_assetReferencedByTemplate(self):
+        self.assertEqual(self.graph.affected_pages(assets=["index.css"]),
+                         [os.path.join("blog", "tom", "index.md"), "index.md"])
+
+    def test_affected_pages_unreferencedAsset(self):
+        self.assertEqual(self.graph.affected_pages(assets=["robots.txt"]), [])
+
+    def test_remove_page(self):
+        self.graph.remove_page("contact.md")
+        self.assertEqual(self.graph.affected_pages(templates=["other.html"]), [])
+
+    def test_save_load_roundTrip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, ".cache", "dependencies.json")
+            self.graph.save(path)
+            self.assertEqual(DependencyGraph.load(path), self.graph)
+
+    def test_load_corrupt_returnsEmpty(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "dependencies.json")
+            with open(path, 'w') as f:
+                f.write("{not json")
+            self.assertEqual(DependencyGraph.load(path), DependencyGraph())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+
+from front_matter import MetadataIndex, read_front_matter, sort_key, split_front_matter
+
+DOCUMENT = """---
+title: A post
+date: 2024-03-01
+tags: elves, rings
+draft: yes
+template: post.html
+sort: 2
+---
+# Heading
+
+Body."""
+
+
+class TestFrontMatter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "page.md")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, text: str) -> None:
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+    def test_split_front_matter(self):
+        metadata, body = split_front_matter(DOCUMENT)
+        self.assertEqual(metadata, {"title": "A post", "date": "2024-03-01", "tags": ["elves", "rings"],
+                                    "draft": True, "template": "post.html", "sort": 2})
+        self.assertEqual(body, "# Heading\n\nBody.")
+
+    def test_split_front_matter_noFrontMatter(self):
+        self.assertEqual(split_front_matter("# Heading\n\n---"), ({}, "# Heading\n\n---"))
+
+    def test_split_front_matter_invalid_raises(self):
+        for text in ("---\ntitle: x\n# Heading", "---\nno separator\n---", "---\ndraft: maybe\n---",
+                     "---\ndate: March\n---", "---\nsort: first\n---"):
+            self.assertRaises(ValueError, split_front_matter, text)
+
+    def test_read_front_matter_matchesSplit(self):
+        for text in (DOCUMENT, "# No front matter\n\nBody.", "---\r\ntitle: Windows\r\n---\r\n# Heading"):
+            with open(self.path, 'w', newline="") as f:
+                f.write(text)
+            metadata, offset = read_front_matter(self.path)
+            with open(self.path, 'rb') as f:
+                body = f.read()[offset:].decode("utf-8")
+            self.assertEqual((metadata, body), split_front_matter(text))
+
+    def test_read_front_matter_readsOnlyTheHeader(self):
+        self.write("---\ntitle: x\n---\n" + "\xff" * 10)
+        with open(self.path, 'ab') as f:
+            f.write(b"\xff not utf-8")
+        self.assertEqual(read_front_matter(self.path)[0], {"title": "x"})
+
+    def test_sort_key(self):
+        pages = [{"date": "2024-01-01"}, {}, {"sort": -1}, {"date": "2024-06-01"}]
+        self.assertEqual(sorted(pages, key=sort_key), [{"sort": -1}, {"date": "2024-06-01"}, {"date": "2024-01-01"},
+                                                       {}])
+
+
+class TestMetadataIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.tmp.name, ".cache", "metadata.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_metadata_readOnlyWhenHashChanged(self):
+        path = os.path.join(self.tmp.name, "page.md")
+        with open(path, 'w') as f:
+            f.write("---\ntags: a\n---\n# Page")
+        index = MetadataIndex()
+        self.assertEqual(index.metadata("page.md", path, "hash1"), {"tags": ["a"]})
+        index.save(self.index_path)
+        os.remove(path)
+        index = MetadataIndex.load(self.index_path)
+        self.assertEqual(index.metadata("page.md", path, "hash1"), {"tags": ["a"]})
+        self.assertRaises(FileNotFoundError, index.metadata, "page.md", path, "hash2")
+
+    def test_select_filtersAndSorts(self):
+        index = MetadataIndex({
+            "old.md": {"hash": "", "metadata": {"date": "2023-01-01", "tags": ["elves"]}},
+            "new.md": {"hash": "", "metadata": {"date": "2024-01-01", "tags": ["elves", "rings"]}},
+            "draft.md": {"hash": "", "metadata": {"draft": True, "tags": ["elves"]}},
+            "pinned.md": {"hash": "", "metadata": {"sort": -1}},
+        })
+        self.assertEqual(index.select(), ["pinned.md", "new.md", "old.md"])
+        self.assertEqual(index.select(tag="elves"), ["new.md", "old.md"])
+        self.assertEqual(index.select(tag="elves", drafts=True), ["new.md", "old.md", "draft.md"])
+
+
+if __name__ == "__main__":
+    unittest.main()
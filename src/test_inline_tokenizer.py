@@ -0,0 +1,226 @@
+import random
+import re
+import sys
+import unittest
+
+import inline_tokenizer
+from inline_tokenizer import Boundary, find_link_spans, iter_inline_events, tokenize_line
+from markdown_parser import chained_line_to_textnodes, line_to_html
+from textnode import TextNode, TextType
+
+LINES = [
+    "This is plain text.",
+    "Text with **bold** text.",
+    "Text with _italic_ and **bold** text.",
+    "Text with `code` text.",
+    "Text with ![image](https://image.png) text.",
+    "Text with [to bootdev](https://boot.dev) text.",
+    "[to bootdev](https://boot.dev)",
+    "* this is an unordered list item",
+    "- a list item with **bold**",
+    "12. an ordered list item with `code`  ",
+    "This is **text** with an _italic_ word and a `code block` "
+    "and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)",
+    "**bold** at the start and `code` at the end `x`",
+    "`plain code` and **bold**",
+    "![](https://image.png)[](https://boot.dev)",
+    "[a] b [c](d) and ![e] f ![g](h)",
+    "text with [broken](link and ![broken](image",
+    "text without [url]() and [url](x)",
+    "",
+]
+
+# lines the chained pipeline cannot handle, and the nodes of the innermost span each text belongs to
+NESTED_LINES = {
+    "Text with *italic* text.": [TextNode("Text with ", TextType.TEXT), TextNode("italic", TextType.ITALIC),
+                                 TextNode(" text.", TextType.TEXT)],
+    "**bold with _underscores_ inside**": [TextNode("bold with ", TextType.BOLD),
+                                           TextNode("underscores", TextType.ITALIC),
+                                           TextNode(" inside", TextType.BOLD)],
+    "_a **b** c_": [TextNode("a ", TextType.ITALIC), TextNode("b", TextType.BOLD), TextNode(" c", TextType.ITALIC)],
+    "***both***": [TextNode("both", TextType.BOLD)],
+    "__strong__ too": [TextNode("strong", TextType.BOLD), TextNode(" too", TextType.TEXT)],
+    "_![image in italic](https://image.png) and more_": [TextNode("image in italic", TextType.IMAGE,
+                                                                  "https://image.png"),
+                                                         TextNode(" and more", TextType.ITALIC)],
+    "`code with _underscores_`": [TextNode("code with _underscores_", TextType.CODE)],
+    "``code with ` inside``": [TextNode("code with ` inside", TextType.CODE)],
+    "**[link in bold](https://boot.dev)**": [TextNode("link in bold", TextType.LINK, "https://boot.dev")],
+}
+
+LITERAL_LINES = [
+    "unmatched **bold",
+    "unmatched _italic",
+    "unmatched `code",
+    "snake_case_names and a_b_c",
+    "a * b * c and a _ b _ c",
+    "2 * 3 is **6",
+    "****",
+]
+
+
+def random_line(rng: random.Random) -> str:
+    pieces = ["**", "*", "_", "`", "word", " ", ".", "(", ")", "!"]
+    return "x " + "".join(rng.choice(pieces) for _ in range(rng.randint(0, 16)))
+
+
+class StepLimitExceeded(Exception):
+    pass
+
+
+def count_steps(func, line: str, limit: int = None) -> int:
+    """
+    Counts the lines of inline_tokenizer executed while running func(line), a measure of the work done that, unlike
+    wall-clock time, does not depend on the machine or its load.
+
+    :param limit: raise StepLimitExceeded once this many lines ran, so a quadratic scan fails fast
+    """
+    steps = 0
+
+    def trace_line(frame, event, arg):
+        nonlocal steps
+        if event == "line":
+            steps += 1
+            if limit is not None and steps > limit:
+                raise StepLimitExceeded(steps)
+        return trace_line
+
+    def trace_call(frame, event, arg):
+        return trace_line if frame.f_code.co_filename == inline_tokenizer.__file__ else None
+
+    sys.settrace(trace_call)
+    try:
+        func(line)
+    finally:
+        sys.settrace(None)
+    return steps
+
+
+def assert_linear(test: unittest.TestCase, make_line, sizes: tuple[int, int] = (1_000, 10_000),
+                  func=tokenize_line) -> None:
+    """
+    Asserts that the steps taken on make_line(size) grow about like size: growing the input tenfold may grow them
+    at most twelvefold, where a quadratic scan grows them a hundredfold.
+    """
+    small = count_steps(func, make_line(sizes[0]))
+    limit = small * sizes[1] // sizes[0] * 12 // 10
+    try:
+        count_steps(func, make_line(sizes[1]), limit)
+    except StepLimitExceeded:
+        test.fail(f"{make_line(4)!r}...: more than {limit} steps at {sizes[1]} characters, {small} at {sizes[0]}")
+
+
+class TestTokenizeLine(unittest.TestCase):
+    def test_tokenize_line_matchesChainedPipeline(self):
+        for line in LINES:
+            with self.subTest(line=line):
+                self.assertEqual(tokenize_line(line), chained_line_to_textnodes(line))
+
+    def test_tokenize_line_nestedEmphasis(self):
+        for line, expected in NESTED_LINES.items():
+            with self.subTest(line=line):
+                self.assertEqual(tokenize_line(line), expected)
+
+    def test_tokenize_line_unmatchedOrIntrawordDelimiters_areLiteral(self):
+        for line in LITERAL_LINES:
+            with self.subTest(line=line):
+                self.assertEqual(tokenize_line(line), [TextNode(line, TextType.TEXT)])
+
+    def test_line_to_html_nestedEmphasis(self):
+        self.assertEqual("".join(line_to_html("_a **b `c`** d_ and *e*")),
+                         "<i>a <b>b <code>c</code></b> d</i> and <i>e</i>")
+        self.assertEqual("".join(line_to_html("*a***b*")), "<i>a</i>*<i>b</i>")
+        self.assertEqual("".join(line_to_html("*foo**bar*")), "<i>foo**bar</i>")
+
+    def test_iter_inline_events_randomLines_nestAndKeepText(self):
+        rng = random.Random(1234)
+        for _ in range(3000):
+            line = random_line(rng)
+            with self.subTest(line=line):
+                html = "".join(line_to_html(line))
+                tags = re.findall(r"<(/?)(b|i|code)>", html)
+                open_tags = []
+                for closing, tag in tags:
+                    if closing:
+                        self.assertEqual(open_tags.pop(), tag)
+                    else:
+                        open_tags.append(tag)
+                self.assertEqual(open_tags, [])
+                # only delimiters are dropped, everything else is kept in order
+                self.assertEqual(re.sub(r"</?(b|i|code)>|[*_`]", "", html), re.sub(r"[*_`]", "", line))
+
+    def test_tokenize_line_adversarialInputs_linearTime(self):
+        for make_line in (lambda n: "_" * n,
+                          lambda n: "*" * n,
+                          lambda n: "_a " * (n // 3),
+                          lambda n: "*a " * (n // 3),
+                          lambda n: "a_" * (n // 2),
+                          lambda n: "**a*" * (n // 4),
+                          lambda n: "_a " * (n // 6) + "a_ " * (n // 6),
+                          lambda n: "*a " * (n // 6) + "a_ " * (n // 6),
+                          lambda n: "*_" * (n // 2),
+                          lambda n: "` " * (n // 2),
+                          lambda n: "`a``" * (n // 4)):
+            assert_linear(self, make_line)
+
+    def test_iter_inline_events_deepNesting_noRecursionLimit(self):
+        line = "_a " * 5000 + "b" + " c_" * 5000
+        events = list(iter_inline_events(line))
+        self.assertEqual(sum(text is Boundary.OPEN for text, _, _ in events), 5000)
+        self.assertEqual(events[-1], (Boundary.CLOSE, TextType.ITALIC, None))
+        self.assertEqual("".join(line_to_html(line)).count("<i>"), 5000)
+
+    def test_tokenize_line_manySpans_noRecursionLimit(self):
+        line = "a **b** " * 5000
+        nodes = tokenize_line(line)
+        self.assertEqual(len(nodes), 10001)
+        self.assertEqual(nodes[1], TextNode("b", TextType.BOLD))
+
+
+class TestFindLinkSpans(unittest.TestCase):
+    def test_find_link_spans_positions(self):
+        text = "See [contact](/contact) and ![tom](/images/tom.png)."
+        self.assertEqual(find_link_spans(text), [(4, 23, TextType.LINK, "contact", "/contact"),
+                                                 (28, 51, TextType.IMAGE, "tom", "/images/tom.png")])
+
+    def test_find_link_spans_nestedBracketsAndParentheses(self):
+        self.assertEqual(find_link_spans("[a [b] c](https://en.wikipedia.org/wiki/Foo_(bar)) x"),
+                         [(0, 50, TextType.LINK, "a [b] c", "https://en.wikipedia.org/wiki/Foo_(bar)")])
+        self.assertEqual(find_link_spans("![alt [x]](/a_(b)_(c).png)"),
+                         [(0, 26, TextType.IMAGE, "alt [x]", "/a_(b)_(c).png")])
+
+    def test_find_link_spans_notLinks(self):
+        for text in ("[a] (b)", "[a](b", "[a](b(c)", "[a]()", "a](b)", "`[a](b)`", "![a]](b)"):
+            with self.subTest(text=text):
+                self.assertEqual(find_link_spans(text), [])
+
+    def test_find_link_spans_linkInLink_innerOnly(self):
+        self.assertEqual(find_link_spans("[a [b](c) d](e)"), [(3, 9, TextType.LINK, "b", "c")])
+        self.assertEqual(find_link_spans("[![img](src)](href)"), [(0, 19, TextType.LINK, "![img](src)", "href")])
+
+    def test_tokenize_line_linkTakesPrecedenceOverEmphasis(self):
+        self.assertEqual(tokenize_line("*a [b*](c)"), [TextNode("*a ", TextType.TEXT),
+                                                       TextNode("b*", TextType.LINK, "c")])
+        self.assertEqual("".join(line_to_html("_see [my_page](/my_page)_")),
+                         '<i>see <a href="/my_page">my_page</a></i>')
+
+    def test_tokenize_line_manyLinks(self):
+        nodes = tokenize_line("[a](/b) " * 5000)
+        self.assertEqual(len(nodes), 10000)
+        self.assertEqual(nodes[-2], TextNode("a", TextType.LINK, "/b"))
+
+    def test_find_link_spans_adversarialInputs_linearTime(self):
+        for make_line in (lambda n: "[" * n,
+                          lambda n: "](" * (n // 2),
+                          lambda n: "[a](" * (n // 4),
+                          lambda n: "![" * (n // 4) + "]" * (n // 4),
+                          lambda n: "[" * (n // 3) + "a" + "]" * (n // 3) + "(" * (n // 6) + ")" * (n // 6),
+                          lambda n: "[a](b) " * (n // 7),
+                          lambda n: "[a]" * (n // 3),
+                          lambda n: "[`a](" * (n // 5) + "`)" * (n // 10)):
+            assert_linear(self, make_line, func=find_link_spans)
+            assert_linear(self, make_line)
+
+
+if __name__ == "__main__":
+    unittest.main()
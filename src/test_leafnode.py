@@ -32,4 +32,13 @@ class TestHTMLNode(unittest.TestCase):
         node = LeafNode("img", "", {"src": "/images/rivendell.png", "alt": "LOTR image artistmonkeys"})
         expected = r'<img src="/images/rivendell.png" alt="LOTR image artistmonkeys">'
         actual = node.to_html()
-        self.assertEqual(actual, expected)
\ No newline at end of file
+        self.assertEqual(actual, expected)
+
+    def test_slots_noInstanceDict(self):
+        node = LeafNode("b", "bold")
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertRaises(AttributeError, setattr, node, "other", "value")
+
+    def test_repr(self):
+        node = LeafNode("b", "bold")
+        self.assertEqual(repr(node), "LeafNode(self.tag='b', self.value='bold', self.props=None)")
@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+
+from manifest import BuildManifest, hash_file, hash_text
+
+
+class TestBuildManifest(unittest.TestCase):
+    def test_load_missingFile_emptyManifest(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = BuildManifest.load(os.path.join(tmp, "manifest.json"))
+        self.assertEqual(manifest, BuildManifest())
+
+    def test_load_corruptFile_emptyManifest(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "manifest.json")
+            with open(path, 'w') as f:
+                f.write("{not json")
+            manifest = BuildManifest.load(path)
+        self.assertEqual(manifest, BuildManifest())
+
+    def test_save_load_roundTrip(self):
+        expected = BuildManifest("template", "basepath", {"index.md": {"hash": "abc", "output": "index.html"}})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "manifest.json")
+            expected.save(path)
+            actual = BuildManifest.load(path)
+        self.assertEqual(actual, expected)
+
+    def test_hash_file_matchesHashText(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, 'w') as f:
+                f.write("# Title")
+            self.assertEqual(hash_file(path), hash_text("# Title"))
+
+
+if __name__ == "__main__":
+    unittest.main()
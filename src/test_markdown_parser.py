@@ -1,8 +1,10 @@
+import glob
+import os
 import unittest
 
 from markdown_parser import (split_nodes_delimiter, TextNode, TextType, extract_markdown_images, split_nodes_image,
                              split_nodes_link, extract_markdown_links, line_to_textnodes, markdown_to_blocks, BlockType,
-                             block_to_block_type, markdown_to_html_node)
+                             block_to_block_type, markdown_to_html_node, markdown_to_html)
 from htmlnode import ParentNode, LeafNode
 
 
@@ -62,6 +64,18 @@ class TestSplitNodesDelimiter(unittest.TestCase):
             "*", TextType.ITALIC)
         self.assertEqual(actual_nodes, expected_nodes)
 
+    def test_split_nodes_delimiter_unmatchedDelimiter_isLiteral(self):
+        old_nodes = [TextNode("a _b_ c_d", TextType.TEXT)]
+        expected_nodes = [TextNode("a ", TextType.TEXT),
+                          TextNode("b", TextType.ITALIC),
+                          TextNode(" c_d", TextType.TEXT)]
+        actual_nodes = split_nodes_delimiter(old_nodes, "_", TextType.ITALIC)
+        self.assertEqual(actual_nodes, expected_nodes)
+
+    def test_split_nodes_delimiter_manyPairs_noRecursionLimit(self):
+        old_nodes = [TextNode("a `b` " * 5000, TextType.TEXT)]
+        self.assertEqual(len(split_nodes_delimiter(old_nodes, "`", TextType.CODE)), 10001)
+
 
 class TestExtractMarkdownImages(unittest.TestCase):
     def test_extract_markdown_images_no_image(self):
@@ -446,6 +460,22 @@ class TestBlockToBlockType(unittest.TestCase):
         self.assertEqual(actual, expected)
 
 
+    def test_block_to_block_type_dashUnorderedList(self):
+        block = "- This is a unordered\n- list"
+        self.assertEqual(block_to_block_type(block), BlockType.UNORDERED)
+
+    def test_block_to_block_type_mixedStarAndDash_paragraph(self):
+        block = "* This is a unordered\n- list"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
+    def test_block_to_block_type_sevenHashes_paragraph(self):
+        block = "####### Not a heading"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
+    def test_block_to_block_type_emptyBlock_paragraph(self):
+        self.assertEqual(block_to_block_type(""), BlockType.PARAGRAPH)
+
+
 class TestMarkdownToHTMLNode(unittest.TestCase):
     def test_markdown_to_html_node(self):
         text = "# Heading\n\nParagraph of **bold** text"
@@ -524,3 +554,49 @@ class TestMarkdownToHTMLNode(unittest.TestCase):
         ])])
         actual = markdown_to_html_node(text)
         self.assertEqual(actual, expected)
+
+
+def render_or_error(func, markdown: str):
+    try:
+        return func(markdown)
+    except ValueError as e:
+        return str(e)
+
+
+class TestMarkdownToHtml(unittest.TestCase):
+    DOCUMENTS = [
+        "# Heading\n\nParagraph of **bold** text",
+        "* Unordered\n* List\n\n1. Ordered\n2. List",
+        "- a _list_ with [a link](/page)\n- and ![an image](/image.png)",
+        "```\nThis is code inside a code block\n   indented line\n```",
+        "> This is a block quote\n> in multiple lines.",
+        "###### Small heading with `code`\n\nParagraph line one\nline two with **bold**",
+        "Paragraph with ****empty bold",
+        "_Italic with **bold** inside_ and snake_case\n\n- *a* list item with _**both**_",
+    ]
+    BROKEN_DOCUMENTS = [
+        "# Heading\n\n",
+        "* item\n* ",
+        "```\n```",
+        "> quote\n>",
+        "Unclosed **bold",
+    ]
+
+    def test_markdown_to_html_matchesTreePath(self):
+        for markdown in self.DOCUMENTS:
+            with self.subTest(markdown=markdown):
+                self.assertEqual(markdown_to_html(markdown), markdown_to_html_node(markdown).to_html())
+
+    def test_markdown_to_html_errorsMatchTreePath(self):
+        for markdown in self.BROKEN_DOCUMENTS:
+            with self.subTest(markdown=markdown):
+                expected = render_or_error(lambda text: markdown_to_html_node(text).to_html(), markdown)
+                self.assertEqual(render_or_error(markdown_to_html, markdown), expected)
+
+    def test_markdown_to_html_contentFilesMatchTreePath(self):
+        content_dir = os.path.join(os.path.dirname(__file__), "..", "content")
+        for path in glob.glob(os.path.join(content_dir, "**", "*.md"), recursive=True):
+            with open(path) as f:
+                markdown = f.read()
+            with self.subTest(path=path):
+                self.assertEqual(markdown_to_html(markdown), markdown_to_html_node(markdown).to_html())
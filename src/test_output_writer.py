@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+
+from output_writer import OutputWriter, file_matches, write_atomic
+
+
+class TestOutputWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "index.html")
+        self.writer = OutputWriter()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self) -> str:
+        with open(self.path) as f:
+            return f.read()
+
+    def leftovers(self) -> list[str]:
+        return [name for name in os.listdir(self.tmp.name) if name.endswith(".tmp")]
+
+    def test_write_atomic(self):
+        write_atomic(self.path, b"<p>a</p>")
+        self.assertEqual(self.read(), "<p>a</p>")
+        self.assertEqual(self.leftovers(), [])
+
+    def test_file_matches(self):
+        self.assertFalse(file_matches(self.path, b"a"))
+        write_atomic(self.path, b"abc")
+        self.assertTrue(file_matches(self.path, b"abc"))
+        self.assertFalse(file_matches(self.path, b"abd"))
+        self.assertFalse(file_matches(self.path, b"abcd"))
+
+    def test_write_text_newFile_written(self):
+        self.assertTrue(self.writer.write_text(self.path, "<p>ä</p>"))
+        self.assertEqual(self.read(), "<p>ä</p>")
+        self.assertEqual(self.writer.written, [self.path])
+
+    def test_write_text_identical_notTouched(self):
+        self.writer.write_text(self.path, "<p>a</p>")
+        os.utime(self.path, ns=(0, 0))
+        self.assertFalse(self.writer.write_text(self.path, "<p>a</p>"))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 0)
+        self.assertEqual(self.writer.unchanged, [self.path])
+
+    def test_write_text_changed_written(self):
+        self.writer.write_text(self.path, "<p>a</p>")
+        self.assertTrue(self.writer.write_text(self.path, "<p>b</p>"))
+        self.assertEqual(self.read(), "<p>b</p>")
+
+    def test_open_text(self):
+        with self.writer.open_text(self.path) as f:
+            f.write("<p>")
+            f.write("a</p>")
+        os.utime(self.path, ns=(0, 0))
+        with self.writer.open_text(self.path) as f:
+            f.write("<p>a</p>")
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 0)
+        self.assertEqual((self.writer.written, self.writer.unchanged), ([self.path], [self.path]))
+        self.assertEqual(self.leftovers(), [])
+
+    def test_open_text_error_keepsOldFile(self):
+        self.writer.write_text(self.path, "<p>old</p>")
+        with self.assertRaises(ValueError):
+            with self.writer.open_text(self.path) as f:
+                f.write("<p>half")
+                raise ValueError("render failed")
+        self.assertEqual(self.read(), "<p>old</p>")
+        self.assertEqual(self.leftovers(), [])
+
+    def test_delete(self):
+        self.writer.write_text(self.path, "a")
+        self.assertTrue(self.writer.delete(self.path))
+        self.assertFalse(self.writer.delete(self.path))
+        self.assertEqual(self.writer.deleted, [self.path])
+
+    def test_sidecar_removedOnWriteAndDelete(self):
+        sidecar = self.path + ".gz"
+        self.writer.write_text(self.path, "<p>a</p>")
+        write_atomic(sidecar, b"old")
+        self.writer.write_text(self.path, "<p>a</p>")
+        self.assertTrue(os.path.exists(sidecar))
+        self.writer.write_text(self.path, "<p>b</p>")
+        self.assertFalse(os.path.exists(sidecar))
+        write_atomic(sidecar, b"old")
+        with self.writer.open_text(self.path) as f:
+            f.write("<p>c</p>")
+        self.assertFalse(os.path.exists(sidecar))
+        write_atomic(sidecar, b"old")
+        self.writer.delete(self.path)
+        self.assertFalse(os.path.exists(sidecar))
+
+    def test_transform_comparedAfterTransform(self):
+        writer = OutputWriter(str.upper)
+        self.assertTrue(writer.write_text(self.path, "<p>a</p>"))
+        self.assertEqual(self.read(), "<P>A</P>")
+        os.utime(self.path, ns=(0, 0))
+        with writer.open_text(self.path) as f:
+            f.write("<p>a</p>")
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 0)
+        self.assertEqual((writer.written, writer.unchanged), ([self.path], [self.path]))
+        self.assertEqual(writer.original_sizes, {self.path: 8})
+
+    def test_transform_name(self):
+        self.assertIsNone(self.writer.transform_name)
+        self.assertEqual(OutputWriter(file_matches).transform_name, "output_writer.file_matches")
+
+    def test_merge(self):
+        other = OutputWriter()
+        other.write_text(self.path, "a")
+        self.writer.merge(other)
+        self.assertEqual(repr(self.writer), "OutputWriter(written=1, unchanged=0, deleted=0)")
+
+
+if __name__ == "__main__":
+    unittest.main()
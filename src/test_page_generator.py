@@ -1,6 +1,18 @@
+import asyncio
+import os
+import tempfile
 import unittest
+from contextlib import redirect_stdout
+from io import StringIO
 
-from page_generator import extract_title
+from dependency_graph import DependencyGraph
+from fixtures import write_file
+from manifest import BuildManifest
+from output_writer import OutputWriter
+from postprocess import minify_html
+from render_cache import RenderCache
+from page_generator import (extract_title, page_output_path, collect_pages, generate_pages_incremental, build_pages,
+                            build_pages_async, BuildError, PageResult)
 
 
 class TestPageGenerator(unittest.TestCase):
@@ -24,4 +36,313 @@ class TestPageGenerator(unittest.TestCase):
         markdown = "# This is a title  "
         expected = "This is a title"
         actual = extract_title(markdown)
-        self.assertEqual(expected, actual)
\ No newline at end of file
+        self.assertEqual(expected, actual)
+
+    def test_page_output_path(self):
+        self.assertEqual(page_output_path("index.md"), "index.html")
+        self.assertEqual(page_output_path(os.path.join("notes.md", "index.md")), os.path.join("notes.md", "index.html"))
+        self.assertEqual(page_output_path("readme.mdx"), "readme.mdx")
+        self.assertEqual(page_output_path("robots.txt"), "robots.txt")
+
+
+class TestGeneratePagesIncremental(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.docs = os.path.join(self.tmp.name, "docs")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.manifest = os.path.join(self.tmp.name, ".cache", "manifest.json")
+        write_file(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        write_file(os.path.join(self.content, "index.md"), "# Home")
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "# Post")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, basepath: str = "/", force: bool = False, writer: OutputWriter = None) -> list[str]:
+        with redirect_stdout(StringIO()):
+            regenerated = generate_pages_incremental(self.content, self.template, self.docs, basepath, self.manifest,
+                                                     force=force, writer=writer)
+        return [os.path.relpath(path, self.content) for path in regenerated]
+
+    def test_collect_pages(self):
+        expected = [(os.path.join(self.content, "blog", "post", "index.md"),
+                     os.path.join(self.docs, "blog", "post", "index.html")),
+                    (os.path.join(self.content, "index.md"), os.path.join(self.docs, "index.html"))]
+        self.assertEqual(collect_pages(self.content, self.docs), expected)
+
+    def test_firstBuild_generatesAll(self):
+        self.assertEqual(self.build(), [os.path.join("blog", "post", "index.md"), "index.md"])
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "blog", "post", "index.html")))
+
+    def test_unchangedSources_generatesNothing(self):
+        self.build()
+        self.assertEqual(self.build(), [])
+
+    def test_changedSource_generatesOnlyThatPage(self):
+        self.build()
+        write_file(os.path.join(self.content, "index.md"), "# New Home")
+        self.assertEqual(self.build(), ["index.md"])
+
+    def test_changedTemplate_generatesAll(self):
+        self.build()
+        write_file(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(len(self.build()), 2)
+
+    def test_force_generatesAll(self):
+        self.build()
+        self.assertEqual(len(self.build(force=True)), 2)
+
+    def test_changedBasepath_generatesAll(self):
+        self.build()
+        self.assertEqual(len(self.build("/site/")), 2)
+
+    def test_changedTransform_generatesAll(self):
+        self.build()
+        self.assertEqual(len(self.build(writer=OutputWriter(minify_html))), 2)
+        self.assertEqual(self.build(writer=OutputWriter(minify_html)), [])
+        self.assertEqual(len(self.build()), 2)
+
+    def test_partial_keepsOtherPages(self):
+        self.build()
+        pages = [(os.path.join(self.content, "index.md"), os.path.join(self.docs, "index.html"))]
+        write_file(os.path.join(self.content, "index.md"), "# New Home")
+        regenerated = generate_pages_incremental(self.content, self.template, self.docs, "/", self.manifest,
+                                                 pages=pages, partial=True)
+        self.assertEqual(regenerated, [pages[0][0]])
+        self.assertEqual(sorted(BuildManifest.load(self.manifest).pages),
+                         [os.path.join("blog", "post", "index.md"), "index.md"])
+        os.remove(pages[0][0])
+        generate_pages_incremental(self.content, self.template, self.docs, "/", self.manifest, pages=pages,
+                                   partial=True)
+        self.assertFalse(os.path.exists(pages[0][1]))
+        self.assertEqual(list(BuildManifest.load(self.manifest).pages), [os.path.join("blog", "post", "index.md")])
+        self.assertEqual(self.build(), [])
+
+    def test_removedSource_deletesOutput(self):
+        self.build()
+        os.remove(os.path.join(self.content, "index.md"))
+        self.assertEqual(self.build(), [])
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.html")))
+
+    def test_deletedOutput_isRegenerated(self):
+        self.build()
+        os.remove(os.path.join(self.docs, "index.html"))
+        self.assertEqual(self.build(), ["index.md"])
+
+    def test_failingPage_isRetriedOnNextBuild(self):
+        write_file(os.path.join(self.content, "broken.md"), "no title")
+        self.assertRaises(BuildError, self.build)
+        write_file(os.path.join(self.content, "broken.md"), "# Fixed")
+        self.assertEqual(self.build(), ["broken.md"])
+
+    def test_writer_countsWrittenUnchangedDeleted(self):
+        self.build()
+        writer = OutputWriter()
+        write_file(os.path.join(self.content, "index.md"), "# New Home")
+        os.remove(os.path.join(self.content, "blog", "post", "index.md"))
+        generate_pages_incremental(self.content, self.template, self.docs, "/", self.manifest, force=True,
+                                   writer=writer)
+        self.assertEqual(writer.written, [os.path.join(self.docs, "index.html")])
+        self.assertEqual(writer.deleted, [os.path.join(self.docs, "blog", "post", "index.html")])
+        writer = OutputWriter()
+        generate_pages_incremental(self.content, self.template, self.docs, "/", self.manifest, jobs=2, force=True,
+                                   writer=writer)
+        self.assertEqual(writer.unchanged, [os.path.join(self.docs, "index.html")])
+
+    def test_minifyingWriter_secondBuildWritesNothing(self):
+        write_file(self.template, "<title>{{ Title }}</title>\n    <body>\n    {{ Content }}\n    </body>")
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                writers = [OutputWriter(minify_html), OutputWriter(minify_html)]
+                for writer in writers:
+                    generate_pages_incremental(self.content, self.template, self.docs, "/", self.manifest, jobs,
+                                               force=True, writer=writer)
+                with open(os.path.join(self.docs, "index.html")) as f:
+                    self.assertEqual(f.read(), "<title>Home</title>\n<body>\n<div><h1>Home</h1></div>\n</body>")
+                self.assertEqual(len(writers[1].written), 0)
+                self.assertEqual(len(writers[1].unchanged), 2)
+
+    def build_with_graph(self, jobs: int = 1) -> tuple[list[str], DependencyGraph]:
+        graph_path = os.path.join(self.tmp.name, ".cache", "dependencies.json")
+        regenerated = generate_pages_incremental(self.content, self.template, self.docs, "/", self.manifest, jobs,
+                                                 graph_path=graph_path)
+        return [os.path.relpath(path, self.content) for path in regenerated], DependencyGraph.load(graph_path)
+
+    def test_graph_recordsLinksImagesAndTemplate(self):
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\n[Post](/blog/post) ![Me](/images/me.png)")
+        _, graph = self.build_with_graph()
+        entry = graph.pages["index.md"]
+        self.assertEqual(entry["references"], [["href", "/blog/post"], ["src", "/images/me.png"]])
+        self.assertEqual(entry["template"], os.path.normpath(self.template))
+        self.assertEqual(graph.affected_pages(assets=["images/me.png"]), ["index.md"])
+
+    def test_graph_parallelBuild_identicalToSerial(self):
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\n[Post](/blog/post)")
+        _, serial = self.build_with_graph()
+        os.remove(self.manifest)
+        _, parallel = self.build_with_graph(jobs=2)
+        self.assertEqual(serial, parallel)
+
+    def test_graph_missing_regeneratesPages(self):
+        self.build()
+        regenerated, graph = self.build_with_graph()
+        self.assertEqual(len(regenerated), 2)
+        self.assertEqual(len(graph.pages), 2)
+        self.assertEqual(self.build_with_graph()[0], [])
+
+    def test_graph_removedSource_removedFromGraph(self):
+        self.build_with_graph()
+        os.remove(os.path.join(self.content, "index.md"))
+        _, graph = self.build_with_graph()
+        self.assertEqual(list(graph.pages), [os.path.join("blog", "post", "index.md")])
+
+    def test_frontMatter_notRenderedAndTitleUsed(self):
+        write_file(os.path.join(self.content, "index.md"), "---\ntitle: Front title\n---\n# Heading\n\nText")
+        self.build()
+        with open(os.path.join(self.docs, "index.html")) as f:
+            self.assertEqual(f.read(), "<title>Front title</title><div><h1>Heading</h1><p>Text</p></div>")
+
+    def test_draft_skippedAndOutputDeleted(self):
+        self.build()
+        write_file(os.path.join(self.content, "index.md"), "---\ndraft: true\n---\n# Home")
+        self.assertEqual(self.build(), [])
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.html")))
+        regenerated = generate_pages_incremental(self.content, self.template, self.docs, "/", self.manifest,
+                                                 drafts=True)
+        self.assertEqual([os.path.relpath(path, self.content) for path in regenerated], ["index.md"])
+
+    def test_frontMatterTemplate_usedAndTracked(self):
+        write_file(os.path.join(self.tmp.name, "post.html"), "<h1>Post: {{ Title }}</h1>{{ Content }}")
+        write_file(os.path.join(self.content, "blog", "post", "index.md"), "---\ntemplate: post.html\n---\n# Post")
+        self.build()
+        with open(os.path.join(self.docs, "blog", "post", "index.html")) as f:
+            self.assertEqual(f.read(), "<h1>Post: Post</h1><div><h1>Post</h1></div>")
+        write_file(os.path.join(self.tmp.name, "post.html"), "<h2>{{ Title }}</h2>{{ Content }}")
+        self.assertEqual(self.build(), [os.path.join("blog", "post", "index.md")])
+
+    def test_templatesDirectory_selectsTemplateByPath(self):
+        write_file(os.path.join(self.tmp.name, "templates", "blog", "default.html"), "<article>{{ Content }}</article>")
+        self.build()
+        with open(os.path.join(self.docs, "blog", "post", "index.html")) as f:
+            self.assertEqual(f.read(), "<article><div><h1>Post</h1></div></article>")
+        with open(os.path.join(self.docs, "index.html")) as f:
+            self.assertEqual(f.read(), "<title>Home</title><div><h1>Home</h1></div>")
+
+    def test_changedPartial_regeneratesOnlyPagesUsingIt(self):
+        write_file(os.path.join(self.tmp.name, "templates", "blog", "default.html"),
+                   '{{ Include "../partials/footer.html" }}{{ Content }}')
+        write_file(os.path.join(self.tmp.name, "templates", "partials", "footer.html"), "<footer>1</footer>")
+        self.build()
+        write_file(os.path.join(self.tmp.name, "templates", "partials", "footer.html"), "<footer>2</footer>")
+        self.assertEqual(self.build(), [os.path.join("blog", "post", "index.md")])
+        with open(os.path.join(self.docs, "blog", "post", "index.html")) as f:
+            self.assertEqual(f.read(), "<footer>2</footer><div><h1>Post</h1></div>")
+        self.assertEqual(self.build(), [])
+
+    def test_invalidFrontMatter_failsPageAndKeepsOutput(self):
+        self.build()
+        write_file(os.path.join(self.content, "index.md"), "---\ntemplate: missing.html\n---\n# Home")
+        with self.assertRaises(BuildError) as context:
+            self.build()
+        self.assertEqual([path for path, _ in context.exception.failures], [os.path.join(self.content, "index.md")])
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.html")))
+        write_file(os.path.join(self.content, "index.md"), "# Home again")
+        self.assertEqual(self.build(), ["index.md"])
+
+
+class TestBuildPages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        write_file(self.template, '<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+        for i in range(8):
+            write_file(os.path.join(self.content, f"dir{i % 3}", f"page{i}.md"),
+                       f"# Page {i}\n\nSome **bold** text and a [link](/page{i})")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, dest: str, jobs: int) -> dict[str, str]:
+        with redirect_stdout(StringIO()):
+            build_pages(collect_pages(self.content, dest), self.template, "/site/", jobs)
+        outputs = {}
+        for from_path, dest_path in collect_pages(self.content, dest):
+            with open(dest_path) as f:
+                outputs[os.path.relpath(dest_path, dest)] = f.read()
+        return outputs
+
+    def test_parallelBuild_identicalToSerial(self):
+        serial = self.build(os.path.join(self.tmp.name, "serial"), 1)
+        parallel = self.build(os.path.join(self.tmp.name, "parallel"), 3)
+        self.assertEqual(len(serial), 8)
+        self.assertEqual(serial, parallel)
+
+    def test_failingPages_collectedNotAborted(self):
+        write_file(os.path.join(self.content, "a_broken.md"), "no title here")
+        write_file(os.path.join(self.content, "z_broken.md"), "no title either")
+        dest = os.path.join(self.tmp.name, "docs")
+        with redirect_stdout(StringIO()):
+            with self.assertRaises(BuildError) as context:
+                build_pages(collect_pages(self.content, dest), self.template, "/", 2)
+        failed = [os.path.basename(path) for path, _ in context.exception.failures]
+        self.assertEqual(failed, ["a_broken.md", "z_broken.md"])
+        self.assertIn("No title found.", context.exception.failures[0][1])
+        self.assertTrue(os.path.exists(os.path.join(dest, "dir1", "page7.html")))
+
+    def test_parallelBuild_renderCacheEntriesMerged(self):
+        caches = {jobs: RenderCache() for jobs in (1, 2)}
+        for jobs, cache in caches.items():
+            with redirect_stdout(StringIO()):
+                build_pages(collect_pages(self.content, os.path.join(self.tmp.name, f"docs{jobs}")), self.template,
+                            "/site/", jobs, cache)
+        self.assertEqual(len(caches[2].entries), 16)
+        self.assertEqual(dict(caches[2].entries), dict(caches[1].entries))
+        self.assertEqual(caches[2].hits + caches[2].misses, caches[1].hits + caches[1].misses)
+
+    def test_pageResults_summarySkipsLinkOnlyParagraphs(self):
+        write_file(os.path.join(self.content, "dir0", "page0.md"),
+                   "# Post\n\n[< Back Home](/)\n\n![Me](/me.png)\n\n> quote\n\nFirst real paragraph.\n\nSecond.")
+        page_results = {}
+        build_pages(collect_pages(self.content, os.path.join(self.tmp.name, "docs")), self.template, "/", 2,
+                    page_results=page_results)
+        result = page_results[os.path.join(self.content, "dir0", "page0.md")]
+        self.assertEqual(result.title, "Post")
+        self.assertEqual(result.summary, "<p>First real paragraph.</p>")
+        self.assertEqual(result.references, [("href", "/"), ("src", "/me.png")])
+
+
+class TestBuildPagesAsync(TestBuildPages):
+    def build(self, dest: str, concurrency: int) -> dict[str, str]:
+        asyncio.run(build_pages_async(collect_pages(self.content, dest), self.template, "/site/", concurrency))
+        outputs = {}
+        for from_path, dest_path in collect_pages(self.content, dest):
+            with open(dest_path) as f:
+                outputs[os.path.relpath(dest_path, dest)] = f.read()
+        return outputs
+
+    def test_asyncBuild_identicalToSerial(self):
+        serial = super().build(os.path.join(self.tmp.name, "serial"), 1)
+        for concurrency in (1, 3):
+            self.assertEqual(self.build(os.path.join(self.tmp.name, f"async{concurrency}"), concurrency), serial)
+
+    def test_asyncBuild_pageResults(self):
+        page_results = {}
+        pages = collect_pages(self.content, os.path.join(self.tmp.name, "docs"))
+        asyncio.run(build_pages_async(pages, self.template, "/", 2, page_results=page_results))
+        self.assertEqual(len(page_results), 8)
+        expected = PageResult("Page 7", '<p>Some <b>bold</b> text and a <a href="/page7">link</a></p>',
+                              [("href", "/page7")])
+        self.assertEqual(page_results[os.path.join(self.content, "dir1", "page7.md")], expected)
+
+    def test_failingPages_collectedNotAborted(self):
+        write_file(os.path.join(self.content, "a_broken.md"), "no title here")
+        write_file(os.path.join(self.content, "z_broken.md"), "no title either")
+        dest = os.path.join(self.tmp.name, "docs")
+        with self.assertRaises(BuildError) as context:
+            asyncio.run(build_pages_async(collect_pages(self.content, dest), self.template, "/", 2))
+        failed = [os.path.basename(path) for path, _ in context.exception.failures]
+        self.assertEqual(failed, ["a_broken.md", "z_broken.md"])
+        self.assertIn("No title found.", context.exception.failures[0][1])
+        self.assertTrue(os.path.exists(os.path.join(dest, "dir1", "page7.html")))
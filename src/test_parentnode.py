@@ -1,4 +1,5 @@
 import unittest
+from io import StringIO
 
 from htmlnode import ParentNode, LeafNode
 
@@ -49,4 +50,29 @@ class TestHTMLNode(unittest.TestCase):
                           {"href": "https://www.google.com", "target": "_blank"})
         expected = '<div href="https://www.google.com" target="_blank"><p>First Child<b href="boot.dev">Second Child</b></p><p><i>Third Child</i></p>Fourth Child</div>'
         actual = node.to_html()
-        self.assertEqual(expected, actual)
\ No newline at end of file
+        self.assertEqual(expected, actual)
+
+    def test_iter_html_chunksJoinToHtml(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode(None, "First"), LeafNode("b", "Second")]),
+                                  LeafNode("i", "Third")])
+        chunks = list(node.iter_html())
+        self.assertEqual(chunks, ["<div>", "<p>", "First", "<b>Second</b>", "</p>", "<i>Third</i>", "</div>"])
+        self.assertEqual("".join(chunks), node.to_html())
+
+    def test_iter_html_nestedNoChildren_raises(self):
+        node = ParentNode("div", [ParentNode("p", [])])
+        self.assertRaises(ValueError, node.to_html)
+
+    def test_write_html(self):
+        node = ParentNode("p", [LeafNode(None, "text"), LeafNode("a", "link", {"href": "/"})])
+        fp = StringIO()
+        node.write_html(fp)
+        self.assertEqual(fp.getvalue(), '<p>text<a href="/">link</a></p>')
+
+    def test_to_html_deepTree_noRecursionLimit(self):
+        node = LeafNode(None, "leaf")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span><span>"))
+        self.assertEqual(len(html), 5000 * len("<span></span>") + len("leaf"))
@@ -0,0 +1,106 @@
+import gzip
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import postprocess
+from fixtures import write_file
+from postprocess import gzip_bytes, minify_html, postprocess_outputs
+
+
+class TestMinifyHtml(unittest.TestCase):
+    def test_collapsesWhitespace(self):
+        self.assertEqual(minify_html("<div>\n    <p>a   b</p>\n\n    <p>c\td</p>\n</div>"),
+                         "<div>\n<p>a b</p>\n<p>c d</p>\n</div>")
+
+    def test_keepsSpaceBetweenInlineElements(self):
+        self.assertEqual(minify_html("<b>a</b>  <i>b</i>"), "<b>a</b> <i>b</i>")
+
+    def test_preAndCodeUntouched(self):
+        html = "<p>x  y</p><pre><code>a  =  1\n    b = 2</code></pre><p>inline <code>f(  x )</code></p>"
+        self.assertEqual(minify_html(html),
+                         "<p>x y</p><pre><code>a  =  1\n    b = 2</code></pre><p>inline <code>f(  x )</code></p>")
+
+    def test_scriptStyleAndTextareaUntouched(self):
+        html = "<style>a  { }</style>  <SCRIPT>var  x;</SCRIPT><textarea>\n  a</textarea>"
+        self.assertEqual(minify_html(html), "<style>a  { }</style> <SCRIPT>var  x;</SCRIPT><textarea>\n  a</textarea>")
+
+    def test_idempotent(self):
+        html = "<html>\n  <body>\n    <pre> a  b </pre>\n  </body>\n</html>"
+        self.assertEqual(minify_html(minify_html(html)), minify_html(html))
+
+
+class TestGzipBytes(unittest.TestCase):
+    def test_deterministic(self):
+        self.assertEqual(gzip_bytes(b"hello"), gzip_bytes(b"hello"))
+        self.assertEqual(gzip.decompress(gzip_bytes(b"hello")), b"hello")
+
+
+class TestPostprocessOutputs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.docs = os.path.join(self.tmp.name, "docs")
+        self.state = os.path.join(self.tmp.name, ".cache", "postprocess.json")
+        write_file(os.path.join(self.docs, "index.html"), "<html>\n    <body>   hi   </body>\n</html>")
+        write_file(os.path.join(self.docs, "index.css"), "body  {  color: red;  }")
+        write_file(os.path.join(self.docs, "images", "a.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_stage(self, jobs: int = 2, original_sizes: dict[str, int] = None):
+        return postprocess_outputs(self.docs, ["index.html"], ["index.css", os.path.join("images", "a.png")],
+                                   self.state, jobs, original_sizes)
+
+    def read(self, rel_path: str) -> bytes:
+        with open(os.path.join(self.docs, rel_path), 'rb') as f:
+            return f.read()
+
+    def test_compressesPagesAndTextFiles(self):
+        report = self.run_stage(original_sizes={"index.html": 50})
+        self.assertEqual(gzip.decompress(self.read("index.html.gz")), b"<html>\n    <body>   hi   </body>\n</html>")
+        self.assertEqual(gzip.decompress(self.read("index.css.gz")), b"body  {  color: red;  }")
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "images", "a.png.gz")))
+        self.assertEqual(report.processed, ["index.html", "index.css"])
+        self.assertEqual(report.by_type[".html"].original, 50)
+        self.assertEqual(report.by_type[".html"].minified, 40)
+
+    def test_neverModifiesOutputs(self):
+        mtime = os.path.getmtime(os.path.join(self.docs, "index.html"))
+        self.run_stage(jobs=1)
+        self.assertEqual(self.read("index.html"), b"<html>\n    <body>   hi   </body>\n</html>")
+        self.assertEqual(os.path.getmtime(os.path.join(self.docs, "index.html")), mtime)
+
+    def test_unchanged_skipped(self):
+        self.run_stage()
+        with mock.patch.object(postprocess, "gzip_bytes") as compress:
+            report = self.run_stage()
+        compress.assert_not_called()
+        self.assertEqual(report.unchanged, ["index.html", "index.css"])
+        self.assertEqual(report.by_type[".css"].files, 1)
+
+    def test_rewrittenToSameContent_notRecompressed(self):
+        self.run_stage()
+        write_file(os.path.join(self.docs, "index.html"), "<html>\n    <body>   hi   </body>\n</html>")
+        with mock.patch.object(postprocess, "gzip_bytes") as compress:
+            report = self.run_stage()
+        compress.assert_not_called()
+        self.assertEqual(report.unchanged, ["index.html", "index.css"])
+
+    def test_changedFile_recompressed(self):
+        self.run_stage()
+        write_file(os.path.join(self.docs, "index.css"), "p { }")
+        self.assertEqual(self.run_stage().processed, ["index.css"])
+        self.assertEqual(gzip.decompress(self.read("index.css.gz")), b"p { }")
+
+    def test_removedOutput_sidecarRemoved(self):
+        self.run_stage()
+        os.remove(os.path.join(self.docs, "index.css"))
+        report = self.run_stage()
+        self.assertEqual(report.removed, [os.path.join(self.docs, "index.css.gz")])
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.css.gz")))
+
+
+if __name__ == "__main__":
+    unittest.main()
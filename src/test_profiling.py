@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+import unittest
+
+from profiling import PhaseRecord, Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_phase_disabled_recordsNothing(self):
+        profiler = Profiler()
+        with profiler.phase("read", "index.md"):
+            pass
+        self.assertEqual(profiler.records, [])
+
+    def test_phase_disabled_returnsSharedContext(self):
+        profiler = Profiler()
+        self.assertIs(profiler.phase("read"), profiler.phase("write"))
+
+    def test_phase_enabled_recordsPhase(self):
+        profiler = Profiler(enabled=True)
+        with profiler.phase("read", "index.md"):
+            sum(range(1000))
+        self.assertEqual(len(profiler.records), 1)
+        record = profiler.records[0]
+        self.assertEqual((record.name, record.page), ("read", "index.md"))
+        self.assertGreater(record.wall, 0)
+
+    def test_phase_exception_stillRecorded(self):
+        profiler = Profiler(enabled=True)
+        with self.assertRaises(ValueError):
+            with profiler.phase("render", "broken.md"):
+                raise ValueError("No title found.")
+        self.assertEqual(profiler.records[0].name, "render")
+
+    def test_hook_calledWhileDisabled(self):
+        profiler = Profiler()
+        seen = []
+        profiler.add_hook(seen.append)
+        with profiler.phase("write", "index.md"):
+            pass
+        self.assertEqual([record.name for record in seen], ["write"])
+        self.assertEqual(profiler.records, [])
+        profiler.remove_hook(seen.append)
+        self.assertIsNotNone(profiler.phase("write"))
+        self.assertFalse(profiler.active)
+
+    def test_slowest_pages_sumsPhasesPerPage(self):
+        profiler = Profiler(enabled=True)
+        profiler.extend([PhaseRecord("read", "a.md", 0, 1.0, 0, 0),
+                         PhaseRecord("write", "a.md", 0, 1.5, 0, 0),
+                         PhaseRecord("read", "b.md", 0, 2.0, 0, 0),
+                         PhaseRecord("sync_static", None, 0, 9.0, 0, 0)])
+        self.assertEqual(profiler.slowest_pages(2), [("a.md", 2.5), ("b.md", 2.0)])
+        self.assertEqual(profiler.phase_totals()["read"], (3.0, 0, 0))
+
+    def test_write_chrome_trace(self):
+        profiler = Profiler(enabled=True)
+        profiler.record(PhaseRecord("read", "a.md", 1.0, 0.5, 0.25, 3, pid=1, tid=2))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.json")
+            profiler.write_chrome_trace(path)
+            with open(path) as f:
+                trace = json.load(f)
+        expected = {"name": "read", "cat": "page", "ph": "X", "ts": 1e6, "dur": 5e5, "pid": 1, "tid": 2,
+                    "args": {"cpu_ms": 250.0, "net_blocks": 3, "page": "a.md"}}
+        self.assertEqual(trace["traceEvents"], [expected])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import render_cache
+from markdown_parser import markdown_to_html
+from render_cache import RenderCache
+
+
+class TestRenderCache(unittest.TestCase):
+    def test_block_html_matchesRenderer(self):
+        cache = RenderCache()
+        markdown = "# Heading\n\nParagraph of **bold** text\n\n* a\n* b\n\nParagraph of **bold** text"
+        self.assertEqual(markdown_to_html(markdown, cache.block_html), markdown_to_html(markdown))
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+    def test_block_html_hit_skipsRendering(self):
+        cache = RenderCache()
+        cache.block_html("Paragraph")
+        with mock.patch.object(render_cache, "block_to_html") as block_to_html, \
+                mock.patch.object(render_cache, "block_to_block_type") as block_to_block_type:
+            self.assertEqual(cache.block_html("Paragraph"), "<p>Paragraph</p>")
+        block_to_html.assert_not_called()
+        block_to_block_type.assert_not_called()
+
+    def test_block_html_hit_stillReportsReferences(self):
+        cache = RenderCache()
+        block = "[link](/contact) and ![image](/images/tom.png)"
+        expected = [("href", "/contact"), ("src", "/images/tom.png")]
+        for _ in range(2):
+            references = []
+            cache.block_html(block, references)
+            self.assertEqual(references, expected)
+        self.assertEqual(cache.hits, 1)
+
+    def test_block_html_evictsLeastRecentlyUsed(self):
+        cache = RenderCache(max_entries=2)
+        cache.block_html("a")
+        cache.block_html("b")
+        cache.block_html("a")
+        cache.block_html("c")
+        self.assertIn(RenderCache.key("a"), cache.entries)
+        self.assertNotIn(RenderCache.key("b"), cache.entries)
+        self.assertEqual(len(cache.entries), 2)
+
+    def test_block_html_error_notCached(self):
+        cache = RenderCache()
+        self.assertRaises(ValueError, cache.block_html, "```\n```")
+        self.assertEqual(len(cache.entries), 0)
+
+    def test_added_recordsOnlyNewEntries(self):
+        cache = RenderCache()
+        cache.block_html("a")
+        cache.added = {}
+        cache.block_html("a")
+        cache.block_html("b")
+        self.assertEqual(list(cache.added), [RenderCache.key("b")])
+
+    def test_merge_evictsLeastRecentlyUsed(self):
+        other = RenderCache()
+        other.block_html("b")
+        other.block_html("c")
+        cache = RenderCache(max_entries=2)
+        cache.block_html("a")
+        cache.merge(other.entries)
+        self.assertEqual(list(cache.entries), [RenderCache.key("b"), RenderCache.key("c")])
+
+    def test_stats(self):
+        cache = RenderCache()
+        cache.block_html("a")
+        cache.block_html("a")
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 1, "entries": 1, "hit_rate": 0.5})
+
+    def test_save_load_roundTrip(self):
+        cache = RenderCache()
+        cache.block_html("a **b** [c](/d)")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "render_cache.json")
+            cache.save(path)
+            loaded = RenderCache()
+            loaded.load(path)
+        self.assertEqual(loaded.entries, cache.entries)
+
+    def test_load_otherRendererVersion_ignored(self):
+        cache = RenderCache()
+        cache.block_html("a")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "render_cache.json")
+            cache.save(path)
+            loaded = RenderCache()
+            with mock.patch.object(render_cache, "renderer_version", return_value="other"):
+                loaded.load(path)
+        self.assertEqual(len(loaded.entries), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
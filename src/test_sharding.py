@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from fixtures import write_file
+from manifest import BuildManifest
+from page_generator import generate_pages_incremental
+from sharding import (SHARD_MANIFEST, ShardMergeError, build_shard, merge_shards, parse_shard, shard_directory,
+                      shard_of)
+from site_index import SiteIndex
+
+
+def read_tree(root: str) -> dict[str, str]:
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            with open(os.path.join(directory, name)) as f:
+                files[os.path.relpath(os.path.join(directory, name), root)] = f.read()
+    return files
+
+
+class TestShardAssignment(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ("0/4", "5/4", "a/4", "2", "1/2/3"):
+            self.assertRaises(argparse.ArgumentTypeError, parse_shard, value)
+
+    def test_shard_of_stableAndInRange(self):
+        sources = [f"blog/post{i}/index.md" for i in range(200)]
+        shards = [shard_of(source, 4) for source in sources]
+        self.assertEqual(shards, [shard_of(source, 4) for source in sources])
+        self.assertEqual(set(shards), {1, 2, 3, 4})
+        self.assertEqual(shard_of(os.path.join("blog", "index.md"), 4), shard_of("blog/index.md", 4))
+
+
+class TestShardedBuild(unittest.TestCase):
+    SHARDS = 3
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.shards_dir = os.path.join(self.tmp.name, "shards")
+        self.docs = os.path.join(self.tmp.name, "docs")
+        self.manifest = os.path.join(self.tmp.name, "manifest.json")
+        write_file(self.template, '<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+        for i in range(12):
+            write_file(os.path.join(self.content, f"dir{i % 3}", f"page{i}", "index.md"),
+                       f"# Page {i}\n\nSome **bold** text and a [link](/page{i})")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build_shards(self, drafts: bool = False) -> None:
+        with ProcessPoolExecutor(max_workers=self.SHARDS) as pool:
+            futures = [pool.submit(build_shard, self.content, self.template, "/site/", self.shards_dir, shard,
+                                   self.SHARDS, drafts=drafts) for shard in range(1, self.SHARDS + 1)]
+            for future in futures:
+                future.result()
+
+    def merge(self) -> list[str]:
+        return merge_shards(self.shards_dir, self.SHARDS, self.content, self.template, "/site/", self.docs,
+                            self.manifest)
+
+    def shard_manifest_path(self, shard: int) -> str:
+        return os.path.join(shard_directory(self.shards_dir, shard, self.SHARDS), SHARD_MANIFEST)
+
+    def test_merge_identicalToRegularBuild(self):
+        self.build_shards()
+        self.assertEqual(len(self.merge()), 12)
+        regular = os.path.join(self.tmp.name, "regular")
+        generate_pages_incremental(self.content, self.template, regular, "/site/",
+                                   os.path.join(self.tmp.name, "regular.json"), force=True)
+        self.assertEqual(read_tree(self.docs), read_tree(regular))
+        self.assertEqual(len(BuildManifest.load(self.manifest).pages), 12)
+
+    def test_merge_siteIndex_matchesRegularBuild(self):
+        self.build_shards()
+        index_path = os.path.join(self.tmp.name, "site_index.json")
+        merge_shards(self.shards_dir, self.SHARDS, self.content, self.template, "/site/", self.docs, self.manifest,
+                     index_path=index_path)
+        regular_index_path = os.path.join(self.tmp.name, "regular_index.json")
+        generate_pages_incremental(self.content, self.template, os.path.join(self.tmp.name, "regular"), "/site/",
+                                   os.path.join(self.tmp.name, "regular.json"), force=True,
+                                   index_path=regular_index_path)
+        self.assertEqual(SiteIndex.load(index_path), SiteIndex.load(regular_index_path))
+        self.assertEqual(len(SiteIndex.load(index_path).pages), 12)
+
+    def test_merge_drafts(self):
+        draft = os.path.join("dir0", "page0", "index.md")
+        write_file(os.path.join(self.content, draft), "---\ndraft: true\n---\n# Draft")
+        self.build_shards()
+        self.assertEqual(len(self.merge()), 11)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "dir0", "page0", "index.html")))
+
+        self.build_shards(drafts=True)
+        merged = merge_shards(self.shards_dir, self.SHARDS, self.content, self.template, "/site/", self.docs,
+                              self.manifest, drafts=True)
+        self.assertIn(draft, merged)
+        self.assertEqual(len(merged), 12)
+        with self.assertRaises(ShardMergeError) as context:
+            self.merge()
+        self.assertEqual(context.exception.problems,
+                         [f"{draft}: is a draft but was built by shard {shard_of(draft, self.SHARDS)}"])
+
+    def test_merge_missingShard(self):
+        self.build_shards()
+        os.remove(self.shard_manifest_path(2))
+        with self.assertRaises(ShardMergeError) as context:
+            self.merge()
+        self.assertTrue(any("shard 2/3" in problem for problem in context.exception.problems))
+        self.assertTrue(any("missing from all shards" in problem for problem in context.exception.problems))
+        self.assertFalse(os.path.exists(self.docs))
+
+    def test_merge_duplicatePage(self):
+        self.build_shards()
+        with open(self.shard_manifest_path(1)) as f:
+            first = json.load(f)
+        with open(self.shard_manifest_path(2)) as f:
+            second = json.load(f)
+        source, entry = next(iter(first["pages"].items()))
+        second["pages"][source] = entry
+        with open(self.shard_manifest_path(2), 'w') as f:
+            json.dump(second, f)
+        with self.assertRaises(ShardMergeError) as context:
+            self.merge()
+        self.assertIn(f"{source}: built by shard 1 and shard 2", context.exception.problems)
+
+    def test_merge_modifiedOutput(self):
+        self.build_shards()
+        with open(self.shard_manifest_path(3)) as f:
+            output = next(iter(json.load(f)["pages"].values()))["output"]
+        write_file(os.path.join(shard_directory(self.shards_dir, 3, self.SHARDS), "docs", output), "tampered")
+        with self.assertRaises(ShardMergeError) as context:
+            self.merge()
+        self.assertEqual(len(context.exception.problems), 1)
+        self.assertIn("missing or modified", context.exception.problems[0])
+
+    def test_merge_changedSourceOrBasepath(self):
+        self.build_shards()
+        write_file(os.path.join(self.content, "dir0", "page0", "index.md"), "# Changed")
+        with self.assertRaises(ShardMergeError) as context:
+            merge_shards(self.shards_dir, self.SHARDS, self.content, self.template, "/other/", self.docs,
+                         self.manifest)
+        problems = context.exception.problems
+        self.assertIn(f"{os.path.join('dir0', 'page0', 'index.md')}: changed since shard "
+                      f"{shard_of('dir0/page0/index.md', self.SHARDS)} built it", problems)
+        self.assertTrue(any("another basepath" in problem for problem in problems))
+
+
+if __name__ == "__main__":
+    unittest.main()
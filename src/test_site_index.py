@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ElementTree
+
+from fixtures import write_file
+from output_writer import OutputWriter
+from page_generator import generate_pages_incremental
+from site_index import SiteIndex, emit_site_files, page_url
+from template import Template
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+SITEMAP = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+class TestSiteIndex(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url("index.html"), "/")
+        self.assertEqual(page_url(os.path.join("blog", "tom", "index.html")), "/blog/tom/")
+        self.assertEqual(page_url("about.html"), "/about.html")
+
+    def test_listings_skipDirectoriesWithAPage(self):
+        index = SiteIndex()
+        index.add_page("index.md", "index.html", "Home", None, 1.0)
+        index.add_page("blog/a/index.md", "blog/a/index.html", "A", "<p>a</p>", 1.0)
+        index.add_page("blog/b/index.md", "blog/b/index.html", "B", "<p>b</p>", 2.0)
+        index.add_page("contact/index.md", "contact/index.html", "Contact", None, 1.0)
+        listings = index.listings()
+        self.assertEqual(list(listings), ["/blog/"])
+        self.assertEqual([entry["title"] for entry in listings["/blog/"]], ["B", "A"])
+        index.add_page("blog/index.md", "blog/index.html", "Blog", None, 3.0)
+        self.assertEqual(index.listings(), {})
+
+
+class TestIndexedBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.docs = os.path.join(self.tmp.name, "docs")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.manifest = os.path.join(self.tmp.name, ".cache", "manifest.json")
+        self.index_path = os.path.join(self.tmp.name, ".cache", "site_index.json")
+        write_file(self.template, '<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nWelcome.")
+        for name in ("first", "second"):
+            write_file(os.path.join(self.content, "blog", name, "index.md"),
+                       f"# The {name} post\n\n[< Back Home](/)\n\nAbout the [{name}](/blog/{name}) post.")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, force: bool = False) -> tuple[list[str], SiteIndex]:
+        regenerated = generate_pages_incremental(self.content, self.template, self.docs, "/site/", self.manifest,
+                                                 force=force, index_path=self.index_path)
+        return [os.path.relpath(path, self.content) for path in regenerated], SiteIndex.load(self.index_path)
+
+    def emit(self, writer: OutputWriter = None) -> list[str]:
+        index = SiteIndex.load(self.index_path)
+        generated = emit_site_files(index, Template.load(self.template, "/site/"), self.docs, "https://example.com",
+                                    writer=writer)
+        index.save(self.index_path)
+        return generated
+
+    def test_index_collectsTitleSummaryAndMtime(self):
+        _, index = self.build()
+        entry = index.pages[os.path.join("blog", "first", "index.md")]
+        self.assertEqual(entry["title"], "The first post")
+        self.assertEqual(entry["summary"], '<p>About the <a href="/blog/first">first</a> post.</p>')
+        self.assertEqual(entry["output"], os.path.join("blog", "first", "index.html"))
+        self.assertEqual(entry["mtime"], os.path.getmtime(os.path.join(self.content, "blog", "first", "index.md")))
+
+    def test_incrementalBuild_updatesOnlyChangedEntries(self):
+        self.build()
+        write_file(os.path.join(self.content, "blog", "second", "index.md"), "# Renamed\n\nNew summary.")
+        os.remove(os.path.join(self.content, "index.md"))
+        regenerated, index = self.build()
+        self.assertEqual(regenerated, [os.path.join("blog", "second", "index.md")])
+        self.assertEqual(index.pages[os.path.join("blog", "second", "index.md")]["title"], "Renamed")
+        self.assertEqual(sorted(index.pages), [os.path.join("blog", "first", "index.md"),
+                                               os.path.join("blog", "second", "index.md")])
+
+    def test_missingIndex_regeneratesPages(self):
+        generate_pages_incremental(self.content, self.template, self.docs, "/site/", self.manifest)
+        regenerated, index = self.build()
+        self.assertEqual(len(regenerated), 3)
+        self.assertEqual(len(index.pages), 3)
+
+    def test_emit_writesListingSitemapAndFeed(self):
+        self.build()
+        self.assertEqual(self.emit(), ["blog/index.html", "sitemap.xml", "feed.xml"])
+        with open(os.path.join(self.docs, "blog", "index.html")) as f:
+            listing = f.read()
+        self.assertIn('<a href="/site/blog/first/">The first post</a><p>About the <a href="/site/blog/first">',
+                      listing)
+        self.assertIn('<link href="/site/index.css">', listing)
+
+        sitemap = ElementTree.parse(os.path.join(self.docs, "sitemap.xml")).getroot()
+        self.assertEqual(sorted(loc.text for loc in sitemap.iter(f"{SITEMAP}loc")),
+                         ["https://example.com/site/", "https://example.com/site/blog/",
+                          "https://example.com/site/blog/first/", "https://example.com/site/blog/second/"])
+
+        feed = ElementTree.parse(os.path.join(self.docs, "feed.xml")).getroot()
+        self.assertEqual(feed.find(f"{ATOM}title").text, "Home")
+        entries = feed.findall(f"{ATOM}entry")
+        self.assertEqual(sorted(entry.find(f"{ATOM}title").text for entry in entries),
+                         ["The first post", "The second post"])
+        self.assertIn('href="https://example.com/site/blog/', entries[0].find(f"{ATOM}summary").text)
+
+    def test_emit_unchangedIndex_writesNothing(self):
+        self.build()
+        self.emit()
+        writer = OutputWriter()
+        self.emit(writer)
+        self.assertEqual(writer.written, [])
+        self.assertEqual(len(writer.unchanged), 3)
+
+    def test_emit_pageReplacingListing_isKept(self):
+        self.build()
+        self.emit()
+        write_file(os.path.join(self.content, "blog", "index.md"), "# My blog")
+        self.build()
+        writer = OutputWriter()
+        generated = self.emit(writer)
+        self.assertEqual(generated, ["sitemap.xml", "feed.xml"])
+        self.assertEqual(writer.deleted, [])
+        with open(os.path.join(self.docs, "blog", "index.html")) as f:
+            self.assertIn("My blog", f.read())
+
+    def test_emit_removedDirectory_deletesListing(self):
+        self.build()
+        self.emit()
+        for name in ("first", "second"):
+            os.remove(os.path.join(self.content, "blog", name, "index.md"))
+        self.build()
+        writer = OutputWriter()
+        self.emit(writer)
+        self.assertEqual(writer.deleted, [os.path.join(self.docs, "blog", "index.html")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import time
+import unittest
+
+from fixtures import read_file, write_file
+from static_sync import sync_tree
+
+
+class TestSyncTree(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.docs = os.path.join(self.tmp.name, "docs")
+        self.state = os.path.join(self.tmp.name, ".cache", "static.json")
+        write_file(os.path.join(self.static, "index.css"), "body {}")
+        write_file(os.path.join(self.static, "images", "logo.png"), "png")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_firstSync_copiesAll(self):
+        report = sync_tree(self.static, self.docs, self.state)
+        self.assertEqual(report.copied, ["index.css", os.path.join("images", "logo.png")])
+        self.assertEqual(read_file(os.path.join(self.docs, "images", "logo.png")), "png")
+
+    def test_secondSync_copiesNothing(self):
+        sync_tree(self.static, self.docs, self.state)
+        report = sync_tree(self.static, self.docs, self.state)
+        self.assertEqual(report.copied, [])
+        self.assertEqual(len(report.unchanged), 2)
+
+    def test_changedFile_isCopied(self):
+        sync_tree(self.static, self.docs, self.state)
+        path = os.path.join(self.static, "index.css")
+        write_file(path, "body { color: red; }")
+        report = sync_tree(self.static, self.docs, self.state)
+        self.assertEqual(report.copied, ["index.css"])
+        self.assertEqual(read_file(os.path.join(self.docs, "index.css")), "body { color: red; }")
+
+    def test_sameSizeNewMtime_isCopied(self):
+        sync_tree(self.static, self.docs, self.state)
+        path = os.path.join(self.static, "index.css")
+        write_file(path, "body []")
+        future = time.time() + 10
+        os.utime(path, (future, future))
+        report = sync_tree(self.static, self.docs, self.state)
+        self.assertEqual(report.copied, ["index.css"])
+
+    def test_useHash_touchedButUnchanged_isSkipped(self):
+        sync_tree(self.static, self.docs, self.state, use_hash=True)
+        future = time.time() + 10
+        os.utime(os.path.join(self.static, "index.css"), (future, future))
+        report = sync_tree(self.static, self.docs, self.state, use_hash=True)
+        self.assertEqual(report.copied, [])
+
+    def test_removedFile_isDeletedAndGeneratedFilesKept(self):
+        write_file(os.path.join(self.docs, "index.html"), "<html></html>")
+        sync_tree(self.static, self.docs, self.state)
+        os.remove(os.path.join(self.static, "images", "logo.png"))
+        report = sync_tree(self.static, self.docs, self.state)
+        self.assertEqual(report.removed, [os.path.join("images", "logo.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.html")))
+
+    def test_link_hardlinksFiles(self):
+        report = sync_tree(self.static, self.docs, self.state, link=True)
+        self.assertEqual(len(report.linked), 2)
+        self.assertTrue(os.path.samefile(os.path.join(self.static, "index.css"),
+                                         os.path.join(self.docs, "index.css")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import tempfile
+import unittest
+
+from fixtures import write_file
+from template import Template, TemplateCache, TemplateSelector, expand_includes, rewrite_urls, rewrite_url_chunks
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "..", "template.html")
+
+
+def render_by_replace(template: str, title: str, content: str, basepath: str) -> str:
+    out_text = template.replace("{{ Title }}", title).replace("{{ Content }}", content)
+    out_text = out_text.replace('href="/', f'href="{basepath}')
+    return out_text.replace('src="/', f'src="{basepath}')
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render_simple(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        expected = "<title>Title</title><body><p>text</p></body>"
+        actual = template.render("Title", "<p>text</p>")
+        self.assertEqual(actual, expected)
+
+    def test_render_noPlaceholders(self):
+        template = Template("<p>static</p>")
+        self.assertEqual(template.render("Title", "content"), "<p>static</p>")
+
+    def test_render_repeatedPlaceholder(self):
+        template = Template("{{ Title }}|{{ Title }}|{{ Content }}")
+        self.assertEqual(template.render("a", "b"), "a|a|b")
+
+    def test_render_basepathRewritesTemplateAndContent(self):
+        text = '<link href="/index.css"><title>{{ Title }}</title>{{ Content }}'
+        content = '<a href="/blog">blog</a><img src="/image.png" alt="">'
+        expected = render_by_replace(text, "Title", content, "/site/")
+        actual = Template(text, "/site/").render("Title", content)
+        self.assertEqual(actual, expected)
+
+    def test_render_basepathLeavesRelativeUrls(self):
+        template = Template('<a href="https://boot.dev">{{ Content }}</a>', "/site/")
+        expected = '<a href="https://boot.dev"><img src="image.png"></a>'
+        self.assertEqual(template.render("Title", '<img src="image.png">'), expected)
+
+    def test_rewrite_urls_rootBasepath_unchanged(self):
+        text = '<a href="/blog">blog</a>'
+        self.assertEqual(rewrite_urls(text, "/"), text)
+
+    def test_render_matchesReplaceOnProjectTemplate(self):
+        template = Template.load(TEMPLATE_PATH, "/staticSiteGenerator/")
+        with open(TEMPLATE_PATH) as f:
+            text = f.read()
+        content = '<div><h1>Title</h1><p><a href="/">Home</a></p></div>'
+        expected = render_by_replace(text, "Title", content, "/staticSiteGenerator/")
+        self.assertEqual(template.render("Title", content), expected)
+
+    def test_iter_render_matchesRender(self):
+        template = Template('<link href="/index.css">{{ Title }}<main>{{ Content }}</main>{{ Content }}', "/site/")
+        chunks = ['<a href="', '/blog">', 'b</a><img s', 'rc="/x.png">']
+        expected = template.render("Title", "".join(chunks))
+        actual = "".join(template.iter_render("Title", iter(chunks)))
+        self.assertEqual(actual, expected)
+
+
+class TestRewriteUrlChunks(unittest.TestCase):
+    def test_rewrite_url_chunks_everySplitPoint(self):
+        text = '<a href="/a">x</a><img src="/b.png" alt=""><a href="https://c">src="/</a>'
+        expected = rewrite_urls(text, "/site/")
+        for i in range(len(text) + 1):
+            for j in range(i, len(text) + 1):
+                chunks = [text[:i], text[i:j], text[j:]]
+                with self.subTest(chunks=chunks):
+                    self.assertEqual("".join(rewrite_url_chunks(chunks, "/site/")), expected)
+
+    def test_rewrite_url_chunks_rootBasepath_passesChunksThrough(self):
+        chunks = ['<a href="/', 'a">']
+        self.assertEqual(list(rewrite_url_chunks(chunks, "/")), chunks)
+
+
+class TestTemplateFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = lambda *parts: os.path.join(self.tmp.name, *parts)
+        write_file(self.path("template.html"), '{{ Include "partials/head.html" }}{{ Content }}')
+        write_file(self.path("partials", "head.html"), '<title>{{ Title }}</title>{{Include "css.html"}}')
+        write_file(self.path("partials", "css.html"), '<link href="/index.css">')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_load_expandsNestedIncludes(self):
+        template = Template.load(self.path("template.html"), "/site/")
+        self.assertEqual(template.render("T", "<p>c</p>"), '<title>T</title><link href="/site/index.css"><p>c</p>')
+        self.assertEqual(template.partials, [self.path("partials", "head.html"), self.path("partials", "css.html")])
+
+    def test_expand_includes_cycle_raises(self):
+        write_file(self.path("partials", "css.html"), '{{ Include "head.html" }}')
+        with self.assertRaises(ValueError):
+            Template.load(self.path("template.html"))
+        self.assertRaises(FileNotFoundError, expand_includes, '{{ Include "missing.html" }}', self.tmp.name)
+
+    def test_cache_compilesOncePerFingerprint(self):
+        cache = TemplateCache()
+        first = cache.load(self.path("template.html"))
+        self.assertIs(cache.load(self.path("template.html")), first)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        write_file(self.path("partials", "css.html"), "<style></style>")
+        second = cache.load(self.path("template.html"))
+        self.assertIsNot(second, first)
+        self.assertNotEqual(second.fingerprint, first.fingerprint)
+        self.assertEqual(cache.files(), {self.path("template.html"), self.path("partials", "head.html"),
+                                         self.path("partials", "css.html")})
+
+    def test_selector_precedence(self):
+        write_file(self.path("templates", "index.html"), "landing")
+        write_file(self.path("templates", "blog", "default.html"), "post")
+        selector = TemplateSelector(self.path("template.html"))
+        self.assertEqual(selector.select("index.md"), self.path("templates", "index.html"))
+        self.assertEqual(selector.select(os.path.join("blog", "tom", "index.md")),
+                         self.path("templates", "blog", "default.html"))
+        self.assertEqual(selector.select(os.path.join("contact", "index.md")), self.path("template.html"))
+        self.assertEqual(selector.select("index.md", {"template": "partials/head.html"}),
+                         self.path("partials", "head.html"))
+        write_file(self.path("templates", "default.html"), "everything else")
+        self.assertEqual(TemplateSelector(self.path("template.html")).select(os.path.join("contact", "index.md")),
+                         self.path("templates", "default.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -39,6 +39,14 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a text node", TextType.BOLD, "Other URL")
         self.assertNotEqual(node, node2)
 
+    def test_slots_noInstanceDict(self):
+        node = TextNode("This is a text node", TextType.BOLD)
+        self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_repr(self):
+        node = TextNode("text", TextType.LINK, "URL")
+        self.assertEqual(repr(node), "TextNode(text='text', text_type=<TextType.LINK: 5>, url='URL')")
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,94 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import fixtures
+from build_plan import snapshot_tree
+from tree_monitor import InotifyTreeMonitor, TreeMonitor, _load_libc, diff_snapshots, open_tree_monitor
+
+
+def write_file(path: str, text: str) -> None:
+    fixtures.write_file(path, text, bump_mtime=True)
+
+
+class TestSnapshots(unittest.TestCase):
+    def test_diff_snapshots(self):
+        old = {"a.md": (1, 1), "b.md": (1, 1), "c.md": (1, 1)}
+        new = {"a.md": (1, 1), "b.md": (2, 1), "d.md": (1, 1)}
+        self.assertEqual(diff_snapshots(old, new), (["b.md", "d.md"], ["c.md"]))
+
+    def test_snapshot_tree(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_file(os.path.join(tmp, "blog", "post.md"), "# Post")
+            write_file(os.path.join(tmp, "index.md"), "# Home")
+            self.assertEqual(sorted(snapshot_tree(tmp)), [os.path.join("blog", "post.md"), "index.md"])
+
+    def test_snapshot_tree_missingRoot(self):
+        self.assertEqual(snapshot_tree("/does/not/exist"), {})
+
+    def test_open_tree_monitor_missingRoot_polls(self):
+        monitor = open_tree_monitor("/does/not/exist")
+        self.assertIs(type(monitor), TreeMonitor)
+        self.assertEqual(monitor.changes(), ([], []))
+
+
+class TestTreeMonitor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = lambda *parts: os.path.join(self.tmp.name, *parts)
+        write_file(self.path("index.md"), "# Home")
+        write_file(self.path("blog", "post.md"), "# Post")
+        self.monitor = self.open_monitor()
+
+    def tearDown(self):
+        self.monitor.close()
+        self.tmp.cleanup()
+
+    def open_monitor(self) -> TreeMonitor:
+        return TreeMonitor(self.tmp.name)
+
+    def test_noChanges(self):
+        self.assertEqual(self.monitor.changes(), ([], []))
+
+    def test_changedAndAddedFiles(self):
+        write_file(self.path("blog", "post.md"), "# Changed")
+        write_file(self.path("about.md"), "# About")
+        self.assertEqual(self.monitor.changes(), (["about.md", os.path.join("blog", "post.md")], []))
+        self.assertEqual(self.monitor.changes(), ([], []))
+
+    def test_removedFile(self):
+        os.remove(self.path("index.md"))
+        self.assertEqual(self.monitor.changes(), ([], ["index.md"]))
+
+    def test_newDirectory_filesInsideReported(self):
+        write_file(self.path("new", "deep", "page.md"), "# Page")
+        self.assertEqual(self.monitor.changes(), ([os.path.join("new", "deep", "page.md")], []))
+        write_file(self.path("new", "deep", "page.md"), "# Changed")
+        self.assertEqual(self.monitor.changes(), ([os.path.join("new", "deep", "page.md")], []))
+
+    def test_removedDirectory_filesInsideRemoved(self):
+        shutil.rmtree(self.path("blog"))
+        self.assertEqual(self.monitor.changes(), ([], [os.path.join("blog", "post.md")]))
+
+    def test_renamedDirectory(self):
+        os.rename(self.path("blog"), self.path("posts"))
+        self.assertEqual(self.monitor.changes(),
+                         ([os.path.join("posts", "post.md")], [os.path.join("blog", "post.md")]))
+        write_file(self.path("posts", "post.md"), "# Changed")
+        self.assertEqual(self.monitor.changes(), ([os.path.join("posts", "post.md")], []))
+
+
+@unittest.skipIf(_load_libc() is None, "inotify is not available")
+class TestInotifyTreeMonitor(TestTreeMonitor):
+    def open_monitor(self) -> TreeMonitor:
+        return InotifyTreeMonitor(self.tmp.name, _load_libc())
+
+    def test_open_tree_monitor_prefersInotify(self):
+        monitor = open_tree_monitor(self.tmp.name)
+        self.assertIs(type(monitor), InotifyTreeMonitor)
+        monitor.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+import fixtures
+from fixtures import read_file
+from manifest import BuildManifest
+from output_writer import OutputWriter
+from postprocess import minify_html
+from watch import SiteWatcher
+
+
+def write_file(path: str, text: str) -> None:
+    fixtures.write_file(path, text, bump_mtime=True)
+
+
+class TestSiteWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = lambda *parts: os.path.join(self.tmp.name, *parts)
+        write_file(self.path("template.html"), "<title>{{ Title }}</title>{{ Content }}")
+        write_file(self.path("content", "index.md"), "# Home")
+        write_file(self.path("content", "blog", "index.md"), "# Blog")
+        write_file(self.path("static", "index.css"), "body {}")
+        self.watcher = SiteWatcher(self.path("content"), self.path("static"), self.path("template.html"),
+                                   self.path("docs"), "/", self.path(".cache", "manifest.json"))
+
+    def tearDown(self):
+        self.watcher.close()
+        self.tmp.cleanup()
+
+    def poll(self) -> list[str]:
+        with redirect_stdout(StringIO()):
+            return self.watcher.poll()
+
+    def test_poll_noChanges(self):
+        self.assertEqual(self.poll(), [])
+
+    def test_poll_changedPage_rebuildsOnlyThatPage(self):
+        write_file(self.path("content", "blog", "index.md"), "# New Blog")
+        self.assertEqual(self.poll(), [self.path("docs", "blog", "index.html")])
+        self.assertIn("<title>New Blog</title>", read_file(self.path("docs", "blog", "index.html")))
+        self.assertFalse(os.path.exists(self.path("docs", "index.html")))
+
+    def test_poll_brokenPage_otherChangesStillRebuilt(self):
+        write_file(self.path("content", "a.md"), "no title")
+        write_file(self.path("content", "b.md"), "# B")
+        with self.assertLogs("watch", level="ERROR") as logs:
+            self.assertEqual(self.poll(), [self.path("docs", "b.html")])
+        self.assertIn(f"{self.path('content', 'a.md')}: ValueError: No title found.", logs.output[0])
+        self.assertIn("<title>B</title>", read_file(self.path("docs", "b.html")))
+        self.assertEqual(self.poll(), [])
+        write_file(self.path("content", "a.md"), "# A")
+        self.assertEqual(self.poll(), [self.path("docs", "a.html")])
+
+    def test_poll_removedPage_removesOutput(self):
+        write_file(self.path("content", "index.md"), "# Home")
+        self.poll()
+        os.remove(self.path("content", "index.md"))
+        self.assertEqual(self.poll(), [f"removed {self.path('docs', 'index.html')}"])
+
+    def test_poll_changedTemplate_rebuildsAll(self):
+        write_file(self.path("template.html"), "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(len(self.poll()), 1)
+        self.assertTrue(read_file(self.path("docs", "index.html")).startswith("<h1>Home</h1>"))
+        self.assertTrue(read_file(self.path("docs", "blog", "index.html")).startswith("<h1>Blog</h1>"))
+
+    def test_poll_changedPartial_rebuildsPagesUsingIt(self):
+        write_file(self.path("templates", "blog", "index.html"), '{{ Include "nav.html" }}{{ Content }}')
+        write_file(self.path("templates", "blog", "nav.html"), "<nav>1</nav>")
+        self.assertEqual(len(self.poll()), 1)
+        self.assertTrue(read_file(self.path("docs", "blog", "index.html")).startswith("<nav>1</nav>"))
+        write_file(self.path("templates", "blog", "nav.html"), "<nav>2</nav>")
+        self.assertEqual(self.poll(), [f"1 pages ({os.path.normpath(self.path('templates', 'blog', 'nav.html'))} "
+                                       f"changed)"])
+        self.assertTrue(read_file(self.path("docs", "blog", "index.html")).startswith("<nav>2</nav>"))
+
+    def test_poll_changedPage_updatesManifestAndKeepsOtherPages(self):
+        write_file(self.path("template.html"), "<title>{{ Title }}</title>{{ Content }} ")
+        self.poll()
+        write_file(self.path("content", "index.md"), "# New Home")
+        self.assertEqual(self.poll(), [self.path("docs", "index.html")])
+        manifest = BuildManifest.load(self.path(".cache", "manifest.json"))
+        self.assertEqual(sorted(manifest.pages), [os.path.join("blog", "index.md"), "index.md"])
+
+    def test_poll_draft_notRenderedUnlessDrafts(self):
+        write_file(self.path("content", "draft.md"), "---\ndraft: true\n---\n# Draft")
+        self.assertEqual(self.poll(), [])
+        self.assertFalse(os.path.exists(self.path("docs", "draft.html")))
+        self.watcher.drafts = True
+        write_file(self.path("content", "draft.md"), "---\ndraft: true\n---\n# Draft 2")
+        self.assertEqual(self.poll(), [self.path("docs", "draft.html")])
+
+    def test_poll_usesBuildWriter(self):
+        self.watcher.close()
+        writer = OutputWriter(minify_html)
+        self.watcher = SiteWatcher(self.path("content"), self.path("static"), self.path("template.html"),
+                                   self.path("docs"), "/", self.path(".cache", "manifest.json"), writer=writer)
+        write_file(self.path("content", "index.md"), "# Home\n\nsome    text")
+        self.poll()
+        self.assertEqual(writer.written, [self.path("docs", "index.html")])
+        self.assertIn("<p>some text</p>", read_file(self.path("docs", "index.html")))
+
+    def test_poll_changedStaticFile_isCopied(self):
+        write_file(self.path("static", "index.css"), "body { color: red; }")
+        self.assertEqual(self.poll(), [self.path("docs", "index.css")])
+        self.assertEqual(read_file(self.path("docs", "index.css")), "body { color: red; }")
+
+
+if __name__ == "__main__":
+    unittest.main()
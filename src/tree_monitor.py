@@ -0,0 +1,203 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import stat
+import struct
+
+from build_plan import Snapshot, snapshot_tree
+
+_IN_MODIFY = 0x2
+_IN_ATTRIB = 0x4
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> tuple[list[str], list[str]]:
+    """
+    :return: the sorted lists of (changed or added, removed) relative paths
+    """
+    changed = sorted(path for path, stat in new.items() if old.get(path) != stat)
+    removed = sorted(old.keys() - new.keys())
+    return changed, removed
+
+
+class TreeMonitor:
+    """
+    Reports the files changed below a directory since the last check by walking the whole tree every time.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.files: Snapshot = snapshot_tree(root)
+
+    def changes(self) -> tuple[list[str], list[str]]:
+        """
+        :return: the sorted lists of (changed or added, removed) relative paths since the last call
+        """
+        files = snapshot_tree(self.root)
+        changed, removed = diff_snapshots(self.files, files)
+        self.files = files
+        return changed, removed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyTreeMonitor(TreeMonitor):
+    """
+    Reports the files changed below a directory from Linux inotify events, so a check only stats the paths that had
+    events instead of walking the whole tree.
+    """
+
+    def __init__(self, root: str, libc: ctypes.CDLL):
+        self._libc = libc
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._directories: dict[int, str] = {}
+        self._watches: dict[str, int] = {}
+        self.root = root
+        try:
+            self.files = self._watch_tree("")
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_tree(self, rel_dir: str) -> Snapshot:
+        """
+        Watches rel_dir and every directory below it, before listing each, so no file created meanwhile is missed.
+
+        :return: the stat of every file below rel_dir
+        """
+        files: Snapshot = {}
+        stack = [rel_dir]
+        while stack:
+            directory = stack.pop()
+            path = os.path.join(self.root, directory)
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                if error == errno.ENOENT and directory != "":
+                    continue
+                raise OSError(error, f"inotify_add_watch failed for {path}")
+            self._directories[wd] = directory
+            self._watches[directory] = wd
+            try:
+                entries = list(os.scandir(path))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                rel_path = os.path.join(directory, entry.name) if directory else entry.name
+                if entry.is_dir():
+                    stack.append(rel_path)
+                elif entry.is_file():
+                    stat_result = entry.stat()
+                    files[rel_path] = (stat_result.st_mtime_ns, stat_result.st_size)
+        return files
+
+    def _unwatch_tree(self, rel_dir: str) -> None:
+        prefix = rel_dir + os.sep
+        for directory in [d for d in self._watches if d == rel_dir or d.startswith(prefix)]:
+            wd = self._watches.pop(directory)
+            del self._directories[wd]
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def _read_events(self) -> list[tuple[int, int, str]]:
+        """
+        :return: the pending (watch descriptor, mask, name) events
+        """
+        events = []
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                events.append((wd, mask, name))
+
+    def changes(self) -> tuple[list[str], list[str]]:
+        dirty: set[str] = set()
+        for wd, mask, name in self._read_events():
+            if mask & _IN_Q_OVERFLOW:
+                # events were dropped: fall back to one full walk
+                files = self._watch_tree("")
+                changed, removed = diff_snapshots(self.files, files)
+                self.files = files
+                self._read_events()
+                return changed, removed
+            if mask & _IN_IGNORED:
+                directory = self._directories.pop(wd, None)
+                if self._watches.get(directory) == wd:
+                    del self._watches[directory]
+                continue
+            directory = self._directories.get(wd)
+            if directory is None:
+                continue
+            rel_path = os.path.join(directory, name) if directory else name
+            if not mask & _IN_ISDIR:
+                dirty.add(rel_path)
+            elif mask & (_IN_CREATE | _IN_MOVED_TO):
+                dirty.update(self._watch_tree(rel_path))
+            elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+                self._unwatch_tree(rel_path)
+                prefix = rel_path + os.sep
+                dirty.update(path for path in self.files if path.startswith(prefix))
+
+        changed, removed = [], []
+        for rel_path in dirty:
+            try:
+                stat_result = os.stat(os.path.join(self.root, rel_path))
+            except (FileNotFoundError, NotADirectoryError):
+                stat_result = None
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                if self.files.pop(rel_path, None) is not None:
+                    removed.append(rel_path)
+                continue
+            file_stat = (stat_result.st_mtime_ns, stat_result.st_size)
+            if self.files.get(rel_path) != file_stat:
+                self.files[rel_path] = file_stat
+                changed.append(rel_path)
+        return sorted(changed), sorted(removed)
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def _load_libc() -> ctypes.CDLL | None:
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    return libc
+
+
+def open_tree_monitor(root: str) -> TreeMonitor:
+    """
+    :return: an inotify monitor of root where inotify is available (Linux) and root exists, otherwise a polling one
+    """
+    libc = _load_libc() if os.path.isdir(root) else None
+    if libc is not None:
+        try:
+            return InotifyTreeMonitor(root, libc)
+        except OSError:
+            # e.g. the inotify watch limit is reached on a very large tree
+            pass
+    return TreeMonitor(root)
@@ -0,0 +1,159 @@
+import functools
+import logging
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from build_plan import snapshot_tree
+from output_writer import SIDECAR_EXTENSION, OutputWriter, remove_sidecar
+from page_generator import BuildError, generate_pages_incremental, page_output_path
+from render_cache import RenderCache
+from static_sync import install_file
+from template import TEMPLATES_DIR, TemplateCache
+from tree_monitor import diff_snapshots, open_tree_monitor
+
+logger = logging.getLogger(__name__)
+
+
+class SiteWatcher:
+    def __init__(self, content_dir: str, static_dir: str, template_path: str, dest_dir: str, basepath: str,
+                 manifest_path: str, writer: OutputWriter = None, cache: RenderCache = None, drafts: bool = False,
+                 graph_path: str = None, index_path: str = None, metadata_path: str = None):
+        """
+        Takes the settings of the build it follows, so pages are rebuilt exactly as that build would: with the
+        same writer (and so the same transform), render cache and drafts flag, and into the same manifest,
+        dependency graph and indexes.
+        """
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.manifest_path = manifest_path
+        self.writer = writer if writer is not None else OutputWriter()
+        self.cache = cache
+        self.drafts = drafts
+        self.graph_path = graph_path
+        self.index_path = index_path
+        self.metadata_path = metadata_path
+        self.templates = TemplateCache()
+        self.templates.load(template_path, basepath)
+        self.template_files = self._template_files()
+        self.content = open_tree_monitor(content_dir)
+        self.static = open_tree_monitor(static_dir)
+
+    @staticmethod
+    def _stat(path: str) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _template_files(self) -> dict[str, tuple[int, int] | None]:
+        """
+        :return: the stat of the default template, of every file in the templates directory and of every partial
+        included by a template used so far
+        """
+        files = {path: self._stat(path) for path in self.templates.files() | {os.path.normpath(self.template_path)}}
+        templates_dir = os.path.join(os.path.dirname(self.template_path), TEMPLATES_DIR)
+        for rel_path, stat in snapshot_tree(templates_dir).items():
+            files[os.path.normpath(os.path.join(templates_dir, rel_path))] = stat
+        return files
+
+    def page_dest_path(self, rel_path: str) -> str:
+        return os.path.join(self.dest_dir, page_output_path(rel_path))
+
+    def _generate(self, failures: list[tuple[str, str]], pages: list[tuple[str, str]] = None) -> list[str]:
+        """
+        Runs generate_pages_incremental with the build's settings, over the whole site or, if pages is given, over
+        just those pages. Failed pages are added to failures.
+
+        :return: the regenerated source paths
+        """
+        try:
+            return generate_pages_incremental(self.content_dir, self.template_path, self.dest_dir, self.basepath,
+                                              self.manifest_path, cache=self.cache, graph_path=self.graph_path,
+                                              pages=pages, writer=self.writer, index_path=self.index_path,
+                                              metadata_path=self.metadata_path, drafts=self.drafts,
+                                              templates=self.templates, partial=pages is not None)
+        except BuildError as e:
+            failures.extend(e.failures)
+            return []
+
+    def poll(self) -> list[str]:
+        """
+        Checks the watched files once and rebuilds whatever changed: when a template or partial changed, the pages
+        using it, otherwise only the changed pages and static files. Pages go through generate_pages_incremental,
+        so drafts, the output transform, the manifest and the indexes follow the build's settings. A page that
+        fails to render is logged and skipped until it changes again; the other changes are still rebuilt.
+
+        :return: a description of every rebuilt or removed output
+        """
+        rebuilt: list[str] = []
+        failures: list[tuple[str, str]] = []
+        template_files = self._template_files()
+        if template_files != self.template_files:
+            changed_templates, removed_templates = diff_snapshots(self.template_files, template_files)
+            self.content.changes()
+            regenerated = self._generate(failures)
+            self.template_files = self._template_files()
+            rebuilt.append(f"{len(regenerated)} pages ({', '.join(changed_templates + removed_templates)} changed)")
+
+        # the monitor records a change when reporting it, so a broken page is reported once rather than on every poll
+        changed, removed = self.content.changes()
+        if changed or removed:
+            written, deleted = len(self.writer.written), len(self.writer.deleted)
+            self._generate(failures, [(os.path.join(self.content_dir, rel_path), self.page_dest_path(rel_path))
+                                      for rel_path in changed + removed])
+            rebuilt.extend(self.writer.written[written:])
+            rebuilt.extend(f"removed {path}" for path in self.writer.deleted[deleted:])
+        for path in self.templates.files() - self.template_files.keys():
+            # partials of templates used for the first time are watched from now on
+            self.template_files[path] = self._stat(path)
+
+        changed, removed = self.static.changes()
+        for rel_path in changed:
+            dest_path = os.path.join(self.dest_dir, rel_path)
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            install_file(os.path.join(self.static_dir, rel_path), dest_path, link=False)
+            if rel_path + SIDECAR_EXTENSION not in self.static.files:
+                remove_sidecar(dest_path)
+            rebuilt.append(dest_path)
+        for rel_path in removed:
+            dest_path = os.path.join(self.dest_dir, rel_path)
+            if self.writer.delete(dest_path):
+                rebuilt.append(f"removed {dest_path}")
+        if failures:
+            logger.error(BuildError(failures).report())
+        return rebuilt
+
+    def close(self) -> None:
+        self.content.close()
+        self.static.close()
+
+
+def start_server(directory: str, port: int) -> ThreadingHTTPServer:
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=directory)
+    server = ThreadingHTTPServer(("", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def watch(watcher: SiteWatcher, port: int, interval: float = 0.2) -> None:
+    server = start_server(watcher.dest_dir, port)
+    logger.info(f"Serving {watcher.dest_dir} on http://localhost:{port}/, watching for changes (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(interval)
+            start = time.perf_counter()
+            rebuilt = watcher.poll()
+            if rebuilt:
+                elapsed = (time.perf_counter() - start) * 1000
+                logger.info(f"Rebuilt {', '.join(rebuilt)} in {elapsed:.1f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        watcher.close()